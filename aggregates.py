@@ -0,0 +1,207 @@
+"""Kubus agregat penjualan dan pembelian yang dipakai semua grafik dan metrik.
+
+Baris transaksi diringkas sekali menjadi agregat harian per
+(day, product_id, category) untuk penjualan dan per
+(day, product_id, category, supplier_id) untuk pembelian. Ukuran kubus dibatasi
+oleh jumlah hari x produk (x supplier), bukan jumlah transaksi, sehingga query
+halaman tetap cepat walaupun riwayatnya jutaan baris. Transaksi baru cukup
+diagregasi lalu digabung ke kubus lewat update(); beberapa agregat terakhir
+disimpan per versi (changes_since) agar turunan kubus, mis. CostLedger, bisa
+diperbarui tanpa dihitung ulang.
+"""
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+SALES_KEYS = ['day', 'product_id', 'category']
+SALES_MEASURES = ['quantity', 'total_price', 'n']
+PURCHASE_KEYS = ['day', 'product_id', 'category', 'supplier_id']
+PURCHASE_MEASURES = ['quantity', 'total_cost', 'n']
+# Jumlah agregat tambahan terakhir yang disimpan untuk changes_since()
+RECENT_CHANGES = 16
+
+# Kolom mentah yang dibutuhkan untuk membangun kubus
+CUBE_REQUIREMENTS = {
+    'sales': ['date', 'product_id', 'quantity', 'total_price'],
+    'purchases': ['date', 'product_id', 'supplier_id', 'quantity', 'total_cost']
+}
+
+
+def _aggregate(rows, keys, measures, category_map):
+    # Ringkas baris transaksi ke tingkat harian
+    frame = pd.DataFrame({
+        'day': rows['date'].dt.floor('D'),
+        'product_id': rows['product_id'],
+        'category': rows['product_id'].map(category_map)
+    })
+    if 'supplier_id' in keys:
+        frame['supplier_id'] = rows['supplier_id']
+    for column in measures:
+        if column != 'n':
+            values = rows[column].to_numpy()
+            # Kolom ringkas (int16/int32) dijumlah sebagai int64 agar tidak overflow
+            frame[column] = values.astype(np.int64) if values.dtype.kind in 'iu' else values
+
+    grouped = frame.groupby(keys, sort=False, dropna=False, observed=True)
+    cube = grouped[[m for m in measures if m != 'n']].sum()
+    cube['n'] = grouped.size()
+    cube = cube.reset_index()
+    # Kunci kubus selalu string biasa agar bisa digabung antar batch
+    for key in keys[1:]:
+        cube[key] = cube[key].astype(str)
+    return cube
+
+
+def _merge(cube, new, keys):
+    # Gabungkan agregat baru ke kubus lama (ukuran kubus kecil, jadi murah)
+    if cube is None or cube.empty:
+        return new
+    if new.empty:
+        return cube
+    return pd.concat([cube, new], ignore_index=True).groupby(keys, sort=False, dropna=False).sum().reset_index()
+
+
+def combine_aggregates(frames, keys):
+    """Satukan beberapa agregat harian berkunci sama dengan satu groupby (None jika kosong)."""
+    frames = [frame for frame in frames if frame is not None and len(frame)]
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True).groupby(keys, sort=False, dropna=False).sum().reset_index()
+
+
+def _month(day):
+    return day.dt.to_period('M').astype(str).rename('month')
+
+
+class AggregateCube:
+    """Agregat harian penjualan/pembelian dengan query siap pakai per halaman."""
+
+    def __init__(self, products):
+        self.category_map = products.set_index('product_id')['category']
+        self.sales = pd.DataFrame(columns=SALES_KEYS + SALES_MEASURES)
+        self.purchases = pd.DataFrame(columns=PURCHASE_KEYS + PURCHASE_MEASURES)
+        self.version = 0
+        self._changes = deque(maxlen=RECENT_CHANGES)
+
+    @classmethod
+    def build(cls, products, sales=None, purchases=None):
+        cube = cls(products)
+        cube.update(new_sales=sales, new_purchases=purchases)
+        return cube
+
+    def load_aggregates(self, sales=None, purchases=None):
+        """Pasang agregat harian yang sudah dihitung di luar (mis. parallel.build_cube)."""
+        if sales is not None and len(sales):
+            self.sales = _merge(self.sales, sales[SALES_KEYS + SALES_MEASURES], SALES_KEYS)
+        if purchases is not None and len(purchases):
+            self.purchases = _merge(self.purchases, purchases[PURCHASE_KEYS + PURCHASE_MEASURES],
+                                    PURCHASE_KEYS)
+        if self.version:
+            # Muatan pertama (build) seukuran kubus, tidak perlu disimpan
+            self._changes.append((self.version + 1, sales, purchases))
+        self.version += 1
+        return self
+
+    def changes_since(self, version, until=None):
+        """[(penjualan, pembelian)] agregat yang dimuat sesudah `version` s.d. `until`.
+
+        None jika ada versi yang sudah tidak disimpan (pemanggil harus membangun
+        ulang dari kubus).
+        """
+        until = self.version if until is None else until
+        changes = [(sales, purchases) for changed, sales, purchases in list(self._changes)
+                   if version < changed <= until]
+        return changes if len(changes) == until - version else None
+
+    def aggregate(self, new_sales=None, new_purchases=None):
+        """(penjualan, pembelian) transaksi baru sebagai agregat harian, tanpa mengubah kubus.
+
+        Hasilnya bisa ditampung lalu digabung sekaligus lewat load_aggregates().
+        """
+        sales = purchases = None
+        if new_sales is not None and len(new_sales):
+            sales = _aggregate(new_sales, SALES_KEYS, SALES_MEASURES, self.category_map)
+        if new_purchases is not None and len(new_purchases):
+            purchases = _aggregate(new_purchases, PURCHASE_KEYS, PURCHASE_MEASURES, self.category_map)
+        return sales, purchases
+
+    def update(self, new_sales=None, new_purchases=None):
+        """Tambahkan transaksi baru tanpa membangun ulang kubus."""
+        return self.load_aggregates(*self.aggregate(new_sales, new_purchases))
+
+    def _sales_slice(self, start_date=None, end_date=None, categories=None, product_id=None):
+        cube = self.sales
+        mask = pd.Series(True, index=cube.index)
+        if start_date is not None:
+            mask &= cube['day'] >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= cube['day'] <= pd.Timestamp(end_date)
+        if categories is not None:
+            mask &= cube['category'].isin(list(categories))
+        if product_id is not None:
+            mask &= cube['product_id'] == product_id
+        return cube if mask.all() else cube[mask]
+
+    def _purchase_slice(self, supplier_id=None):
+        cube = self.purchases
+        if supplier_id is None:
+            return cube
+        return cube[cube['supplier_id'] == supplier_id]
+
+    # Penjualan
+    def sales_totals(self, start_date=None, end_date=None, categories=None):
+        """Total penjualan, jumlah transaksi, jumlah item dan rata-rata per transaksi."""
+        cube = self._sales_slice(start_date, end_date, categories)
+        total = cube['total_price'].sum()
+        count = cube['n'].sum()
+        return {
+            'total_price': total,
+            'n': count,
+            'quantity': cube['quantity'].sum(),
+            'mean_price': total / count if count else float('nan')
+        }
+
+    def monthly_sales(self, start_date=None, end_date=None, categories=None):
+        cube = self._sales_slice(start_date, end_date, categories)
+        return cube.groupby(_month(cube['day']))['total_price'].sum().reset_index()
+
+    def product_sales(self, start_date=None, end_date=None, categories=None):
+        cube = self._sales_slice(start_date, end_date, categories)
+        return cube.groupby('product_id')[['quantity', 'total_price']].sum().reset_index()
+
+    def category_sales(self, start_date=None, end_date=None, categories=None):
+        cube = self._sales_slice(start_date, end_date, categories)
+        return cube.groupby('category')['total_price'].sum().reset_index()
+
+    def product_monthly_quantity(self, product_id):
+        cube = self._sales_slice(product_id=product_id)
+        return cube.groupby(_month(cube['day']))['quantity'].sum().reset_index()
+
+    # Pembelian
+    def purchase_totals(self):
+        return {
+            'total_cost': self.purchases['total_cost'].sum(),
+            'quantity': self.purchases['quantity'].sum(),
+            'n': self.purchases['n'].sum()
+        }
+
+    def product_purchases(self, supplier_id=None):
+        cube = self._purchase_slice(supplier_id)
+        return cube.groupby('product_id')[['quantity', 'total_cost']].sum().reset_index()
+
+    def category_purchases(self):
+        return self.purchases.groupby('category')['total_cost'].sum().reset_index()
+
+    def supplier_purchases(self):
+        return self.purchases.groupby('supplier_id').agg({
+            'total_cost': 'sum',
+            'quantity': 'sum',
+            'product_id': 'nunique'
+        }).reset_index()
+
+    def monthly_purchases(self, supplier_id=None):
+        cube = self._purchase_slice(supplier_id)
+        return cube.groupby(_month(cube['day']))['total_cost'].sum().reset_index()
@@ -0,0 +1,249 @@
+"""Komputasi setiap halaman sebagai fungsi murni yang di-memoize.
+
+Setiap fungsi hanya bergantung pada argumennya: objek data (berawalan '_',
+tidak ikut kunci cache), data_version, dan nilai widget halaman. Hasilnya
+dibagi antar rerun tanpa salinan, jadi pemanggil tidak boleh mengubahnya.
+"""
+import threading
+import weakref
+
+from classification import ABC_CLASSES, XYZ_CLASSES, class_matrix, classify_catalog
+from costing import CostLedger
+from forecasting import error_metrics, forecast_catalog
+from ledger import StockLedger
+from memo import memoize
+from replenishment import DEFAULT_SERVICE_LEVEL, reorder_plan
+
+
+def _with_names(df, products):
+    return df.merge(products[['product_id', 'product_name']], on='product_id')
+
+
+# Dashboard Utama
+@memoize()
+def dashboard_summary(_cube, _products, data_version, top_n=10):
+    sales_totals = _cube.sales_totals()
+    product_sales = _with_names(_cube.product_sales(), _products)
+    return {
+        'total_sales': sales_totals['total_price'],
+        'total_products': _products['product_id'].nunique(),
+        'total_inventory_value': (_products['stock'] * _products['unit_price']).sum(),
+        'avg_sale': sales_totals['mean_price'],
+        'monthly_sales': _cube.monthly_sales(),
+        'top_products': product_sales.nlargest(top_n, 'quantity')
+    }
+
+
+# Analisis Penjualan
+@memoize()
+def sales_analysis(_cube, _products, data_version, start_date, end_date, categories, top_n=5):
+    totals = _cube.sales_totals(start_date, end_date, categories)
+    product_revenue = _with_names(_cube.product_sales(start_date, end_date, categories), _products)
+    return {
+        'total_sales': totals['total_price'],
+        'avg_sale': totals['mean_price'],
+        'total_quantity': totals['quantity'],
+        'sales_by_category': _cube.category_sales(start_date, end_date, categories),
+        'top_products_revenue': product_revenue.nlargest(top_n, 'total_price')
+    }
+
+
+# Manajemen Inventory
+@memoize()
+def inventory_status(_products, data_version, low_stock_limit=10):
+    stock = _products['stock']
+    return {
+        'total_items': stock.sum(),
+        'out_of_stock': (stock <= 0).sum(),
+        'low_stock': ((stock > 0) & (stock <= low_stock_limit)).sum()
+    }
+
+
+@memoize(maxsize=4)
+def inventory_classification(_cube, _products, data_version, freq='M'):
+    """ABC/XYZ, perputaran dan days-of-supply seluruh katalog dari kubus harian."""
+    return classify_catalog(_products, _cube.sales, date_column='day', freq=freq)
+
+
+@memoize()
+def classification_matrix(_cube, _products, data_version, freq='M', value='count'):
+    return class_matrix(inventory_classification(_cube, _products, data_version, freq), value)
+
+
+@memoize()
+def inventory_view(_category_inventory, _classified, data_version, freq, categories, min_stock, max_stock,
+                   abc=ABC_CLASSES, xyz=XYZ_CLASSES, slow_only=False):
+    # Kolom klasifikasi ditempel per product_id, lalu dipakai sebagai filter.
+    # freq = periode XYZ yang menghasilkan _classified (bagian kunci cache)
+    classified = _classified[['product_id', 'abc', 'xyz', 'turnover', 'days_of_supply', 'slow_mover']]
+    inventory = _category_inventory.merge(classified, on='product_id', how='left')
+    mask = (
+        (inventory['stock'] >= min_stock) &
+        (inventory['stock'] <= max_stock) &
+        inventory['abc'].isin(abc) &
+        inventory['xyz'].isin(xyz)
+    )
+    if slow_only:
+        mask &= inventory['slow_mover'].fillna(False).astype(bool)
+    filtered_inventory = inventory[mask]
+    value = filtered_inventory['stock'] * filtered_inventory['unit_price']
+    value_by_category = value.groupby(filtered_inventory['category'], observed=True).sum()
+    return {
+        'filtered_inventory': filtered_inventory,
+        'value_by_category': value_by_category.rename('value').reset_index()
+    }
+
+
+@memoize(maxsize=4)
+def stock_ledger(_cube, _products, data_version):
+    """Ledger pergerakan stok dari kubus agregat; stok produk = saldo penutup (+ adjustment)."""
+    return StockLedger.from_cube(_cube, _products)
+
+
+@memoize()
+def stock_history(_cube, _products, data_version, product_ids, start_date, end_date):
+    ledger = stock_ledger(_cube, _products, data_version)
+    return _with_names(ledger.daily_stock(start_date, end_date, list(product_ids)), _products)
+
+
+@memoize()
+def stockout_summary(_cube, _products, data_version):
+    ledger = stock_ledger(_cube, _products, data_version)
+    summary = _products[['product_id', 'product_name', 'category', 'stock']].copy()
+    summary['stockout_days'] = ledger.stockout_days()
+    # Koreksi saldo awal agar stok historis tidak negatif (riwayat tidak konsisten)
+    summary['stock_adjustment'] = ledger.adjustment
+    return summary.sort_values('stockout_days', ascending=False, ignore_index=True)
+
+
+# Forecasting Demand
+@memoize(maxsize=4)
+def catalog_forecast(_cube, _products, data_version):
+    """Peramalan semua SKU sekaligus; halaman hanya melakukan lookup."""
+    return forecast_catalog(_cube.sales, _products['product_id'], date_column='day')
+
+
+@memoize(maxsize=2)
+def catalog_forecast_csv(_cube, _products, data_version):
+    """CSV peramalan periode berikutnya seluruh katalog, diserialisasi sekali per versi data."""
+    return catalog_forecast(_cube, _products, data_version).next_period().to_csv(index=False).encode()
+
+
+@memoize()
+def demand_forecast(_cube, _products, data_version, product_id, method='moving_average', param=None):
+    result = catalog_forecast(_cube, _products, data_version)
+    row = result.product_position(product_id)
+    monthly_sales = result.product_frame(product_id, method, param)
+    mae, mape = error_metrics(result.matrix[row:row + 1], result.forecast(method, param)[row:row + 1])
+
+    return {
+        'monthly_sales': monthly_sales,
+        'months_with_sales': int((result.matrix[row] > 0).sum()),
+        'mae': mae[0],
+        'mape': mape[0],
+        'avg_sales': result.matrix[row].mean() if result.matrix.shape[1] else 0.0
+    }
+
+
+@memoize(maxsize=8)
+def replenishment_plan(_cube, _products, _suppliers, data_version, service_level=DEFAULT_SERVICE_LEVEL):
+    """Safety stock, reorder point dan EOQ untuk seluruh katalog (lead time dari tabel supplier)."""
+    return reorder_plan(_products, _cube.sales, _cube.purchases, service_level,
+                        date_column='day', daily=True, suppliers=_suppliers)
+
+
+@memoize(maxsize=4)
+def replenishment_csv(_cube, _products, _suppliers, data_version, service_level=DEFAULT_SERVICE_LEVEL):
+    """CSV tabel reorder, diserialisasi sekali per versi data dan service level."""
+    plan = replenishment_plan(_cube, _products, _suppliers, data_version, service_level)
+    return plan.to_csv(index=False).encode()
+
+
+# Analisis Supplier
+@memoize()
+def supplier_performance(_cube, _suppliers, data_version):
+    performance = _cube.supplier_purchases().merge(
+        _suppliers[['supplier_id', 'supplier_name']], on='supplier_id'
+    )
+    return performance[
+        ['supplier_name', 'total_cost', 'quantity', 'product_id']
+    ].rename(columns={
+        'total_cost': 'total_pembelian',
+        'quantity': 'total_item',
+        'product_id': 'jumlah_produk'
+    })
+
+
+@memoize()
+def supplier_detail(_cube, _products, data_version, supplier_id):
+    return {
+        'products_from_supplier': _with_names(_cube.product_purchases(supplier_id), _products),
+        'monthly_purchases': _cube.monthly_purchases(supplier_id)
+    }
+
+
+# Laporan Keuangan
+# Ledger terbaru per kubus dan metode: (versi kubus, ledger)
+_latest_ledgers = weakref.WeakKeyDictionary()
+_latest_lock = threading.Lock()
+
+
+@memoize(maxsize=4)
+def cost_ledger(_cube, _products, data_version, method='fifo'):
+    """COGS FIFO / rata-rata tertimbang seluruh katalog dari kubus agregat.
+
+    Sesudah ingestion, agregat baru di-append ke salinan ledger versi
+    sebelumnya; dibangun ulang jika itu tidak setara (lihat CostLedger.appended).
+    """
+    version = _cube.version
+    with _latest_lock:
+        latest_version, ledger = _latest_ledgers.get(_cube, {}).get(method, (None, None))
+    changes = _cube.changes_since(latest_version, version) if ledger is not None else None
+    for sales, purchases in changes or []:
+        ledger = ledger.appended(sales, purchases, 'day')
+        if ledger is None:
+            break
+    if changes is None or ledger is None:
+        ledger = CostLedger.from_cube(_cube, _products, method)
+        if _cube.version != version:
+            # Kubus berubah selama build: versi isi ledger tidak pasti
+            return ledger
+    with _latest_lock:
+        current, _ = _latest_ledgers.setdefault(_cube, {}).get(method, (None, None))
+        if current is None or current < version:
+            _latest_ledgers[_cube][method] = (version, ledger)
+    return ledger
+
+
+@memoize()
+def financial_report(_cube, _products, data_version, method='fifo', top_n=5):
+    ledger = cost_ledger(_cube, _products, data_version, method)
+    totals = ledger.totals()
+
+    # Margin kotor per produk: pendapatan - COGS (bukan total pembelian)
+    product_profit = ledger.product_margin().merge(
+        _products[['product_id', 'product_name', 'category']], on='product_id'
+    )
+    product_profit = product_profit.rename(columns={'revenue': 'total_price', 'gross_margin': 'profit'})
+
+    # Margin per kategori dari margin produk (tanpa join penjualan x pembelian)
+    category_margin = product_profit.groupby('category', observed=True)[
+        ['total_price', 'cogs', 'profit']
+    ].sum().reset_index().rename(columns={'profit': 'margin'})
+    category_margin['margin_pct'] = (category_margin['margin'] / category_margin['total_price']) * 100
+
+    # ROI per produk terhadap COGS (hindari division by zero)
+    product_roi = product_profit[product_profit['cogs'] > 0]
+
+    return {
+        'total_revenue': totals['revenue'],
+        'total_cogs': totals['cogs'],
+        'total_purchases': totals['purchase_spend'],
+        'inventory_value': totals['inventory_value'],
+        'profit': totals['gross_margin'],
+        'profit_pct': totals['margin_pct'],
+        'category_margin': category_margin,
+        'product_profit': product_profit,
+        'top_profitable': product_profit.nlargest(top_n, 'profit'),
+        'top_roi': product_roi.nlargest(top_n, 'roi')
+    }
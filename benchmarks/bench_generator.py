@@ -0,0 +1,111 @@
+"""Benchmark generator data: loop per baris (load_data lama) vs generate_data().
+
+Contoh:
+    python benchmarks/bench_generator.py
+    python benchmarks/bench_generator.py --sizes 1000 1000000 --max-loop-rows 10000000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_generator import generate_data, make_products, make_suppliers  # noqa: E402
+
+
+def legacy_load_data(n_sales, n_purchases):
+    # Salinan loop per baris dari load_data() versi lama sebagai pembanding
+    products = make_products(20).to_dict('list')
+    suppliers = make_suppliers(5).to_dict('list')
+
+    np.random.seed(42)
+    sales_data = []
+    start_date = datetime(2023, 1, 1)
+
+    for i in range(n_sales):
+        product_idx = np.random.randint(0, 20)
+        product_id = products['product_id'][product_idx]
+        quantity = np.random.randint(1, 10)
+        price = products['unit_price'][product_idx]
+        total_price = quantity * price
+        date = start_date + timedelta(days=np.random.randint(0, 365))
+
+        sales_data.append({
+            'sale_id': f'S{str(i).zfill(4)}',
+            'product_id': product_id,
+            'quantity': quantity,
+            'unit_price': price,
+            'total_price': total_price,
+            'date': date
+        })
+
+    purchases = []
+    for i in range(n_purchases):
+        supplier_idx = np.random.randint(0, 5)
+        product_idx = np.random.randint(0, 20)
+        quantity = np.random.randint(10, 100)
+        price = products['unit_price'][product_idx] * 0.7
+        total_price = quantity * price
+        date = start_date + timedelta(days=np.random.randint(0, 365))
+
+        purchases.append({
+            'purchase_id': f'PUR{str(i).zfill(4)}',
+            'product_id': products['product_id'][product_idx],
+            'supplier_id': suppliers['supplier_id'][supplier_idx],
+            'quantity': quantity,
+            'unit_cost': price,
+            'total_cost': total_price,
+            'date': date
+        })
+
+    return {
+        'products': pd.DataFrame(products),
+        'sales': pd.DataFrame(sales_data),
+        'suppliers': pd.DataFrame(suppliers),
+        'purchases': pd.DataFrame(purchases)
+    }
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 1000000, 10000000],
+                        help='jumlah baris penjualan yang diuji')
+    parser.add_argument('--max-loop-rows', type=int, default=1000000,
+                        help='loop lama dilewati di atas ukuran ini (bisa memakan puluhan menit)')
+    parser.add_argument('--categorical-ids', action='store_true',
+                        help='uji generator dengan kolom ID Categorical')
+    args = parser.parse_args(argv)
+
+    print(f"{'baris':>12} {'loop (s)':>12} {'vektor (s)':>12} {'speedup':>10} {'memori vektor (MB)':>20}")
+    for n_sales in args.sizes:
+        n_purchases = max(1, n_sales // 5)
+
+        vec_time, data = _timed(generate_data, n_sales=n_sales, n_purchases=n_purchases,
+                                categorical_ids=args.categorical_ids)
+        vec_mem = sum(df.memory_usage(deep=True).sum() for df in data.values()) / 1e6
+        del data
+
+        if n_sales <= args.max_loop_rows:
+            loop_time, _ = _timed(legacy_load_data, n_sales, n_purchases)
+            loop_text = f'{loop_time:12.3f}'
+            speedup_text = f'{loop_time / vec_time:9.1f}x'
+        else:
+            loop_text = f"{'dilewati':>12}"
+            speedup_text = f"{'-':>10}"
+
+        print(f'{n_sales:12,d} {loop_text} {vec_time:12.3f} {speedup_text} {vec_mem:20.1f}')
+
+
+if __name__ == '__main__':
+    main()
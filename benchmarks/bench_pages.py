@@ -0,0 +1,346 @@
+"""Benchmark komputasi setiap halaman tanpa browser pada beberapa skala data.
+
+Setiap tahap (KPI, trend bulanan, top-N, filter penjualan, merge supplier,
+margin kategori, ROI) dijalankan dua cara:
+- pandas: logika halaman versi awal langsung di atas tabel mentah,
+- cube: jalur yang dipakai aplikasi sekarang (AggregateCube + DateIndex).
+
+Per tahap dicatat waktu (min dan median dari --repeat), puncak RSS selama
+tahap, serta alokasi (tracemalloc, dijalankan terpisah agar tidak memengaruhi
+waktu). Hasil ditulis ke JSON untuk dibandingkan antar commit.
+
+Contoh:
+    python benchmarks/bench_pages.py --output bench.json
+    python benchmarks/bench_pages.py --sizes 10000 1000000 --compare bench_lama.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aggregates import AggregateCube  # noqa: E402
+from compact_schema import compact_tables  # noqa: E402
+from data_backend import PAGE_REQUIREMENTS, InMemoryBackend  # noqa: E402
+from data_generator import generate_data  # noqa: E402
+
+STAGES = ['kpis', 'monthly_trend', 'top_n', 'filtered_sales', 'supplier_merge',
+          'category_margin', 'roi']
+FILTER_START = date(2023, 3, 1)
+FILTER_END = date(2023, 8, 31)
+FILTER_CATEGORIES = ('Elektronik', 'Aksesori')
+
+try:
+    import psutil
+    _process = psutil.Process()
+
+    def current_rss():
+        return _process.memory_info().rss
+except ImportError:
+    def current_rss():
+        # Linux tanpa psutil: halaman resident dari /proc
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class RSSSampler:
+    """Sampling RSS di thread latar selama satu tahap untuk mendapatkan puncaknya."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start_rss = self.peak_rss = 0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+        return False
+
+
+# Jalur pandas: salinan logika halaman versi awal (sebelum kubus agregat)
+def pandas_kpis(ctx):
+    sales, products = ctx['sales'], ctx['products']
+    return {
+        'total_sales': sales['total_price'].sum(),
+        'total_products': products['product_id'].nunique(),
+        'total_inventory_value': (products['stock'] * products['unit_price']).sum(),
+        'avg_sale': sales['total_price'].mean()
+    }
+
+
+def pandas_monthly_trend(ctx):
+    sales = ctx['sales']
+    # Versi awal menulis kolom 'month' ke sales_df; di sini sebagai Series agar data tetap
+    month = sales['date'].dt.to_period('M').astype(str).rename('month')
+    return sales.groupby(month)['total_price'].sum().reset_index()
+
+
+def pandas_top_n(ctx):
+    product_sales = ctx['sales'].groupby('product_id').agg({
+        'quantity': 'sum',
+        'total_price': 'sum'
+    }).reset_index()
+    product_sales = product_sales.merge(ctx['products'][['product_id', 'product_name']], on='product_id')
+    return product_sales.nlargest(10, 'quantity')
+
+
+def pandas_filtered_sales(ctx):
+    sales, products = ctx['sales'], ctx['products']
+    filtered_sales = sales[
+        (sales['date'].dt.date >= FILTER_START) &
+        (sales['date'].dt.date <= FILTER_END)
+    ]
+    filtered_sales = filtered_sales.merge(products[['product_id', 'category']], on='product_id')
+    filtered_sales = filtered_sales[filtered_sales['category'].isin(FILTER_CATEGORIES)]
+    filtered_sales['total_price'].sum(), filtered_sales['total_price'].mean()
+    return filtered_sales
+
+
+def pandas_supplier_merge(ctx):
+    purchases_analysis = ctx['purchases'].merge(
+        ctx['suppliers'], on='supplier_id'
+    ).merge(
+        ctx['products'][['product_id', 'product_name', 'category']], on='product_id'
+    )
+    return purchases_analysis.groupby('supplier_name').agg({
+        'total_cost': 'sum',
+        'quantity': 'sum',
+        'product_id': 'nunique'
+    }).reset_index()
+
+
+def pandas_category_margin(ctx):
+    sales, purchases, products = ctx['sales'], ctx['purchases'], ctx['products']
+    category_revenue = sales.merge(
+        products[['product_id', 'category']], on='product_id'
+    ).groupby('category')['total_price'].sum().reset_index()
+    category_cost = purchases.merge(
+        products[['product_id', 'category']], on='product_id'
+    ).groupby('category')['total_cost'].sum().reset_index()
+    category_margin = category_revenue.merge(category_cost, on='category')
+    category_margin['margin'] = category_margin['total_price'] - category_margin['total_cost']
+    category_margin['margin_pct'] = (category_margin['margin'] / category_margin['total_price']) * 100
+    return category_margin
+
+
+def pandas_roi(ctx):
+    product_revenue = ctx['sales'].groupby('product_id')['total_price'].sum().reset_index()
+    product_cost = ctx['purchases'].groupby('product_id')['total_cost'].sum().reset_index()
+    product_profit = product_revenue.merge(product_cost, on='product_id', how='outer').fillna(0)
+    product_profit['profit'] = product_profit['total_price'] - product_profit['total_cost']
+    product_roi = product_profit.copy()
+    product_roi['roi'] = (product_roi['profit'] / product_roi['total_cost']) * 100
+    product_roi = product_roi[product_roi['total_cost'] > 0]
+    return product_roi.nlargest(5, 'roi')
+
+
+# Jalur cube: query yang dipakai analytics.py di atas kubus agregat
+def cube_kpis(ctx):
+    totals = ctx['cube'].sales_totals()
+    products = ctx['products']
+    return {
+        'total_sales': totals['total_price'],
+        'total_products': products['product_id'].nunique(),
+        'total_inventory_value': (products['stock'] * products['unit_price']).sum(),
+        'avg_sale': totals['mean_price']
+    }
+
+
+def cube_monthly_trend(ctx):
+    return ctx['cube'].monthly_sales()
+
+
+def cube_top_n(ctx):
+    product_sales = ctx['cube'].product_sales().merge(
+        ctx['products'][['product_id', 'product_name']], on='product_id'
+    )
+    return product_sales.nlargest(10, 'quantity')
+
+
+def cube_filtered_sales(ctx):
+    ctx['cube'].sales_totals(FILTER_START, FILTER_END, FILTER_CATEGORIES)
+    return ctx['backend'].load(
+        PAGE_REQUIREMENTS['Analisis Penjualan'], FILTER_START, FILTER_END, FILTER_CATEGORIES
+    )['sales']
+
+
+def cube_supplier_merge(ctx):
+    return ctx['cube'].supplier_purchases().merge(
+        ctx['suppliers'][['supplier_id', 'supplier_name']], on='supplier_id'
+    )
+
+
+def cube_category_margin(ctx):
+    cube = ctx['cube']
+    category_margin = cube.category_sales().merge(cube.category_purchases(), on='category')
+    category_margin['margin'] = category_margin['total_price'] - category_margin['total_cost']
+    category_margin['margin_pct'] = (category_margin['margin'] / category_margin['total_price']) * 100
+    return category_margin
+
+
+def cube_roi(ctx):
+    cube = ctx['cube']
+    product_revenue = cube.product_sales()[['product_id', 'total_price']]
+    product_cost = cube.product_purchases()[['product_id', 'total_cost']]
+    product_profit = product_revenue.merge(product_cost, on='product_id', how='outer').fillna(0)
+    product_profit['profit'] = product_profit['total_price'] - product_profit['total_cost']
+    product_roi = product_profit[product_profit['total_cost'] > 0].copy()
+    product_roi['roi'] = (product_roi['profit'] / product_roi['total_cost']) * 100
+    return product_roi.nlargest(5, 'roi')
+
+
+PATHS = {
+    'pandas': {stage: globals()[f'pandas_{stage}'] for stage in STAGES},
+    'cube': {stage: globals()[f'cube_{stage}'] for stage in STAGES}
+}
+
+
+def measure(func, *args, repeat=3, trace_allocations=True):
+    """Waktu min/median, puncak RSS dan alokasi tracemalloc satu fungsi."""
+    times = []
+    with RSSSampler() as sampler:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func(*args)
+            times.append(time.perf_counter() - start)
+            del result
+    stats = {
+        'wall_s': min(times),
+        'wall_median_s': statistics.median(times),
+        'peak_rss_mb': sampler.peak_rss / 1e6,
+        'rss_delta_mb': (sampler.peak_rss - sampler.start_rss) / 1e6
+    }
+    if trace_allocations:
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            result = func(*args)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stats['alloc_peak_mb'] = (peak - base) / 1e6
+        stats['alloc_retained_mb'] = (current - base) / 1e6
+        stats['rows_out'] = len(result) if hasattr(result, '__len__') else None
+        del result
+    return stats
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, paths, stages, repeat=3, trace_allocations=True, compact=False, seed=42):
+    results = []
+    for n_sales in sizes:
+        n_purchases = max(1, n_sales // 5)
+        row = {'size': n_sales, 'path': 'setup', 'stage': 'generate'}
+        row.update(measure(generate_data, n_sales, n_purchases, repeat=1, trace_allocations=False))
+        results.append(row)
+        data = generate_data(n_sales=n_sales, n_purchases=n_purchases, seed=seed)
+        if compact:
+            data = compact_tables(data)
+        ctx = dict(data)
+
+        if 'cube' in paths:
+            # Persiapan jalur cube (sekali per versi data di aplikasi)
+            for stage, func in (('build_cube', lambda: AggregateCube.build(
+                                    data['products'], data['sales'], data['purchases'])),
+                                ('build_date_index', lambda: InMemoryBackend(data))):
+                row = {'size': n_sales, 'path': 'cube', 'stage': stage}
+                row.update(measure(func, repeat=1, trace_allocations=trace_allocations))
+                results.append(row)
+            ctx['cube'] = AggregateCube.build(data['products'], data['sales'], data['purchases'])
+            ctx['backend'] = InMemoryBackend(data)
+
+        for path in paths:
+            for stage in stages:
+                row = {'size': n_sales, 'path': path, 'stage': stage}
+                row.update(measure(PATHS[path][stage], ctx, repeat=repeat,
+                                   trace_allocations=trace_allocations))
+                results.append(row)
+                print(f"{n_sales:>12,d} {path:>7} {stage:>18} {row['wall_s']:10.4f} s "
+                      f"{row['peak_rss_mb']:10.1f} MB RSS", flush=True)
+        del ctx, data
+    return results
+
+
+def compare(results, baseline):
+    """Rasio waktu terhadap file JSON hasil commit lain (>1 berarti lebih lambat)."""
+    current = pd.DataFrame(results).set_index(['size', 'path', 'stage'])
+    previous = pd.DataFrame(baseline['results']).set_index(['size', 'path', 'stage'])
+    joined = current[['wall_s']].join(previous[['wall_s']], rsuffix='_baseline', how='inner')
+    joined['ratio'] = joined['wall_s'] / joined['wall_s_baseline']
+    return joined.reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000],
+                        help='jumlah baris penjualan yang diuji')
+    parser.add_argument('--paths', nargs='+', choices=list(PATHS), default=list(PATHS))
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-allocations', action='store_true',
+                        help='lewati pengukuran alokasi tracemalloc (lebih cepat)')
+    parser.add_argument('--compact', action='store_true', help='pakai skema ringkas')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench_pages.json')
+    parser.add_argument('--compare', help='file JSON hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.paths, args.stages, args.repeat,
+                  not args.no_allocations, args.compact, args.seed)
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args)
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2, default=float)
+    print(f'{len(results)} hasil ditulis ke {args.output}')
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            comparison = compare(results, json.load(baseline))
+        with pd.option_context('display.width', 120, 'display.float_format', '{:,.4f}'.format):
+            print(comparison.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark pembangunan kubus agregat: serial vs process pool per jumlah worker.
+
+Untuk setiap ukuran data, kubus dibangun dengan AggregateCube.build() (jalur
+lama), lalu dengan parallel.build_cube() untuk setiap jumlah worker. Dicetak
+waktu terbaik dari --repeat, speedup terhadap 1 worker dan efisiensi
+(speedup / worker). Hasil setiap jumlah worker dibandingkan dengan hasil
+serial sehingga benchmark juga memeriksa determinisme.
+
+Kolom 'induk' adalah waktu fase yang tetap serial di proses induk (ekspor
+kolom + decode kubus); dari fraksinya terhadap waktu 1 worker dihitung batas
+speedup Amdahl untuk jumlah worker itu. Speedup yang diukur hanya bermakna
+jika mesin punya core sebanyak jumlah worker.
+
+Contoh:
+    python benchmarks/bench_parallel.py
+    python benchmarks/bench_parallel.py --sizes 10000000 --workers 1 2 4 8 16 32
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parallel  # noqa: E402
+from aggregates import AggregateCube  # noqa: E402
+from data_generator import generate_data  # noqa: E402
+
+
+PARENT_PHASES = ('export', 'decode')
+
+
+def _best_time(func, repeat):
+    # (waktu terbaik, hasil, timings per fase dari run terbaik)
+    best, result, best_timings = float('inf'), None, {}
+    for _ in range(repeat):
+        timings = {}
+        start = time.perf_counter()
+        result = func(timings)
+        elapsed = time.perf_counter() - start
+        if elapsed < best:
+            best, best_timings = elapsed, timings
+    return best, result, best_timings
+
+
+def _parent_time(timings):
+    return sum(timings.get(phase, 0.0) for phase in PARENT_PHASES)
+
+
+def _same_cube(left, right):
+    for table in ('sales', 'purchases'):
+        try:
+            pd.testing.assert_frame_equal(getattr(left, table), getattr(right, table),
+                                          check_exact=True)
+        except AssertionError:
+            return False
+    return True
+
+
+def main(argv=None):
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, 16, 32, cpu_count} & set(range(1, cpu_count + 1)))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000, 10_000_000],
+                        help='jumlah baris penjualan yang diuji')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers)
+    parser.add_argument('--n-products', type=int, default=2000)
+    parser.add_argument('--n-suppliers', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    # Benchmark selalu memakai process pool, berapa pun ukuran datanya
+    parallel.MIN_PARALLEL_ROWS = 0
+
+    print(f'{os.cpu_count()} CPU')
+    print(f"{'baris':>12} {'jalur':>14} {'waktu (s)':>10} {'speedup':>8} {'efisiensi':>10} "
+          f"{'induk (s)':>10} {'batas':>7} {'identik':>8}")
+    for n_sales in args.sizes:
+        data = generate_data(n_sales=n_sales, n_purchases=max(1, n_sales // 5),
+                             n_products=args.n_products, n_suppliers=args.n_suppliers)
+        products, sales, purchases = data['products'], data['sales'], data['purchases']
+
+        legacy_time, _, _ = _best_time(
+            lambda timings: AggregateCube.build(products, sales, purchases), args.repeat)
+        print(f"{n_sales:12,d} {'cube.build':>14} {legacy_time:10.3f} {'-':>8} {'-':>10} "
+              f"{'-':>10} {'-':>7} {'-':>8}")
+
+        # Acuan speedup dan determinisme: jalur serial (1 worker)
+        serial_time, serial, serial_timings = _best_time(
+            lambda timings: parallel.build_cube(products, sales, purchases, workers=1, timings=timings),
+            args.repeat)
+        for workers in args.workers:
+            if workers == 1:
+                elapsed, cube, timings = serial_time, serial, serial_timings
+            else:
+                # Start worker (sekali per server di aplikasi) tidak ikut diukur
+                list(parallel.get_executor(workers).map(int, range(2 * workers)))
+                elapsed, cube, timings = _best_time(
+                    lambda timings: parallel.build_cube(products, sales, purchases, workers=workers,
+                                                        timings=timings),
+                    args.repeat)
+            speedup = serial_time / elapsed
+            parent = _parent_time(timings)
+            # Amdahl: bagian induk tetap serial, sisanya dibagi rata ke worker
+            serial_share = min(parent / serial_time, 1.0)
+            bound = 1 / (serial_share + (1 - serial_share) / workers)
+            identical = 'ya' if _same_cube(serial, cube) else 'TIDAK'
+            print(f"{n_sales:12,d} {f'{workers} worker':>14} {elapsed:10.3f} {speedup:7.2f}x "
+                  f"{speedup / workers:10.0%} {parent:10.3f} {bound:6.1f}x {identical:>8}", flush=True)
+        del data, products, sales, purchases
+
+
+if __name__ == '__main__':
+    main()
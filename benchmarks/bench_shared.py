@@ -0,0 +1,105 @@
+"""Benchmark memori N proses: salinan per proses vs dataset bersama (shared_store).
+
+Setiap proses memuat data seperti server Streamlit (InMemoryBackend), lalu
+menunggu sampai semua proses selesai memuat sehingga memori diukur bersamaan.
+Dicatat RSS dan PSS (Proportional Set Size, halaman bersama dibagi rata ke
+proses yang memetakannya) dari /proc/<pid>/smaps_rollup. Jumlah PSS semua
+proses adalah memori fisik yang benar-benar dipakai.
+
+Contoh:
+    python benchmarks/bench_shared.py --n-sales 10000000 --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import shared_store  # noqa: E402
+from data_backend import InMemoryBackend  # noqa: E402
+from data_generator import generate_data  # noqa: E402
+
+
+def memory_kb(pid='self'):
+    """(RSS, PSS) dalam kB dari smaps_rollup (Linux)."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            name, _, rest = line.partition(':')
+            if name in ('Rss', 'Pss'):
+                values[name] = int(rest.split()[0])
+    return values['Rss'], values['Pss']
+
+
+def _load(args):
+    data = generate_data(n_sales=args.n_sales, n_purchases=args.n_sales // 5,
+                         n_products=args.n_products)
+    if args.compact:
+        from compact_schema import compact_tables
+        data = compact_tables(data)
+    return data
+
+
+def _worker(mode, args, directory, ready, done, results):
+    if mode == 'copy':
+        backend = InMemoryBackend(_load(args))
+    else:
+        backend = shared_store.SharedBackend(directory)
+    # Sentuh semua kolom transaksi seperti saat membangun kubus
+    for index in backend.indexes.values():
+        for column in index.rows.columns:
+            values = index.rows[column]
+            if hasattr(values, 'cat'):
+                values.array.codes.sum()
+            elif values.dtype.kind in 'biufmM':
+                values.to_numpy().view('u1').sum()
+    ready.wait()
+    results.put(memory_kb())
+    done.wait()
+
+
+def run(mode, args, directory):
+    context = multiprocessing.get_context('spawn')
+    ready = context.Barrier(args.workers + 1)
+    done = context.Event()
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(mode, args, directory, ready, done, results))
+                 for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    ready.wait()
+    measurements = [results.get() for _ in processes]
+    done.set()
+    for process in processes:
+        process.join()
+    return measurements
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n-sales', type=int, default=1_000_000)
+    parser.add_argument('--n-products', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--compact', action='store_true', help='pakai skema ringkas (kedua mode)')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(shared_store.DEFAULT_DIR)) as directory:
+        data = _load(args)
+        shared_store.publish(data, directory)
+        size_mb = sum(shared_store.table_bytes(directory).values()) / 1e6
+        del data
+
+        print(f'{args.workers} proses, dataset bersama {size_mb:,.1f} MB')
+        print(f"{'mode':>8} {'RSS/proses (MB)':>16} {'PSS/proses (MB)':>16} {'total PSS (MB)':>15}")
+        for mode in ('copy', 'shared'):
+            measurements = run(mode, args, directory)
+            rss = sum(m[0] for m in measurements) / len(measurements) / 1e3
+            pss = [m[1] / 1e3 for m in measurements]
+            print(f'{mode:>8} {rss:16,.1f} {sum(pss) / len(pss):16,.1f} {sum(pss):15,.1f}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark cold start: impor modul, muat data, dan time-to-first-render.
+
+Setiap pengukuran berjalan di proses Python baru agar impor dan cache benar-
+benar dingin. Waktu dihitung dari proses dimulai (profiling.process_uptime).
+
+- impor: durasi impor tiap modul berat (modul yang tidak terpasang dilewati),
+- data: impor + muat tabel + bangun kubus agregat, seperti server sebelum
+  render pertama, untuk tiga skenario:
+    tanpa cache  INVENTORY_CACHE_DIR kosong (generate_data setiap start),
+    cache dingin cache disk belum ada (generate + tulis),
+    cache hangat cache disk sudah ada (memory map),
+- app: time-to-first-render aplikasi Streamlit headless (AppTest) untuk
+  skenario yang sama; dilewati jika streamlit tidak terpasang.
+
+Contoh:
+    python benchmarks/bench_startup.py --n-sales 1000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HEAVY_MODULES = ['numpy', 'pandas', 'streamlit', 'plotly.express', 'plotly.graph_objects']
+
+
+def _child_imports():
+    import importlib
+    import time
+    result = {}
+    for name in HEAVY_MODULES:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        result[name] = time.perf_counter() - start
+    return result
+
+
+def _child_data():
+    import time
+    import profiling
+    start = time.perf_counter()
+    import disk_cache
+    import parallel
+    from aggregates import CUBE_REQUIREMENTS
+    from data_backend import InMemoryBackend
+    result = {'imports': time.perf_counter() - start}
+
+    start = time.perf_counter()
+    backend = InMemoryBackend(disk_cache.load_synthetic())
+    products = backend.load({'products': None})['products']
+    result['load'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    raw = backend.load(CUBE_REQUIREMENTS)
+    parallel.build_cube(products, raw['sales'], raw['purchases'])
+    result['cube'] = time.perf_counter() - start
+    result['uptime'] = profiling.process_uptime()
+    return result
+
+
+def _child_app():
+    from streamlit.testing.v1 import AppTest
+    import profiling
+    app = AppTest.from_file(os.path.join(ROOT, 'inventory_management.py'), default_timeout=3600)
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return {'uptime': profiling.process_uptime()}
+
+
+CHILDREN = {'imports': _child_imports, 'data': _child_data, 'app': _child_app}
+
+
+def run_child(mode, env):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode],
+        env=dict(os.environ, **env), cwd=ROOT, capture_output=True, text=True
+    )
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr.strip().splitlines()[-1])
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n-sales', type=int, default=1_000_000)
+    parser.add_argument('--n-products', type=int, default=20)
+    parser.add_argument('--compact', action='store_true')
+    parser.add_argument('--child', choices=list(CHILDREN), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(CHILDREN[args.child]()))
+        return
+
+    print('Impor modul (proses baru)')
+    for name, seconds in run_child('imports', {}).items():
+        print(f'{name:>22}: {seconds:7.3f} detik')
+
+    try:
+        import streamlit  # noqa: F401
+        modes = ['data', 'app']
+    except ImportError:
+        print('streamlit tidak terpasang: time-to-first-render app dilewati')
+        modes = ['data']
+
+    base = {
+        'INVENTORY_N_SALES': str(args.n_sales),
+        'INVENTORY_N_PURCHASES': str(args.n_sales // 5),
+        'INVENTORY_N_PRODUCTS': str(args.n_products),
+        'INVENTORY_COMPACT': '1' if args.compact else '0',
+        'INVENTORY_WARM_WORKERS': '0'
+    }
+    for mode in modes:
+        print(f'\n{mode}: {args.n_sales:,} penjualan')
+        print(f"{'skenario':>14} {'impor':>8} {'muat':>8} {'kubus':>8} {'start->render':>14}")
+        with tempfile.TemporaryDirectory() as directory:
+            scenarios = [('tanpa cache', ''), ('cache dingin', directory), ('cache hangat', directory)]
+            for label, cache_dir in scenarios:
+                result = run_child(mode, dict(base, INVENTORY_CACHE_DIR=cache_dir))
+                cells = [f"{result[key]:8.3f}" if key in result else f"{'-':>8}"
+                         for key in ('imports', 'load', 'cube')]
+                print(f"{label:>14} {' '.join(cells)} {result['uptime']:14.3f}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Klasifikasi ABC/XYZ, perputaran persediaan dan slow mover seluruh katalog.
+
+Satu lintasan vektor atas penjualan (baris mentah atau kubus harian
+AggregateCube.sales dengan date_column='day'): kode produk dan nomor periode
+per baris, lalu bincount pendapatan dan kuantitas per produk, kuantitas per
+(produk, periode), serta hari penjualan terakhir per produk.
+
+- ABC (Pareto pendapatan): SKU diurutkan menurut pendapatan; kontribusi
+  kumulatif sampai 80% = A, sampai 95% = B, sisanya (dan tanpa penjualan) C.
+- XYZ (variabilitas permintaan): koefisien variasi kuantitas per periode
+  (periode tanpa penjualan = 0). CV <= 0.5 = X, <= 1.0 = Y, sisanya Z.
+- Perputaran = unit terjual per tahun / stok sekarang; days-of-supply = stok /
+  permintaan harian rata-rata.
+- Slow mover: masih ada stok tetapi tidak terjual selama batas hari
+  (SLOW_MOVER_DAYS) sampai hari terakhir data. Days-of-supply tinggi saja
+  tidak cukup: SKU yang baru terjual tetapi stoknya besar adalah overstock,
+  terlihat di kolom days_of_supply, bukan barang yang berhenti laku.
+
+Menjalankan tanpa Streamlit:
+    python classification.py --output abc_xyz.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import dimension_codes
+
+ABC_CLASSES = ('A', 'B', 'C')
+XYZ_CLASSES = ('X', 'Y', 'Z')
+ABC_THRESHOLDS = (0.80, 0.95)   # kontribusi pendapatan kumulatif
+XYZ_THRESHOLDS = (0.5, 1.0)     # koefisien variasi
+SLOW_MOVER_DAYS = 180
+DAYS_PER_YEAR = 365
+PERIOD_FREQS = {'M': 'Bulanan', 'W': 'Mingguan'}
+
+
+def _period_numbers(days, freq):
+    # Nomor periode dari nomor hari (epoch): bulan kalender atau minggu Senin-Minggu
+    if freq == 'M':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    if freq == 'W':
+        # 1970-01-01 adalah Kamis; geser agar minggu mulai Senin
+        return (days + 3) // 7
+    raise ValueError(f'freq tidak dikenal: {freq}')
+
+
+def abc_classes(revenue, thresholds=ABC_THRESHOLDS):
+    """(kelas, kontribusi kumulatif, peringkat) ABC dari pendapatan per SKU."""
+    revenue = np.asarray(revenue, dtype=np.float64)
+    order = np.argsort(-revenue, kind='stable')
+    total = revenue.sum()
+    cumulative = np.zeros(len(revenue))
+    if total > 0:
+        cumulative[order] = np.cumsum(revenue[order]) / total
+    rank = np.empty(len(revenue), dtype=np.int64)
+    rank[order] = np.arange(1, len(revenue) + 1)
+    # Kelas ditentukan oleh kontribusi kumulatif sebelum SKU ini, sehingga SKU
+    # yang melewati batas 80% tetap masuk A
+    before = cumulative - np.where(total > 0, revenue / max(total, 1e-12), 0.0)
+    classes = np.searchsorted(np.asarray(thresholds), before, side='right')
+    classes[revenue <= 0] = len(ABC_CLASSES) - 1
+    return np.asarray(ABC_CLASSES)[classes], cumulative, rank
+
+
+def xyz_classes(cv, thresholds=XYZ_THRESHOLDS):
+    """Kelas XYZ dari koefisien variasi; CV tak terdefinisi (tanpa penjualan) = Z."""
+    cv = np.asarray(cv, dtype=np.float64)
+    classes = np.searchsorted(np.asarray(thresholds), cv, side='left')
+    classes[~np.isfinite(cv)] = len(XYZ_CLASSES) - 1
+    return np.asarray(XYZ_CLASSES)[classes]
+
+
+def classify_catalog(products, sales, date_column='date', freq='M',
+                     abc_thresholds=ABC_THRESHOLDS, xyz_thresholds=XYZ_THRESHOLDS,
+                     slow_days=SLOW_MOVER_DAYS):
+    """Tabel klasifikasi seluruh katalog, satu baris per produk (urutan tabel produk).
+
+    `sales` cukup punya product_id, quantity, total_price dan kolom tanggal.
+    """
+    product_ids = products['product_id']
+    n_products = len(product_ids)
+    stock = products['stock'].to_numpy(dtype=np.float64)
+
+    revenue = np.zeros(n_products)
+    quantity = np.zeros(n_products)
+    cv = np.full(n_products, np.nan)
+    last_day = np.full(n_products, np.iinfo(np.int64).min)
+    n_days, n_periods, data_end = 0, 0, 0
+    if len(sales):
+        codes = dimension_codes(sales['product_id'], product_ids)
+        days = sales[date_column].to_numpy(dtype='datetime64[D]').astype(np.int64)
+        known = codes >= 0
+        code, days = codes[known], days[known]
+        units = sales['quantity'].to_numpy()[known].astype(np.float64)
+        first, data_end = days.min(), days.max()
+        n_days = int(data_end - first) + 1
+
+        revenue = np.bincount(code, weights=sales['total_price'].to_numpy()[known].astype(np.float64),
+                              minlength=n_products)
+        quantity = np.bincount(code, weights=units, minlength=n_products)
+        np.maximum.at(last_day, code, days)
+
+        # Kuantitas per (produk, periode) lalu momen per produk; periode kosong = 0
+        periods = _period_numbers(days, freq)
+        first_period = periods.min()
+        n_periods = int(periods.max() - first_period) + 1
+        per_period = np.bincount(code * n_periods + (periods - first_period), weights=units,
+                                 minlength=n_products * n_periods).reshape(n_products, n_periods)
+        mean = per_period.mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = np.where(mean > 0, per_period.std(axis=1) / mean, np.nan)
+
+    abc, cumulative, rank = abc_classes(revenue, abc_thresholds)
+    xyz = xyz_classes(cv, xyz_thresholds)
+    daily_demand = quantity / n_days if n_days else np.zeros(n_products)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        turnover = np.where(stock > 0, daily_demand * DAYS_PER_YEAR / stock,
+                            np.where(daily_demand > 0, np.inf, 0.0))
+        days_of_supply = np.where(daily_demand > 0, stock / daily_demand,
+                                  np.where(stock > 0, np.inf, 0.0))
+    sold = last_day > np.iinfo(np.int64).min
+    days_since_sale = np.where(sold, data_end - last_day, np.inf)
+    slow_mover = (stock > 0) & (days_since_sale > slow_days)
+    total_revenue = revenue.sum()
+
+    result = pd.DataFrame({
+        'product_id': product_ids.to_numpy(),
+        'stock': products['stock'].to_numpy(),
+        'revenue': revenue,
+        'revenue_share': revenue / total_revenue if total_revenue > 0 else revenue,
+        'cumulative_share': cumulative,
+        'revenue_rank': rank,
+        'units_sold': quantity,
+        'demand_cv': cv,
+        'abc': pd.Categorical(abc, categories=ABC_CLASSES),
+        'xyz': pd.Categorical(xyz, categories=XYZ_CLASSES),
+        'turnover': turnover,
+        'days_of_supply': days_of_supply,
+        'days_since_last_sale': days_since_sale,
+        'slow_mover': slow_mover
+    })
+    result.insert(10, 'class', result['abc'].astype(str) + result['xyz'].astype(str))
+    for column in ('category', 'product_name'):
+        if column in products.columns:
+            result.insert(1, column, products[column].to_numpy())
+    result.attrs.update(n_days=n_days, n_periods=n_periods, freq=freq)
+    return result
+
+
+def class_matrix(classified, value='count'):
+    """Matriks 3x3 ABC (baris) x XYZ (kolom): jumlah SKU atau total kolom `value`."""
+    grouped = classified.groupby(['abc', 'xyz'], observed=False)
+    table = grouped.size() if value == 'count' else grouped[value].sum()
+    return table.unstack('xyz').reindex(index=list(ABC_CLASSES), columns=list(XYZ_CLASSES),
+                                        fill_value=0)
+
+
+def main(argv=None):
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='Klasifikasi ABC/XYZ seluruh katalog (headless)')
+    parser.add_argument('--output', default='abc_xyz.csv', help='file .csv atau .parquet')
+    parser.add_argument('--freq', choices=list(PERIOD_FREQS), default='M',
+                        help='periode untuk variabilitas permintaan')
+    parser.add_argument('--slow-days', type=int, default=SLOW_MOVER_DAYS)
+    parser.add_argument('--slow-only', action='store_true', help='hanya slow mover')
+    args = parser.parse_args(argv)
+
+    backend = backend_from_env()
+    data = backend.load({
+        'products': None,
+        'sales': ['date', 'product_id', 'quantity', 'total_price']
+    })
+    classified = classify_catalog(data['products'], data['sales'], freq=args.freq,
+                                  slow_days=args.slow_days)
+    print(class_matrix(classified).to_string())
+    if args.slow_only:
+        classified = classified[classified['slow_mover']]
+
+    if args.output.endswith('.parquet'):
+        classified.to_parquet(args.output, index=False)
+    else:
+        classified.to_csv(args.output, index=False)
+    print(f"{len(classified):,} produk ditulis ke {args.output} "
+          f"({int(classified['slow_mover'].sum()):,} slow mover)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Skema ringkas untuk keempat tabel.
+
+- ID transaksi (sale_id, purchase_id) menjadi angka integer; prefiks disimpan
+  di df.attrs agar bisa dikembalikan ke bentuk teks.
+- product_id, supplier_id dan category menjadi Categorical. Di tabel transaksi
+  kategorinya sama persis dengan urutan tabel dimensi, jadi kode Categorical
+  adalah posisi baris di tabel produk/supplier (lookup lewat array, tanpa join).
+- quantity memakai int16/int32, stok int32, nilai uang int64 fixed-point
+  (rupiah penuh, MONEY_SCALE = 1).
+
+Laporan memori sebelum/sesudah:
+    python compact_schema.py --n-sales 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+MONEY_COLUMNS = ['unit_price', 'total_price', 'unit_cost', 'total_cost']
+MONEY_SCALE = 1  # jumlah satuan terkecil per rupiah
+QUANTITY_COLUMNS = ['quantity', 'stock']
+ID_PREFIXES = {'sale_id': 'S', 'purchase_id': 'PUR'}
+
+
+def smallest_int(values, minimum=np.int16):
+    """Tipe integer bertanda terkecil (mulai dari `minimum`) yang memuat semua nilai."""
+    values = np.asarray(values)
+    low, high = (values.min(), values.max()) if values.size else (0, 0)
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        if np.dtype(dtype).itemsize < np.dtype(minimum).itemsize:
+            continue
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+
+def to_money(values, scale=MONEY_SCALE):
+    # Nilai uang sebagai int64 fixed-point (dibulatkan ke satuan terkecil)
+    return np.rint(np.asarray(values, dtype=np.float64) * scale).astype(np.int64)
+
+
+def _id_codes(series, prefix):
+    # 'S0042' -> 42; jika format tidak cocok, pakai Categorical
+    text = series.astype(str)
+    if text.str.startswith(prefix).all():
+        numbers = pd.to_numeric(text.str.slice(len(prefix)), errors='coerce')
+        if not numbers.isna().any():
+            return numbers.to_numpy().astype(smallest_int(numbers, np.int32))
+    return pd.Categorical(series)
+
+
+def _dimension_codes(series, dimension):
+    # Categorical dengan kategori = urutan tabel dimensi (kode = posisi baris)
+    categories = pd.Index(dimension.astype(str))
+    if isinstance(series.dtype, pd.CategoricalDtype) and series.cat.categories.equals(categories):
+        return series
+    return pd.Categorical(series.astype(str), categories=categories)
+
+
+def compact_table(table, df, dimensions=None):
+    """Salinan satu tabel dengan tipe kolom yang ringkas."""
+    dimensions = dimensions or {}
+    result = {}
+    attrs = dict(df.attrs)
+    for column in df.columns:
+        values = df[column]
+        if column in ID_PREFIXES:
+            result[column] = _id_codes(values, ID_PREFIXES[column])
+            attrs[f'{column}_prefix'] = ID_PREFIXES[column]
+        elif column in ('product_id', 'supplier_id'):
+            key = 'products' if column == 'product_id' else 'suppliers'
+            if table != key and key in dimensions:
+                result[column] = _dimension_codes(values, dimensions[key][column])
+            else:
+                result[column] = pd.Categorical(values.astype(str), categories=pd.unique(values.astype(str)))
+        elif column == 'category':
+            result[column] = pd.Categorical(values.astype(str))
+        elif column in MONEY_COLUMNS:
+            result[column] = to_money(values)
+            attrs['money_scale'] = MONEY_SCALE
+        elif column in QUANTITY_COLUMNS:
+            result[column] = values.to_numpy().astype(
+                smallest_int(values.to_numpy(), np.int16 if column == 'quantity' else np.int32))
+        else:
+            result[column] = values
+    compact = pd.DataFrame(result, index=df.index)
+    compact.attrs = attrs
+    return compact
+
+
+def compact_tables(data):
+    """Versi ringkas dari dict tabel load_data(); dimensi diproses lebih dulu."""
+    compact = {}
+    for table in ('products', 'suppliers'):
+        if table in data:
+            compact[table] = compact_table(table, data[table])
+    for table in ('sales', 'purchases'):
+        if table in data:
+            compact[table] = compact_table(table, data[table], compact)
+    return compact
+
+
+def restore_ids(df, column):
+    """Kembalikan kolom ID integer ke bentuk teks, mis. 42 -> 'S0042'."""
+    prefix = df.attrs.get(f'{column}_prefix')
+    values = df[column]
+    if prefix is None or not np.issubdtype(values.dtype, np.integer):
+        return values.astype(str)
+    width = max(4, len(str(values.max()))) if len(values) else 4
+    return prefix + values.astype(str).str.zfill(width)
+
+
+def dimension_codes(values, dimension_ids):
+    """Posisi setiap nilai ID di tabel dimensi (-1 jika tidak dikenal).
+
+    Kolom Categorical cukup memetakan kategorinya; kolom teks di-factorize dulu
+    sehingga hashing ke tabel dimensi hanya untuk nilai unik.
+    """
+    dimension_index = pd.Index(dimension_ids)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    mapping = np.append(dimension_index.get_indexer(uniques), -1)
+    return mapping[codes]
+
+
+def dimension_lookup(codes_or_series, dimension_values):
+    """Ambil atribut dimensi (mis. nama produk) lewat array kode, bukan join string."""
+    codes = codes_or_series
+    if isinstance(codes_or_series, pd.Series) and isinstance(codes_or_series.dtype, pd.CategoricalDtype):
+        codes = codes_or_series.cat.codes.to_numpy()
+    values = np.asarray(dimension_values)
+    return values[np.asarray(codes)]
+
+
+def table_memory(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(before, after, by_column=False):
+    """Perbandingan memori per tabel (atau per kolom) sebelum dan sesudah compact."""
+    rows = []
+    for table, df in before.items():
+        if table not in after:
+            continue
+        if by_column:
+            old = df.memory_usage(deep=True, index=False)
+            new = after[table].memory_usage(deep=True, index=False)
+            for column in df.columns:
+                rows.append({
+                    'table': table,
+                    'column': column,
+                    'dtype_before': str(df[column].dtype),
+                    'dtype_after': str(after[table][column].dtype),
+                    'before_mb': old[column] / 1e6,
+                    'after_mb': new[column] / 1e6
+                })
+        else:
+            rows.append({
+                'table': table,
+                'rows': len(df),
+                'before_mb': table_memory(df) / 1e6,
+                'after_mb': table_memory(after[table]) / 1e6
+            })
+    report = pd.DataFrame(rows)
+    if not report.empty:
+        report['ratio'] = report['before_mb'] / report['after_mb'].where(report['after_mb'] > 0)
+    return report
+
+
+def main(argv=None):
+    from data_generator import generate_data
+
+    parser = argparse.ArgumentParser(description='Laporan memori skema lama vs ringkas')
+    parser.add_argument('--n-sales', type=int, default=1_000_000)
+    parser.add_argument('--n-purchases', type=int, default=200_000)
+    parser.add_argument('--by-column', action='store_true')
+    args = parser.parse_args(argv)
+
+    data = generate_data(n_sales=args.n_sales, n_purchases=args.n_purchases)
+    compact = compact_tables(data)
+    with pd.option_context('display.width', 120, 'display.float_format', '{:,.2f}'.format):
+        print(memory_report(data, compact, by_column=args.by_column).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
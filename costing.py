@@ -0,0 +1,403 @@
+"""Harga pokok penjualan (COGS), margin kotor dan ROI per produk.
+
+Pembelian menjadi lot biaya, penjualan mengonsumsi lot tersebut; pembelian
+stok yang belum terjual tidak dihitung sebagai biaya. Dua metode:
+
+- FIFO: per produk, lot diurutkan per hari dan nilai kumulatifnya membentuk
+  fungsi piecewise-linear F(unit ke-x). COGS penjualan = F(terjual sesudah) -
+  F(terjual sebelum), dihitung untuk semua produk sekaligus dengan satu
+  np.interp di atas sumbu kumulatif global. Penjualan yang melebihi semua lot
+  dihargai dengan biaya lot terakhir; saat lot baru masuk, selisihnya
+  dikoreksi di total produk (total produk selalu = F(total terjual)).
+- Rata-rata tertimbang bergerak: biaya rata-rata diperbarui setiap pembelian
+  dan dipakai untuk penjualan sesudahnya. Rekurensi ini dijalankan per urutan
+  kejadian, setiap langkah vektor untuk seluruh katalog, sehingga jumlah
+  langkah = jumlah hari bergerak terbanyak satu produk, bukan jumlah baris.
+
+Pergerakan diringkas dulu per (produk, hari); pembelian pada hari yang sama
+tersedia untuk penjualan hari itu. Saldo awal diambil dari ledger.fit_opening()
+(stok produk dikurangi pergerakan bersih, dinaikkan agar stok berjalan tidak
+pernah negatif), sama dengan ledger.StockLedger, dan menjadi lot pembuka
+dengan biaya rata-rata pembelian produk. COGS per transaksi penjualan adalah
+quantity x COGS per unit hari itu.
+
+append() menambahkan transaksi baru tanpa menghitung ulang riwayat.
+appended() melakukannya pada salinan, dan hanya jika hasilnya sama dengan
+membangun ulang: semua transaksi baru jatuh sesudah hari terakhir yang sudah
+diproses dan tidak membuat stok berjalan negatif (saldo awal hasil
+fit_opening tidak berubah). analytics.cost_ledger memakainya untuk agregat
+hasil ingestion (AggregateCube.changes_since).
+
+Menjalankan tanpa Streamlit:
+    python costing.py --method fifo --output margin.csv
+"""
+import argparse
+import copy
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import dimension_codes
+from ledger import fit_opening, net_movements
+from replenishment import unit_costs
+
+METHODS = ('fifo', 'weighted_average')
+METHOD_LABELS = {
+    'fifo': 'FIFO',
+    'weighted_average': 'Rata-rata Tertimbang'
+}
+_OPENING_DAY = np.iinfo(np.int64).min  # lot pembuka selalu paling awal
+_DAY_KEY = np.int64(1) << 32
+
+
+def _day_numbers(dates):
+    return dates.to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def daily_movements(rows, product_ids, amount_column, date_column='date'):
+    """(kode produk, hari, quantity, nilai) per (produk, hari), terurut per (produk, hari).
+
+    `rows` boleh baris mentah atau kubus agregat (date_column='day'); baris
+    dengan produk yang tidak dikenal diabaikan.
+    """
+    if rows is None or len(rows) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float64), np.array([], dtype=np.float64)
+    codes = dimension_codes(rows['product_id'], product_ids)
+    known = codes >= 0
+    frame = pd.DataFrame({
+        'code': codes[known].astype(np.int64),
+        'day': _day_numbers(rows[date_column])[known],
+        'quantity': rows['quantity'].to_numpy()[known].astype(np.float64),
+        'amount': rows[amount_column].to_numpy()[known].astype(np.float64)
+    })
+    daily = frame.groupby(['code', 'day'], sort=True).sum()
+    code = daily.index.get_level_values('code').to_numpy()
+    day = daily.index.get_level_values('day').to_numpy()
+    return code, day, daily['quantity'].to_numpy(), daily['amount'].to_numpy()
+
+
+def _rank_within(codes):
+    # Urutan kejadian di dalam setiap produk (codes sudah terurut)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+    return np.arange(len(codes)) - group_start
+
+
+def _cumsum_within(codes, values):
+    # Jumlah kumulatif eksklusif di dalam setiap produk (codes sudah terurut)
+    total = np.cumsum(values)
+    exclusive = total - values
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    base = np.repeat(exclusive[starts], np.diff(np.r_[starts, len(codes)]))
+    return exclusive - base
+
+
+class CostLedger:
+    """COGS dan margin seluruh katalog dengan FIFO atau rata-rata tertimbang bergerak."""
+
+    def __init__(self, product_ids, opening_stock, opening_cost, method='fifo'):
+        if method not in METHODS:
+            raise ValueError(f'Metode costing tidak dikenal: {method}')
+        self.method = method
+        self.product_ids = pd.Index(product_ids)
+        n_products = len(self.product_ids)
+        opening_stock = np.asarray(opening_stock, dtype=np.float64)
+        self.opening_cost = np.asarray(opening_cost, dtype=np.float64)
+
+        self.units_sold = np.zeros(n_products)
+        self.revenue = np.zeros(n_products)
+        self.purchase_spend = np.zeros(n_products)
+        self._daily = []
+        self.last_day = None
+        self.version = 0
+
+        if method == 'fifo':
+            # Lot: (kode, hari, quantity, nilai); lot pembuka dari saldo awal
+            has_opening = opening_stock > 0
+            self.layer_code = np.flatnonzero(has_opening).astype(np.int64)
+            self.layer_day = np.full(len(self.layer_code), _OPENING_DAY, dtype=np.int64)
+            self.layer_quantity = opening_stock[has_opening]
+            self.layer_value = opening_stock[has_opening] * self.opening_cost[has_opening]
+            self._build_curve()
+        else:
+            self.on_hand = opening_stock.copy()
+            self.average_cost = self.opening_cost.copy()
+            self.cogs_total = np.zeros(n_products)
+
+    @classmethod
+    def from_transactions(cls, products, sales=None, purchases=None, method='fifo',
+                          date_column='date'):
+        """Dari baris mentah atau kubus agregat (date_column='day'); stok produk = saldo penutup."""
+        product_ids = products['product_id']
+        _, codes, quantity = net_movements(product_ids, sales, purchases, date_column)
+        opening_stock, _ = fit_opening(products['stock'].to_numpy(), codes, quantity)
+        has_purchases = purchases is not None and len(purchases)
+        opening_cost = unit_costs(purchases if has_purchases else pd.DataFrame(), products)
+        ledger = cls(product_ids, opening_stock, opening_cost, method)
+        return ledger.append(sales, purchases, date_column)
+
+    @classmethod
+    def from_cube(cls, cube, products, method='fifo'):
+        return cls.from_transactions(products, cube.sales, cube.purchases, method, 'day')
+
+    @property
+    def n_products(self):
+        return len(self.product_ids)
+
+    def on_hand_units(self):
+        """Stok per produk sesudah transaksi terakhir yang diproses."""
+        if self.method == 'fifo':
+            return self.total_in - self.units_sold
+        return self.on_hand.copy()
+
+    def copy(self):
+        """Salinan yang bisa di-append() tanpa mengubah ledger ini.
+
+        Array lot FIFO selalu diganti (bukan diubah di tempat), jadi cukup
+        array per produk yang disalin.
+        """
+        ledger = copy.copy(self)
+        for name in ('units_sold', 'revenue', 'purchase_spend', 'on_hand', 'average_cost',
+                     'cogs_total'):
+            if hasattr(self, name):
+                setattr(ledger, name, getattr(self, name).copy())
+        ledger._daily = list(self._daily)
+        return ledger
+
+    def appended(self, new_sales=None, new_purchases=None, date_column='date'):
+        """Salinan ledger + transaksi baru, atau None jika harus dibangun ulang dari awal."""
+        days, codes, quantity = net_movements(self.product_ids, new_sales, new_purchases,
+                                              date_column)
+        if self.last_day is not None and len(days) and days[0] <= self.last_day:
+            return None
+        # Saldo awal tetap jika stok berjalan dari stok sekarang tidak pernah negatif
+        closing = np.rint(self.on_hand_units()).astype(np.int64) + \
+            np.bincount(codes, weights=quantity, minlength=self.n_products).astype(np.int64)
+        _, adjustment = fit_opening(closing, codes, quantity)
+        if adjustment.any():
+            return None
+        return self.copy().append(new_sales, new_purchases, date_column)
+
+    # FIFO
+    def _build_curve(self):
+        # Lot terurut per (produk, hari) di sumbu unit kumulatif global
+        order = np.lexsort((self.layer_day, self.layer_code))
+        for name in ('layer_code', 'layer_day', 'layer_quantity', 'layer_value'):
+            setattr(self, name, getattr(self, name)[order])
+        n_products = self.n_products
+        self.total_in = np.bincount(self.layer_code, weights=self.layer_quantity, minlength=n_products)
+        self.offset = np.r_[0.0, np.cumsum(self.total_in)[:-1]]
+        self.curve_x = np.r_[0.0, np.cumsum(self.layer_quantity)]
+        self.curve_y = np.r_[0.0, np.cumsum(self.layer_value)]
+        # Biaya per unit lot terakhir, untuk penjualan melebihi semua lot
+        self.last_cost = self.opening_cost.copy()
+        if len(self.layer_code):
+            last = np.r_[self.layer_code[1:] != self.layer_code[:-1], True]
+            self.last_cost[self.layer_code[last]] = (self.layer_value[last]
+                                                     / self.layer_quantity[last])
+
+    def _fifo_cost(self, codes, units):
+        """Biaya `units` unit pertama yang terjual untuk setiap kode produk (vektor)."""
+        covered = np.minimum(units, self.total_in[codes])
+        start = self.offset[codes]
+        cost = np.interp(start + covered, self.curve_x, self.curve_y) - \
+            np.interp(start, self.curve_x, self.curve_y)
+        return cost + np.maximum(units - covered, 0.0) * self.last_cost[codes]
+
+    def _append_fifo(self, sale_code, sale_quantity, purchase_code, purchase_day, purchase_quantity,
+                     purchase_value):
+        if len(purchase_code):
+            valid = purchase_quantity > 0
+            self.layer_code = np.r_[self.layer_code, purchase_code[valid]]
+            self.layer_day = np.r_[self.layer_day, purchase_day[valid]]
+            self.layer_quantity = np.r_[self.layer_quantity, purchase_quantity[valid]]
+            self.layer_value = np.r_[self.layer_value, purchase_value[valid]]
+            self._build_curve()
+        before = self.units_sold[sale_code] + _cumsum_within(sale_code, sale_quantity)
+        after = before + sale_quantity
+        return self._fifo_cost(sale_code, after) - self._fifo_cost(sale_code, before)
+
+    # Rata-rata tertimbang bergerak
+    def _append_weighted_average(self, sale_code, sale_day, sale_quantity, purchase_code,
+                                 purchase_day, purchase_quantity, purchase_value):
+        # Kejadian per (produk, hari), pembelian sebelum penjualan di hari yang sama
+        code = np.r_[purchase_code, sale_code]
+        day = np.r_[purchase_day, sale_day]
+        is_sale = np.r_[np.zeros(len(purchase_code), bool), np.ones(len(sale_code), bool)]
+        quantity = np.r_[purchase_quantity, sale_quantity]
+        value = np.r_[purchase_value, np.zeros(len(sale_code))]
+        order = np.lexsort((is_sale, day, code))
+        code, is_sale, quantity, value = code[order], is_sale[order], quantity[order], value[order]
+
+        # Langkah ke-r memproses kejadian ke-r setiap produk sekaligus
+        rank = _rank_within(code)
+        by_rank = np.argsort(rank, kind='stable')
+        bounds = np.r_[0, np.cumsum(np.bincount(rank))] if len(rank) else np.array([0])
+        event_cogs = np.zeros(len(code))
+        for r in range(len(bounds) - 1):
+            step = by_rank[bounds[r]:bounds[r + 1]]
+            buys, sells = step[~is_sale[step]], step[is_sale[step]]
+            if len(buys):
+                p, q = code[buys], quantity[buys]
+                held = self.on_hand[p]
+                new_held = held + q
+                lot_cost = np.divide(value[buys], q, out=self.average_cost[p].copy(), where=q > 0)
+                blended = np.divide(held * self.average_cost[p] + value[buys], new_held,
+                                    out=lot_cost.copy(), where=(held > 0) & (new_held > 0))
+                self.average_cost[p] = np.where(held > 0, blended, lot_cost)
+                self.on_hand[p] = new_held
+            if len(sells):
+                p, q = code[sells], quantity[sells]
+                event_cogs[sells] = q * self.average_cost[p]
+                self.on_hand[p] -= q
+
+        sale_cogs = np.empty(len(sale_code))
+        sale_cogs[order[is_sale] - len(purchase_code)] = event_cogs[is_sale]
+        self.cogs_total += np.bincount(sale_code, weights=sale_cogs, minlength=self.n_products)
+        return sale_cogs
+
+    def append(self, new_sales=None, new_purchases=None, date_column='date'):
+        """Terapkan transaksi baru (baris mentah atau kubus agregat) tanpa menghitung ulang riwayat."""
+        sale_code, sale_day, sale_quantity, sale_revenue = daily_movements(
+            new_sales, self.product_ids, 'total_price', date_column)
+        purchase = daily_movements(new_purchases, self.product_ids, 'total_cost', date_column)
+        purchase_code, purchase_day, purchase_quantity, purchase_value = purchase
+
+        if self.method == 'fifo':
+            day_cogs = self._append_fifo(sale_code, sale_quantity, *purchase)
+        else:
+            day_cogs = self._append_weighted_average(sale_code, sale_day, sale_quantity, *purchase)
+
+        n_products = self.n_products
+        days = np.r_[sale_day, purchase_day]
+        if len(days):
+            self.last_day = int(days.max()) if self.last_day is None else \
+                max(self.last_day, int(days.max()))
+        self.units_sold += np.bincount(sale_code, weights=sale_quantity, minlength=n_products)
+        self.revenue += np.bincount(sale_code, weights=sale_revenue, minlength=n_products)
+        self.purchase_spend += np.bincount(purchase_code, weights=purchase_value, minlength=n_products)
+        if len(sale_code):
+            self._daily.append(pd.DataFrame({
+                'code': sale_code, 'day': sale_day, 'quantity': sale_quantity,
+                'revenue': sale_revenue, 'cogs': day_cogs
+            }))
+        self.version += 1
+        return self
+
+    # Hasil
+    def product_cogs(self):
+        if self.method == 'fifo':
+            return self._fifo_cost(np.arange(self.n_products), self.units_sold)
+        return self.cogs_total.copy()
+
+    def inventory_value(self):
+        """Nilai persediaan tersisa per produk (sisa lot FIFO atau stok x biaya rata-rata)."""
+        if self.method == 'fifo':
+            codes = np.arange(self.n_products)
+            consumed = self._fifo_cost(codes, np.minimum(self.units_sold, self.total_in))
+            value_in = np.bincount(self.layer_code, weights=self.layer_value, minlength=self.n_products)
+            return value_in - consumed
+        return np.maximum(self.on_hand, 0.0) * self.average_cost
+
+    def product_margin(self):
+        """Per produk: unit terjual, pendapatan, COGS, margin kotor, margin %, ROI % dan nilai stok."""
+        cogs = self.product_cogs()
+        margin = self.revenue - cogs
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin_pct = np.where(self.revenue > 0, margin / self.revenue * 100, np.nan)
+            roi = np.where(cogs > 0, margin / cogs * 100, np.nan)
+        return pd.DataFrame({
+            'product_id': np.asarray(self.product_ids),
+            'units_sold': self.units_sold,
+            'revenue': self.revenue,
+            'cogs': cogs,
+            'gross_margin': margin,
+            'margin_pct': margin_pct,
+            'roi': roi,
+            'inventory_value': self.inventory_value()
+        })
+
+    def totals(self):
+        revenue = self.revenue.sum()
+        cogs = self.product_cogs().sum()
+        return {
+            'revenue': revenue,
+            'cogs': cogs,
+            'gross_margin': revenue - cogs,
+            'margin_pct': (revenue - cogs) / revenue * 100 if revenue > 0 else 0.0,
+            'purchase_spend': self.purchase_spend.sum(),
+            'inventory_value': self.inventory_value().sum()
+        }
+
+    def daily_margin(self):
+        """COGS per (hari, produk) seperti dibukukan saat transaksi diproses."""
+        columns = ['day', 'product_id', 'quantity', 'revenue', 'cogs']
+        if not self._daily:
+            return pd.DataFrame(columns=columns)
+        daily = pd.concat(self._daily, ignore_index=True)
+        daily = daily.groupby(['code', 'day'], sort=True).sum().reset_index()
+        daily['product_id'] = np.asarray(self.product_ids)[daily['code'].to_numpy()]
+        daily['day'] = daily['day'].to_numpy().astype('datetime64[D]').astype('datetime64[ns]')
+        return daily[columns]
+
+    def monthly_margin(self):
+        daily = self.daily_margin()
+        month = daily['day'].dt.to_period('M').astype(str).rename('month')
+        monthly = daily.groupby(month)[['revenue', 'cogs']].sum().reset_index()
+        monthly['gross_margin'] = monthly['revenue'] - monthly['cogs']
+        return monthly
+
+    def sale_cogs(self, sales, date_column='date'):
+        """COGS per baris penjualan mentah: quantity x COGS per unit produk pada hari itu."""
+        daily = self.daily_margin()
+        codes = self.product_ids.get_indexer(daily['product_id'])
+        keys = pd.Index(codes * _DAY_KEY + _day_numbers(daily['day']))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unit = np.where(daily['quantity'] > 0, daily['cogs'] / daily['quantity'], 0.0)
+
+        sale_codes = dimension_codes(sales['product_id'], self.product_ids)
+        positions = keys.get_indexer(sale_codes * _DAY_KEY + _day_numbers(sales[date_column]))
+        found = (sale_codes >= 0) & (positions >= 0)
+        cogs = np.full(len(sales), np.nan)
+        cogs[found] = sales['quantity'].to_numpy()[found] * unit[positions[found]]
+        return cogs
+
+
+def main(argv=None):
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='COGS dan margin kotor per produk (headless)')
+    parser.add_argument('--method', choices=METHODS, default='fifo')
+    parser.add_argument('--output', default='product_margin.csv', help='file .csv atau .parquet')
+    parser.add_argument('--sale-output', help='COGS per baris penjualan (.csv/.parquet)')
+    args = parser.parse_args(argv)
+
+    backend = backend_from_env()
+    data = backend.load({
+        'products': None,
+        'sales': ['sale_id', 'date', 'product_id', 'quantity', 'total_price'],
+        'purchases': ['date', 'product_id', 'quantity', 'total_cost']
+    })
+    ledger = CostLedger.from_transactions(data['products'], data['sales'], data['purchases'],
+                                          args.method)
+    margin = ledger.product_margin()
+    outputs = [(args.output, margin)]
+    if args.sale_output:
+        sales = data['sales'][['sale_id', 'date', 'product_id', 'quantity', 'total_price']].copy()
+        sales['cogs'] = ledger.sale_cogs(sales)
+        outputs.append((args.sale_output, sales))
+    for path, table in outputs:
+        if path.endswith('.parquet'):
+            table.to_parquet(path, index=False)
+        else:
+            table.to_csv(path, index=False)
+        print(f'{len(table):,} baris ditulis ke {path}')
+
+    totals = ledger.totals()
+    print(f"Pendapatan Rp {totals['revenue']:,.0f}, COGS Rp {totals['cogs']:,.0f}, "
+          f"margin kotor Rp {totals['gross_margin']:,.0f} ({totals['margin_pct']:.2f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,403 @@
+"""Lapisan penyimpanan data: synthetic (in-memory), Parquet, atau SQLite.
+
+Setiap halaman mendeklarasikan kolom yang dibutuhkan (PAGE_REQUIREMENTS) dan
+backend hanya membaca kolom tersebut. Filter tanggal dan kategori didorong ke
+storage (predicate pushdown Parquet / klausa WHERE SQLite) sehingga riwayat
+transaksi tidak perlu dimuat penuh di setiap proses Streamlit.
+
+Membuat store dari data rekayasa atau CSV:
+    python data_backend.py --format parquet --output data/
+    python data_backend.py --format sqlite --output data/inventory.db --from-csv export/
+"""
+import argparse
+import os
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+from date_index import DateIndex
+
+TABLES = ('products', 'sales', 'suppliers', 'purchases')
+# Tabel transaksi: punya kolom date dan product_id
+FACT_TABLES = ('sales', 'purchases')
+# Tabel dimensi: kecil, dimuat penuh sekali per proses
+DIMENSION_TABLES = ('products', 'suppliers')
+
+# Kolom baris mentah yang dibutuhkan halaman (grafik dan metrik lain dibaca
+# dari kubus agregat, lihat aggregates.CUBE_REQUIREMENTS)
+PAGE_REQUIREMENTS = {
+    'Analisis Penjualan': {
+        'sales': ['date', 'product_id', 'category', 'quantity', 'total_price']
+    },
+    'Manajemen Inventory': {
+        'products': ['product_id', 'product_name', 'category', 'unit_price', 'stock']
+    }
+}
+
+
+def _end_exclusive(end_date):
+    # Filter tanggal inklusif per hari: date < end_date + 1 hari
+    return pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+
+
+class DataBackend:
+    """Antarmuka backend; subclass cukup mengimplementasikan read_table()."""
+
+    name = 'base'
+    # True jika storage bisa menggabungkan filter kategori ke tabel transaksi sendiri
+    joins_categories = False
+
+    def read_table(self, table, columns=None, start_date=None, end_date=None,
+                   product_ids=None, categories=None):
+        raise NotImplementedError
+
+    def iter_table(self, table, chunk_rows, columns=None, start_date=None, end_date=None):
+        """Baris tabel per chunk (paling banyak chunk_rows) tanpa memuat seluruh hasil.
+
+        Selalu menghasilkan minimal satu chunk (kosong jika tidak ada baris),
+        agar penulis file tetap mendapat kolomnya.
+        """
+        empty = True
+        for chunk in self._iter_chunks(table, chunk_rows, columns, start_date, end_date):
+            empty = False
+            yield chunk
+        if empty:
+            yield self.read_table(table, columns=columns, start_date=start_date, end_date=end_date)
+
+    def _iter_chunks(self, table, chunk_rows, columns, start_date, end_date):
+        # Default: data sudah di memori, jadi cukup potong hasil read_table
+        df = self.read_table(table, columns=columns, start_date=start_date, end_date=end_date)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows].reset_index(drop=True)
+
+    def cache_key(self):
+        # Berubah setiap kali data di storage berubah; dipakai sebagai kunci cache
+        return self.name
+
+    def attach_category(self, df, columns):
+        # Kolom turunan 'category' untuk tabel transaksi, dari tabel produk
+        if columns is None or 'category' not in columns:
+            return df
+        products = self.read_table('products', columns=['product_id', 'category'])
+        category = df['product_id'].map(products.set_index('product_id')['category'])
+        return df.assign(category=category)[list(columns)]
+
+    def _storage_columns(self, table, columns):
+        # Kolom yang benar-benar ada di storage (tanpa kolom turunan)
+        if columns is None or table not in FACT_TABLES:
+            return columns
+        storage = [c for c in columns if c != 'category']
+        if 'category' in columns and 'product_id' not in storage:
+            storage.append('product_id')
+        return storage
+
+    def product_ids_for(self, categories):
+        products = self.read_table('products', columns=['product_id'], categories=categories)
+        return products['product_id'].tolist()
+
+    def load(self, requirements=None, start_date=None, end_date=None, categories=None):
+        """Muat tabel sesuai kebutuhan halaman dengan filter yang sudah didorong ke storage."""
+        if requirements is None:
+            requirements = {table: None for table in TABLES}
+        if categories is not None:
+            categories = list(categories)
+
+        product_ids, fact_categories = None, None
+        if categories is not None and self.joins_categories:
+            fact_categories = categories
+        elif categories is not None and any(t in FACT_TABLES for t in requirements):
+            product_ids = self.product_ids_for(categories)
+
+        result = {}
+        for table, columns in requirements.items():
+            if table in FACT_TABLES:
+                result[table] = self.read_table(
+                    table, columns=columns, start_date=start_date, end_date=end_date,
+                    product_ids=product_ids, categories=fact_categories
+                )
+            elif table == 'products':
+                result[table] = self.read_table(table, columns=columns, categories=categories)
+            else:
+                result[table] = self.read_table(table, columns=columns)
+        return result
+
+    def load_all(self):
+        return self.load()
+
+
+class InMemoryBackend(DataBackend):
+    """Backend untuk data rekayasa dari load_data().
+
+    Tabel transaksi disimpan terurut per tanggal (DateIndex) sehingga filter
+    tanggal berupa binary search dan filter kategori memakai array kode.
+    """
+
+    name = 'synthetic'
+    joins_categories = True
+
+    def __init__(self, data, key='synthetic'):
+        self.key = key
+        self.indexes = {
+            table: DateIndex(data[table], data['products'])
+            for table in FACT_TABLES if table in data
+        }
+        # Simpan versi terurut saja agar tidak ada dua salinan tabel transaksi
+        self.data = dict(data, **{table: index.rows for table, index in self.indexes.items()})
+
+    def cache_key(self):
+        return self.key
+
+    def read_table(self, table, columns=None, start_date=None, end_date=None,
+                   product_ids=None, categories=None):
+        if table in self.indexes and product_ids is None:
+            return self.indexes[table].select(
+                start_date, end_date, categories, columns,
+                with_category=columns is not None and 'category' in columns
+            )
+        df = self.data[table]
+        mask = pd.Series(True, index=df.index)
+        if start_date is not None:
+            mask &= df['date'] >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= df['date'] < _end_exclusive(end_date)
+        if product_ids is not None:
+            mask &= df['product_id'].isin(product_ids)
+        if categories is not None:
+            mask &= df['category'].isin(categories)
+        if not mask.all():
+            df = df[mask]
+        if columns is not None:
+            df = df[list(columns)]
+        return df.reset_index(drop=True)
+
+
+class ParquetBackend(DataBackend):
+    """Satu file Parquet per tabel: <directory>/<tabel>.parquet (butuh pyarrow)."""
+
+    name = 'parquet'
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, table):
+        return os.path.join(self.directory, f'{table}.parquet')
+
+    def cache_key(self):
+        mtimes = [os.path.getmtime(self.path(t)) for t in TABLES if os.path.exists(self.path(t))]
+        return f'parquet:{os.path.abspath(self.directory)}:{max(mtimes, default=0)}'
+
+    def read_table(self, table, columns=None, start_date=None, end_date=None,
+                   product_ids=None, categories=None):
+        filters = []
+        if start_date is not None:
+            filters.append(('date', '>=', pd.Timestamp(start_date)))
+        if end_date is not None:
+            filters.append(('date', '<', _end_exclusive(end_date)))
+        if product_ids is not None:
+            filters.append(('product_id', 'in', list(product_ids)))
+        if categories is not None:
+            filters.append(('category', 'in', list(categories)))
+
+        storage_columns = self._storage_columns(table, columns)
+        if (product_ids is not None and not product_ids) or (categories is not None and not categories):
+            # Filter IN kosong: cukup baca skema tanpa baris
+            df = pd.read_parquet(self.path(table), columns=storage_columns).iloc[0:0]
+        else:
+            df = pd.read_parquet(self.path(table), columns=storage_columns, filters=filters or None)
+        df = df.reset_index(drop=True)
+        return self.attach_category(df, columns) if table in FACT_TABLES else df
+
+    def _iter_chunks(self, table, chunk_rows, columns, start_date, end_date):
+        # Batch per row group lewat pyarrow.dataset; row group di luar rentang
+        # tanggal dilewati dari statistiknya
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        bounds = []
+        if start_date is not None:
+            bounds.append(ds.field('date') >= pa.scalar(pd.Timestamp(start_date)))
+        if end_date is not None:
+            bounds.append(ds.field('date') < pa.scalar(_end_exclusive(end_date)))
+        condition = None
+        for bound in bounds:
+            condition = bound if condition is None else condition & bound
+
+        dataset = ds.dataset(self.path(table), format='parquet')
+        pending, rows = [], 0
+        for batch in dataset.to_batches(columns=self._storage_columns(table, columns),
+                                        filter=condition, batch_size=chunk_rows):
+            if not batch.num_rows:
+                continue
+            pending.append(batch)
+            rows += batch.num_rows
+            # Gabungkan batch kecil menjadi chunk berukuran chunk_rows
+            while rows >= chunk_rows:
+                merged = pa.Table.from_batches(pending)
+                yield self._chunk_frame(table, columns, merged.slice(0, chunk_rows))
+                pending = merged.slice(chunk_rows).to_batches()
+                rows -= chunk_rows
+        if rows:
+            yield self._chunk_frame(table, columns, pa.Table.from_batches(pending))
+
+    def _chunk_frame(self, table, columns, arrow_table):
+        df = arrow_table.to_pandas()
+        return self.attach_category(df, columns) if table in FACT_TABLES else df
+
+
+class SQLiteBackend(DataBackend):
+    """Database SQLite lokal dengan satu tabel per DataFrame."""
+
+    name = 'sqlite'
+    joins_categories = True
+
+    def __init__(self, path):
+        self.path = path
+
+    def cache_key(self):
+        mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else 0
+        return f'sqlite:{os.path.abspath(self.path)}:{mtime}'
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def read_table(self, table, columns=None, start_date=None, end_date=None,
+                   product_ids=None, categories=None):
+        query, params, has_date = self._query(table, columns, start_date, end_date,
+                                              product_ids, categories)
+        with closing(self.connect()) as conn:
+            df = pd.read_sql_query(query, conn, params=params,
+                                   parse_dates=['date'] if has_date else None)
+        return self._frame(table, columns, df, has_date)
+
+    def _iter_chunks(self, table, chunk_rows, columns, start_date, end_date):
+        # Cursor dibaca per chunksize baris; hasil penuh tidak pernah ada di memori
+        query, params, has_date = self._query(table, columns, start_date, end_date)
+        with closing(self.connect()) as conn:
+            for df in pd.read_sql_query(query, conn, params=params, chunksize=chunk_rows,
+                                        parse_dates=['date'] if has_date else None):
+                if len(df):
+                    yield self._frame(table, columns, df, has_date)
+
+    def _frame(self, table, columns, df, has_date):
+        if has_date:
+            df['date'] = df['date'].astype('datetime64[ns]')
+        return self.attach_category(df, columns) if table in FACT_TABLES else df
+
+    def _query(self, table, columns=None, start_date=None, end_date=None,
+               product_ids=None, categories=None):
+        # (SQL, parameter, ada kolom date) untuk filter yang didorong ke WHERE
+        if table not in TABLES:
+            raise ValueError(f'Tabel tidak dikenal: {table}')
+        storage_columns = self._storage_columns(table, columns)
+        select = ', '.join(f'"{c}"' for c in storage_columns) if columns is not None else '*'
+        where, params = [], []
+        if start_date is not None:
+            where.append('date >= ?')
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d %H:%M:%S'))
+        if end_date is not None:
+            where.append('date < ?')
+            params.append(_end_exclusive(end_date).strftime('%Y-%m-%d %H:%M:%S'))
+        if product_ids is not None:
+            where.append(f"product_id IN ({', '.join('?' * len(product_ids))})")
+            params.extend(product_ids)
+        if categories is not None:
+            placeholders = ', '.join('?' * len(categories))
+            if table in FACT_TABLES:
+                # Filter kategori tabel transaksi sebagai subquery ke tabel produk
+                where.append(f'product_id IN (SELECT product_id FROM products WHERE category IN ({placeholders}))')
+            else:
+                where.append(f'category IN ({placeholders})')
+            params.extend(categories)
+
+        query = f'SELECT {select} FROM {table}'
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+        has_date = table in FACT_TABLES and (columns is None or 'date' in columns)
+        return query, params, has_date
+
+
+def export_parquet(data, directory):
+    """Tulis keempat tabel ke Parquet, transaksi diurutkan per tanggal agar pushdown efektif."""
+    os.makedirs(directory, exist_ok=True)
+    for table in TABLES:
+        df = data[table]
+        if table in FACT_TABLES:
+            df = df.sort_values('date', kind='stable')
+        df.to_parquet(os.path.join(directory, f'{table}.parquet'), index=False,
+                      row_group_size=1_000_000)
+
+
+def export_sqlite(data, path, chunksize=100_000):
+    """Tulis keempat tabel ke SQLite beserta index untuk filter tanggal dan produk."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with closing(sqlite3.connect(path)) as conn:
+        for table in TABLES:
+            data[table].to_sql(table, conn, if_exists='replace', index=False, chunksize=chunksize)
+        for table in FACT_TABLES:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_date ON {table} (date)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_product ON {table} (product_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_products_category ON products (category)')
+        conn.commit()
+
+
+def read_csv_tables(directory):
+    # CSV per tabel: products.csv, sales.csv, suppliers.csv, purchases.csv
+    data = {}
+    for table in TABLES:
+        parse_dates = ['date'] if table in FACT_TABLES else None
+        data[table] = pd.read_csv(os.path.join(directory, f'{table}.csv'), parse_dates=parse_dates)
+    return data
+
+
+def backend_from_env(synthetic_loader=None, environ=None):
+    """Pilih backend dari INVENTORY_BACKEND (synthetic/parquet/sqlite/shared) dan INVENTORY_DATA_PATH."""
+    environ = os.environ if environ is None else environ
+    kind = environ.get('INVENTORY_BACKEND', 'synthetic').lower()
+    if kind == 'parquet':
+        return ParquetBackend(environ.get('INVENTORY_DATA_PATH', 'data'))
+    if kind == 'sqlite':
+        return SQLiteBackend(environ.get('INVENTORY_DATA_PATH', os.path.join('data', 'inventory.db')))
+    if kind in ('synthetic', 'shared'):
+        if synthetic_loader is None:
+            from data_generator import generate_data
+            synthetic_loader = generate_data
+        if kind == 'shared':
+            # Dataset di shared memory; dipublish dari loader jika belum ada
+            from shared_store import DEFAULT_DIR, SharedBackend
+            return SharedBackend(environ.get('INVENTORY_SHARED_DIR', DEFAULT_DIR), synthetic_loader)
+        return InMemoryBackend(synthetic_loader())
+    raise ValueError(f'INVENTORY_BACKEND tidak dikenal: {kind}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Buat store Parquet/SQLite untuk dashboard inventory')
+    parser.add_argument('--format', choices=['parquet', 'sqlite'], required=True)
+    parser.add_argument('--output', required=True, help='direktori Parquet atau file SQLite')
+    parser.add_argument('--from-csv', help='direktori berisi products/sales/suppliers/purchases.csv')
+    parser.add_argument('--n-sales', type=int, default=1000)
+    parser.add_argument('--n-purchases', type=int, default=200)
+    parser.add_argument('--n-products', type=int, default=20)
+    parser.add_argument('--n-suppliers', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.from_csv:
+        data = read_csv_tables(args.from_csv)
+    else:
+        from data_generator import generate_data
+        data = generate_data(n_sales=args.n_sales, n_purchases=args.n_purchases,
+                             n_products=args.n_products, n_suppliers=args.n_suppliers,
+                             seed=args.seed)
+
+    if args.format == 'parquet':
+        export_parquet(data, args.output)
+    else:
+        export_sqlite(data, args.output)
+    print(f"{len(data['sales']):,} penjualan dan {len(data['purchases']):,} pembelian ditulis ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()
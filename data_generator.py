@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+# Katalog produk contoh (20 produk pertama selalu sama)
+PRODUCT_NAMES = [
+    'Laptop ASUS X441', 'Smartphone Samsung A32', 'Monitor LG 24"',
+    'Keyboard Mechanical', 'Mouse Wireless', 'Headphone Bluetooth',
+    'Printer Epson L3210', 'Tablet iPad 9th', 'SSD 500GB',
+    'RAM 8GB DDR4', 'Power Supply 650W', 'Casing PC ATX',
+    'Webcam 1080p', 'Microphone USB', 'Router Wi-Fi 6',
+    'Hard Disk 1TB', 'Cooler CPU', 'VGA Card GTX 1660',
+    'Motherboard B450', 'Speaker 2.1'
+]
+PRODUCT_CATEGORIES = [
+    'Elektronik', 'Elektronik', 'Elektronik', 'Aksesori', 'Aksesori',
+    'Aksesori', 'Elektronik', 'Elektronik', 'Komponen', 'Komponen',
+    'Komponen', 'Komponen', 'Aksesori', 'Aksesori', 'Jaringan',
+    'Komponen', 'Komponen', 'Komponen', 'Komponen', 'Aksesori'
+]
+PRODUCT_PRICES = [
+    7500000, 3200000, 1800000, 450000, 250000, 600000,
+    2800000, 4500000, 800000, 650000, 850000, 500000,
+    400000, 350000, 1200000, 900000, 350000, 3200000,
+    1800000, 550000
+]
+PRODUCT_STOCK = [
+    45, 78, 32, 120, 150, 85, 25, 40, 95, 110, 65, 42,
+    88, 76, 53, 60, 92, 28, 35, 67
+]
+CATEGORIES = ['Elektronik', 'Aksesori', 'Komponen', 'Jaringan']
+
+# Supplier contoh (5 supplier pertama selalu sama)
+SUPPLIER_NAMES = [
+    'PT Elektronik Nusantara', 'CV Tech Solution',
+    'PT Komponen Indonesia', 'UD Aksesori Komputer',
+    'PT Global Technology'
+]
+SUPPLIER_CONTACTS = [
+    '021-5567890', '021-5567891', '021-5567892',
+    '021-5567893', '021-5567894'
+]
+SUPPLIER_LEAD_TIMES = [7, 14, 10, 5, 21]  # hari dari pemesanan sampai barang diterima
+
+START_DATE = np.datetime64('2023-01-01')
+N_DAYS = 365
+PURCHASE_COST_RATIO = 0.7  # Harga beli 70% dari harga jual
+
+
+def make_ids(prefix, n, width, start=0):
+    """ID berurutan seperti 'S0000' dibuat sekaligus tanpa loop Python."""
+    numbers = np.arange(start, start + n)
+    if n > 0:
+        width = max(width, len(str(start + n - 1)))
+    return np.char.add(prefix, np.char.zfill(numbers.astype('U'), width))
+
+
+def make_products(n_products=20, rng=None):
+    """Tabel produk; lebih dari 20 produk diisi dengan katalog sintetis."""
+    rng = np.random.default_rng(0) if rng is None else rng
+    n_base = min(n_products, len(PRODUCT_NAMES))
+    n_extra = n_products - n_base
+
+    names = np.array(PRODUCT_NAMES[:n_base], dtype=object)
+    categories = np.array(PRODUCT_CATEGORIES[:n_base], dtype=object)
+    prices = np.array(PRODUCT_PRICES[:n_base], dtype=np.int64)
+    stock = np.array(PRODUCT_STOCK[:n_base], dtype=np.int64)
+
+    if n_extra > 0:
+        extra_numbers = np.arange(n_base + 1, n_products + 1).astype('U')
+        names = np.concatenate([names, np.char.add('Produk ', extra_numbers).astype(object)])
+        categories = np.concatenate([
+            categories, np.array(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), n_extra)]
+        ])
+        prices = np.concatenate([prices, rng.integers(5, 800, n_extra) * 10000])
+        stock = np.concatenate([stock, rng.integers(0, 200, n_extra)])
+
+    return pd.DataFrame({
+        'product_id': make_ids('P', n_products, 3, start=1),
+        'product_name': names,
+        'category': categories,
+        'unit_price': prices,
+        'stock': stock
+    })
+
+
+def make_suppliers(n_suppliers=5):
+    """Tabel supplier; lebih dari 5 supplier diberi nama sintetis."""
+    n_base = min(n_suppliers, len(SUPPLIER_NAMES))
+    extra = np.arange(n_base + 1, n_suppliers + 1)
+    names = SUPPLIER_NAMES[:n_base] + [f'Supplier {i}' for i in extra]
+    contacts = SUPPLIER_CONTACTS[:n_base] + [f'021-{5567889 + i}' for i in extra]
+    lead_times = np.concatenate([SUPPLIER_LEAD_TIMES[:n_base], 3 + extra * 7 % 26]).astype(np.int64)
+    return pd.DataFrame({
+        'supplier_id': make_ids('SUP', n_suppliers, 2, start=1),
+        'supplier_name': names,
+        'contact': contacts,
+        'lead_time_days': lead_times
+    })
+
+
+def _id_column(ids, codes, categorical):
+    # Kolom ID dari kode integer: Categorical (hemat memori) atau string biasa
+    if categorical:
+        return pd.Categorical.from_codes(codes, categories=ids)
+    return ids[codes]
+
+
+def generate_data(n_sales=1000, n_purchases=200, n_products=20, n_suppliers=5,
+                  seed=42, categorical_ids=False):
+    """Data rekayasa dengan skema yang sama seperti load_data(), dibuat per kolom.
+
+    Semua kolom diambil dengan satu panggilan NumPy per kolom sehingga 10 juta
+    baris penjualan cukup beberapa detik. Hasil selalu sama untuk seed yang sama.
+    """
+    rng = np.random.default_rng(seed)
+
+    products = make_products(n_products, rng)
+    suppliers = make_suppliers(n_suppliers)
+    product_ids = products['product_id'].to_numpy().astype('U')
+    supplier_ids = suppliers['supplier_id'].to_numpy().astype('U')
+    prices = products['unit_price'].to_numpy()
+
+    # Data penjualan
+    product_idx = rng.integers(0, n_products, n_sales)
+    quantity = rng.integers(1, 10, n_sales)
+    unit_price = prices[product_idx]
+    day_offset = rng.integers(0, N_DAYS, n_sales).astype('timedelta64[D]')
+    sales = pd.DataFrame({
+        'sale_id': make_ids('S', n_sales, 4),
+        'product_id': _id_column(product_ids, product_idx, categorical_ids),
+        'quantity': quantity,
+        'unit_price': unit_price,
+        'total_price': quantity * unit_price,
+        'date': (START_DATE + day_offset).astype('datetime64[ns]')
+    })
+
+    # Data pembelian
+    supplier_idx = rng.integers(0, n_suppliers, n_purchases)
+    product_idx = rng.integers(0, n_products, n_purchases)
+    quantity = rng.integers(10, 100, n_purchases)
+    unit_cost = prices[product_idx] * PURCHASE_COST_RATIO
+    day_offset = rng.integers(0, N_DAYS, n_purchases).astype('timedelta64[D]')
+    purchases = pd.DataFrame({
+        'purchase_id': make_ids('PUR', n_purchases, 4),
+        'product_id': _id_column(product_ids, product_idx, categorical_ids),
+        'supplier_id': _id_column(supplier_ids, supplier_idx, categorical_ids),
+        'quantity': quantity,
+        'unit_cost': unit_cost,
+        'total_cost': quantity * unit_cost,
+        'date': (START_DATE + day_offset).astype('datetime64[ns]')
+    })
+
+    return {
+        'products': products,
+        'sales': sales,
+        'suppliers': suppliers,
+        'purchases': purchases
+    }
@@ -0,0 +1,76 @@
+"""Index tanggal untuk tabel transaksi (penjualan/pembelian).
+
+Baris diurutkan sekali berdasarkan tanggal sehingga rentang tanggal cukup
+dicari dengan np.searchsorted (O(log n)) dan hasilnya berupa slice baris tanpa
+salinan. Kategori setiap baris disimpan sebagai array kode (produk -> kategori)
+yang dihitung sekali, jadi filter kategori tidak perlu merge dengan tabel produk.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _to_datetime64(value):
+    return np.datetime64(pd.Timestamp(value).to_datetime64(), 'ns')
+
+
+class DateIndex:
+    """Tabel transaksi terurut per tanggal dengan kode kategori per baris."""
+
+    def __init__(self, rows, products):
+        dates = rows['date'].to_numpy(dtype='datetime64[ns]')
+        if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+            order = np.argsort(dates, kind='stable')
+            rows = rows.iloc[order]
+            dates = dates[order]
+        self.rows = rows.reset_index(drop=True)
+        self.dates = dates
+
+        # Kode produk -> kode kategori; -1 (produk tidak dikenal) tetap -1
+        self.categories = pd.Index(products['category'].unique())
+        product_category = self.categories.get_indexer(products['category'])
+        product_ids = self.rows['product_id']
+        if (isinstance(product_ids.dtype, pd.CategoricalDtype)
+                and product_ids.cat.categories.equals(pd.Index(products['product_id'].astype(str)))):
+            # Skema ringkas: kode Categorical sudah berupa posisi baris produk
+            product_codes = product_ids.cat.codes.to_numpy()
+        else:
+            product_codes = pd.Index(products['product_id']).get_indexer(product_ids)
+        self.category_codes = np.append(product_category, -1)[product_codes].astype(np.int16)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def bounds(self, start_date=None, end_date=None):
+        """Posisi [lo, hi) untuk rentang tanggal inklusif per hari."""
+        lo = 0 if start_date is None else int(np.searchsorted(
+            self.dates, _to_datetime64(pd.Timestamp(start_date).normalize()), side='left'))
+        hi = len(self.dates) if end_date is None else int(np.searchsorted(
+            self.dates, _to_datetime64(pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)),
+            side='left'))
+        return lo, max(lo, hi)
+
+    def category_mask(self, codes, categories):
+        # Lookup tabel boolean per kode kategori; indeks -1 jatuh ke elemen terakhir (False)
+        wanted = np.zeros(len(self.categories) + 1, dtype=bool)
+        positions = self.categories.get_indexer(list(categories))
+        wanted[positions[positions >= 0]] = True
+        return wanted[codes]
+
+    def select(self, start_date=None, end_date=None, categories=None, columns=None,
+               with_category=False):
+        """Baris dalam rentang tanggal dan kategori; tanpa filter kategori hasilnya slice."""
+        lo, hi = self.bounds(start_date, end_date)
+        view = self.rows.iloc[lo:hi]
+        codes = self.category_codes[lo:hi]
+
+        if categories is not None and set(categories) != set(self.categories):
+            mask = self.category_mask(codes, categories)
+            view = view[mask]
+            codes = codes[mask]
+        if columns is not None:
+            view = view[[c for c in columns if c != 'category']]
+        if with_category:
+            view = view.assign(category=pd.Categorical.from_codes(codes, categories=self.categories))
+            if columns is not None:
+                view = view[list(columns)]
+        return view
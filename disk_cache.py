@@ -0,0 +1,139 @@
+"""Cache tabel data di disk agar restart tidak membangkitkan ulang data.
+
+st.cache_data hanya hidup di memori proses, jadi setiap deploy/restart
+menjalankan generate_data() lagi. Di sini hasil loader ditulis sekali dengan
+format kolom .npy dari shared_store, lalu proses berikutnya memetakannya
+(np.load mmap_mode='r') tanpa parsing maupun salinan.
+
+Kunci cache = sumber data + hash parameter + versi kode yang menghasilkan
+data (isi file modul generator/skema/format). Parameter atau kode berubah
+berarti kunci baru; kunci lama dibersihkan lewat `clear`.
+
+INVENTORY_CACHE_DIR mengatur lokasi (default data/cache); string kosong
+mematikan cache.
+
+Contoh (bangun cache sebelum deploy):
+    INVENTORY_N_SALES=10000000 python disk_cache.py build
+    python disk_cache.py info
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import time
+
+import shared_store
+
+CACHE_DIR = os.environ.get('INVENTORY_CACHE_DIR', os.path.join('data', 'cache'))
+
+
+def _module_digest(module):
+    # Versi kode sebuah modul = hash isi file sumbernya
+    with open(importlib.import_module(module).__file__, 'rb') as source:
+        return hashlib.sha1(source.read()).hexdigest()
+
+
+def source_key(source, params, modules=()):
+    """Kunci cache untuk `source` dengan parameter dan modul kode penghasil data."""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode())
+    for module in ('shared_store', *modules):
+        digest.update(_module_digest(module).encode())
+    return f'{source}-{digest.hexdigest()[:16]}'
+
+
+def synthetic_params(environ=None):
+    """Parameter data rekayasa dari environment (INVENTORY_N_SALES, dst.)."""
+    environ = os.environ if environ is None else environ
+    return {
+        'n_sales': int(environ.get('INVENTORY_N_SALES', 1000)),
+        'n_purchases': int(environ.get('INVENTORY_N_PURCHASES', 200)),
+        'n_products': int(environ.get('INVENTORY_N_PRODUCTS', 20)),
+        'n_suppliers': int(environ.get('INVENTORY_N_SUPPLIERS', 5)),
+        'seed': int(environ.get('INVENTORY_SEED', 42))
+    }
+
+
+def synthetic_key(params, compact=False):
+    modules = ('data_generator', 'compact_schema') if compact else ('data_generator',)
+    return source_key('synthetic-compact' if compact else 'synthetic', params, modules)
+
+
+def synthetic_tables(params, compact=False):
+    """Data rekayasa langsung dari generator (tanpa cache)."""
+    from data_generator import generate_data
+    data = generate_data(**params)
+    if compact:
+        # ID sebagai kode/Categorical, quantity int16/int32
+        from compact_schema import compact_tables
+        data = compact_tables(data)
+    return data
+
+
+def load(loader, key, directory=CACHE_DIR):
+    """Tabel dari cache `key`; jika belum ada, dibangun dengan loader() lalu disimpan.
+
+    Beberapa proses yang mulai bersamaan hanya membangun sekali (file lock di
+    shared_store.ensure_published); sisanya menunggu lalu memetakan hasilnya.
+    """
+    if not directory:
+        return loader()
+    path = os.path.join(directory, key)
+    shared_store.ensure_published(loader, path)
+    return shared_store.attach(path)[1]
+
+
+def load_synthetic(environ=None, directory=CACHE_DIR):
+    """Data rekayasa sesuai environment (INVENTORY_N_*, INVENTORY_COMPACT) lewat cache."""
+    environ = os.environ if environ is None else environ
+    params = synthetic_params(environ)
+    compact = bool(int(environ.get('INVENTORY_COMPACT', 0)))
+    return load(lambda: synthetic_tables(params, compact), synthetic_key(params, compact), directory)
+
+
+def entries(directory=CACHE_DIR):
+    """(kunci, ukuran byte) setiap entri cache."""
+    if not directory or not os.path.isdir(directory):
+        return []
+    result = []
+    for key in sorted(os.listdir(directory)):
+        path = os.path.join(directory, key)
+        if shared_store.current_version(path) is not None:
+            result.append((key, sum(shared_store.table_bytes(path).values())))
+    return result
+
+
+def clear(directory=CACHE_DIR, keep=()):
+    """Hapus entri cache kecuali kunci di `keep`."""
+    for key, _ in entries(directory):
+        if key not in keep:
+            shutil.rmtree(os.path.join(directory, key), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cache data dashboard di disk')
+    parser.add_argument('command', choices=['build', 'info', 'clear'])
+    parser.add_argument('--directory', default=CACHE_DIR)
+    parser.add_argument('--compact', action='store_true',
+                        default=bool(int(os.environ.get('INVENTORY_COMPACT', 0))),
+                        help='skema ringkas (default dari INVENTORY_COMPACT)')
+    args = parser.parse_args(argv)
+
+    params = synthetic_params()
+    key = synthetic_key(params, args.compact)
+    if args.command == 'build':
+        start = time.perf_counter()
+        load(lambda: synthetic_tables(params, args.compact), key, args.directory)
+        print(f'Cache {key} siap dalam {time.perf_counter() - start:.2f} detik')
+    elif args.command == 'clear':
+        # Entri untuk parameter sekarang tetap disimpan
+        clear(args.directory, keep=(key,))
+
+    for name, size in entries(args.directory):
+        marker = '*' if name == key else ' '
+        print(f'{marker} {name}: {size / 1e6:10,.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""Mesin peramalan permintaan untuk seluruh katalog sekaligus.
+
+Penjualan dipivot sekali menjadi matriks padat SKU x periode (bulan), lalu
+moving average, exponential smoothing dan seasonal naive dihitung untuk semua
+SKU dengan operasi NumPy per kolom matriks. Setiap metode menghasilkan
+peramalan satu langkah ke depan untuk setiap periode historis (untuk MAE/MAPE)
+ditambah satu periode berikutnya.
+
+Menjalankan tanpa Streamlit (backend dipilih lewat INVENTORY_BACKEND):
+    python forecasting.py --output forecasts.csv --metrics-output metrics.csv
+"""
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+METHODS = ('moving_average', 'exponential_smoothing', 'seasonal_naive')
+METHOD_LABELS = {
+    'moving_average': 'Moving Average',
+    'exponential_smoothing': 'Exponential Smoothing',
+    'seasonal_naive': 'Seasonal Naive'
+}
+
+
+def demand_matrix(sales, product_ids, date_column='date', freq='M'):
+    """Matriks kuantitas SKU x periode; periode tanpa penjualan bernilai 0.
+
+    `sales` bisa berupa baris penjualan mentah (kolom date) atau kubus agregat
+    (date_column='day'); keduanya cukup punya product_id dan quantity.
+    """
+    product_index = pd.Index(product_ids)
+    if len(sales) == 0:
+        return np.zeros((len(product_index), 0)), product_index, pd.PeriodIndex([], freq=freq)
+
+    periods = sales[date_column].dt.to_period(freq)
+    period_index = pd.period_range(periods.min(), periods.max(), freq=freq)
+    rows = product_index.get_indexer(sales['product_id'])
+    cols = _period_offsets(periods, period_index)
+
+    known = rows >= 0
+    flat = rows[known] * len(period_index) + cols[known]
+    matrix = np.bincount(
+        flat, weights=sales['quantity'].to_numpy()[known].astype(np.float64),
+        minlength=len(product_index) * len(period_index)
+    ).reshape(len(product_index), len(period_index))
+    return matrix, product_index, period_index
+
+
+def _period_offsets(periods, period_index):
+    # Posisi kolom periode lewat ordinal (tanpa objek Period per baris)
+    ordinals = periods.array.asi8
+    return (ordinals - period_index[0].ordinal).astype(np.int64)
+
+
+def moving_average(matrix, window):
+    """Rata-rata `window` periode sebelumnya; kolom terakhir = periode berikutnya."""
+    n_products, n_periods = matrix.shape
+    cumulative = np.zeros((n_products, n_periods + 1))
+    np.cumsum(matrix, axis=1, out=cumulative[:, 1:])
+    forecast = np.full((n_products, n_periods + 1), np.nan)
+    if n_periods >= window:
+        forecast[:, window:] = (cumulative[:, window:] - cumulative[:, :-window]) / window
+    return forecast
+
+
+def exponential_smoothing(matrix, alpha):
+    """Simple exponential smoothing, level awal = aktual periode pertama."""
+    n_products, n_periods = matrix.shape
+    forecast = np.full((n_products, n_periods + 1), np.nan)
+    if n_periods == 0:
+        return forecast
+    level = matrix[:, 0].astype(np.float64)
+    for t in range(1, n_periods + 1):
+        forecast[:, t] = level
+        if t < n_periods:
+            level = alpha * matrix[:, t] + (1 - alpha) * level
+    return forecast
+
+
+def seasonal_naive(matrix, season_length):
+    """Nilai aktual pada periode yang sama satu musim sebelumnya."""
+    n_products, n_periods = matrix.shape
+    forecast = np.full((n_products, n_periods + 1), np.nan)
+    if n_periods >= season_length:
+        forecast[:, season_length:] = matrix[:, :n_periods + 1 - season_length]
+    return forecast
+
+
+def error_metrics(matrix, forecast):
+    """MAE dan MAPE (%) per SKU untuk periode historis yang punya peramalan."""
+    fitted = forecast[:, :matrix.shape[1]]
+    error = np.abs(matrix - fitted)
+    pct = np.where(np.isnan(fitted) | (matrix == 0), np.nan, error / np.where(matrix == 0, 1, matrix))
+    # SKU tanpa periode yang bisa dievaluasi menghasilkan NaN (tanpa peringatan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        mae = np.nanmean(error, axis=1)
+        mape = np.nanmean(pct, axis=1) * 100
+    return mae, mape
+
+
+class ForecastResult:
+    """Hasil peramalan seluruh katalog; halaman cukup melakukan lookup per SKU."""
+
+    def __init__(self, matrix, product_ids, periods, forecasts, params):
+        self.matrix = matrix
+        self.product_ids = product_ids
+        self.periods = periods
+        self.forecasts = forecasts  # (metode, parameter) -> array SKU x (periode + 1)
+        self.params = params
+
+    def months(self, include_next=True):
+        months = self.periods.astype(str).tolist()
+        if include_next and len(self.periods):
+            months.append(str(self.periods[-1] + 1))
+        return months
+
+    def product_position(self, product_id):
+        return self.product_ids.get_loc(product_id)
+
+    def forecast(self, method, param=None):
+        """Array SKU x (periode + 1); param None = parameter pertama metode itu."""
+        return self.forecasts[(method, self._param(method, param))]
+
+    def product_frame(self, product_id, method='moving_average', param=None):
+        """Aktual dan peramalan bulanan satu SKU (baris terakhir = bulan berikutnya)."""
+        row = self.product_position(product_id)
+        forecast = self.forecast(method, param)[row]
+        quantity = np.append(self.matrix[row], np.nan)
+        return pd.DataFrame({'month': self.months(), 'quantity': quantity, 'forecast': forecast})
+
+    def _param(self, method, param):
+        return self.params[method][0] if param is None else param
+
+    def metrics(self):
+        """MAE/MAPE per SKU, metode dan parameter (format panjang)."""
+        frames = []
+        for (method, param), forecast in self.forecasts.items():
+            mae, mape = error_metrics(self.matrix, forecast)
+            frames.append(pd.DataFrame({
+                'product_id': self.product_ids, 'method': method, 'param': param,
+                'mae': mae, 'mape': mape
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def next_period(self):
+        """Peramalan periode berikutnya per SKU untuk setiap metode dan parameter."""
+        columns = {'product_id': self.product_ids}
+        for (method, param), forecast in self.forecasts.items():
+            columns[f'{method}_{param}'] = forecast[:, -1] if forecast.shape[1] else np.nan
+        return pd.DataFrame(columns)
+
+    def to_long(self):
+        """Semua peramalan dalam format panjang: product_id, month, method, param, actual, forecast."""
+        months = self.months()
+        n_products, n_months = len(self.product_ids), len(months)
+        actual = np.hstack([self.matrix, np.full((n_products, 1), np.nan)]).ravel()
+        frames = []
+        for (method, param), forecast in self.forecasts.items():
+            frames.append(pd.DataFrame({
+                'product_id': np.repeat(np.asarray(self.product_ids), n_months),
+                'month': np.tile(months, n_products),
+                'method': method,
+                'param': param,
+                'actual': actual,
+                'forecast': forecast.ravel()
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+
+def forecast_catalog(sales, product_ids, windows=(2, 3, 4, 5, 6), alphas=(0.3,),
+                     season_lengths=(12,), date_column='date'):
+    """Hitung semua metode untuk semua SKU dari satu matriks SKU x bulan."""
+    matrix, product_index, periods = demand_matrix(sales, product_ids, date_column)
+    forecasts = {}
+    for window in windows:
+        forecasts[('moving_average', window)] = moving_average(matrix, window)
+    for alpha in alphas:
+        forecasts[('exponential_smoothing', alpha)] = exponential_smoothing(matrix, alpha)
+    for season_length in season_lengths:
+        forecasts[('seasonal_naive', season_length)] = seasonal_naive(matrix, season_length)
+    params = {
+        'moving_average': list(windows),
+        'exponential_smoothing': list(alphas),
+        'seasonal_naive': list(season_lengths)
+    }
+    return ForecastResult(matrix, product_index, periods, forecasts, params)
+
+
+def main(argv=None):
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='Peramalan permintaan seluruh katalog (headless)')
+    parser.add_argument('--output', default='forecasts.csv',
+                        help='tabel peramalan bulan berikutnya per SKU (.csv atau .parquet)')
+    parser.add_argument('--metrics-output', help='tabel MAE/MAPE per SKU dan metode')
+    parser.add_argument('--history-output', help='semua peramalan historis (format panjang)')
+    parser.add_argument('--windows', type=int, nargs='+', default=[2, 3, 4, 5, 6])
+    parser.add_argument('--alphas', type=float, nargs='+', default=[0.3])
+    parser.add_argument('--season-lengths', type=int, nargs='+', default=[12])
+    args = parser.parse_args(argv)
+
+    backend = backend_from_env()
+    products = backend.read_table('products', columns=['product_id'])
+    sales = backend.read_table('sales', columns=['date', 'product_id', 'quantity'])
+    result = forecast_catalog(sales, products['product_id'], args.windows, args.alphas,
+                              args.season_lengths)
+
+    outputs = [(args.output, result.next_period())]
+    if args.metrics_output:
+        outputs.append((args.metrics_output, result.metrics()))
+    if args.history_output:
+        outputs.append((args.history_output, result.to_long()))
+    for path, table in outputs:
+        if path.endswith('.parquet'):
+            table.to_parquet(path, index=False)
+        else:
+            table.to_csv(path, index=False)
+        print(f'{len(table):,} baris ditulis ke {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+"""Ingestion transaksi baru secara bertahap (batch) tanpa memuat ulang riwayat.
+
+Sumber transaksi:
+- drop files: file sales*.csv / sales*.jsonl / purchases*.csv / purchases*.jsonl
+  di satu direktori. File diklaim dengan rename atomik (aman untuk beberapa
+  sesi sekaligus), dibaca per chunk, lalu dipindah ke subdirektori processed/.
+- queue: queue.Queue berisi pasangan (tabel, record dict) sebagai pengganti
+  message broker lokal.
+
+Setiap batch mengurangi stok (penjualan) atau menambah stok (pembelian) lewat
+array per produk dan menambah total berjalan; agregat hariannya digabung ke
+AggregateCube sekali per pemanggilan ingest_batches(). Baris mentah tidak disimpan, jadi memori hanya sebesar satu
+chunk ditambah kubus agregat.
+
+Uji beban tanpa Streamlit:
+    python ingestion.py --drop-dir incoming --write-sample 1000000
+    python ingestion.py --drop-dir incoming
+"""
+import argparse
+import glob
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import PURCHASE_KEYS, SALES_KEYS, combine_aggregates
+from compact_schema import dimension_codes
+
+DEFAULT_CHUNKSIZE = int(os.environ.get('INVENTORY_INGEST_CHUNKSIZE', 50_000))
+FILE_PATTERNS = {
+    'sales': ('sales*.csv', 'sales*.jsonl'),
+    'purchases': ('purchases*.csv', 'purchases*.jsonl')
+}
+# Tampungan agregat per tabel diringkas setiap sekian chunk
+PENDING_COMBINE = 32
+CUBE_KEYS = {'sales': SALES_KEYS, 'purchases': PURCHASE_KEYS}
+CLAIMED_SUFFIX = '.claimed'
+FAILED_SUFFIX = '.failed'
+PROCESSED_DIR = 'processed'
+
+# Kolom minimum per tabel; total dihitung dari harga satuan jika tidak ada
+REQUIRED_COLUMNS = {
+    'sales': ['date', 'product_id', 'quantity'],
+    'purchases': ['date', 'product_id', 'supplier_id', 'quantity']
+}
+TOTAL_COLUMNS = {
+    'sales': ('total_price', 'unit_price'),
+    'purchases': ('total_cost', 'unit_cost')
+}
+
+
+def check_columns(table, columns):
+    """ValueError jika kolom minimum tabel tidak ada di `columns`."""
+    missing = [column for column in REQUIRED_COLUMNS[table] if column not in columns]
+    total, unit = TOTAL_COLUMNS[table]
+    if total not in columns and unit not in columns:
+        missing.append(f'{total}/{unit}')
+    if missing:
+        raise ValueError(f'{table}: kolom tidak ada: {", ".join(missing)}')
+
+
+def normalize(table, df):
+    """(baris, jumlah tidak valid): kolom yang dibutuhkan kubus dengan tipe konsisten.
+
+    Baris dengan tanggal, quantity atau nilai yang tidak bisa dibaca dibuang.
+    """
+    check_columns(table, df.columns)
+    total, unit = TOTAL_COLUMNS[table]
+    quantity = pd.to_numeric(df['quantity'], errors='coerce')
+    amount = pd.to_numeric(df[total], errors='coerce') if total in df.columns else \
+        quantity * pd.to_numeric(df[unit], errors='coerce')
+    result = pd.DataFrame({
+        'date': pd.to_datetime(df['date'], errors='coerce').astype('datetime64[ns]'),
+        'product_id': df['product_id'].astype(str),
+        'quantity': quantity,
+        total: amount
+    })
+    if table == 'purchases':
+        result.insert(2, 'supplier_id', df['supplier_id'].astype(str))
+    valid = result[['date', 'quantity', total]].notna().all(axis=1).to_numpy()
+    result = result[valid] if not valid.all() else result
+    return result.astype({'quantity': np.int64}), int((~valid).sum())
+
+
+class Ingestor:
+    """Menerapkan batch transaksi ke stok, kubus agregat dan total berjalan."""
+
+    def __init__(self, cube, products):
+        self.cube = cube
+        self.product_ids = pd.Index(products['product_id'].astype(str))
+        self.initial_stock = products['stock'].to_numpy(dtype=np.int64)
+        self.stock = self.initial_stock.copy()
+        self.version = 0
+        self.totals = {
+            'sales_rows': 0,
+            'purchase_rows': 0,
+            'rejected_rows': 0,
+            'revenue': 0.0,
+            'cost': 0.0,
+            'units_sold': 0,
+            'units_purchased': 0,
+            'batches': 0,
+            'seconds': 0.0,
+            'last_date': None
+        }
+        self._lock = threading.Lock()
+
+    def ingest(self, sales=None, purchases=None):
+        """Terapkan satu batch; kembalikan jumlah baris yang diterima."""
+        pending = {table: [] for table in FILE_PATTERNS}
+        accepted = self._apply(sales, purchases, pending)
+        self._flush(pending)
+        return accepted
+
+    def ingest_batches(self, batches):
+        """Konsumsi iterator (tabel, DataFrame) dari drop_file_batches/queue_batches.
+
+        Stok dan total berjalan diperbarui per chunk, sedangkan agregat harian
+        tiap chunk ditampung lalu digabung ke kubus sekali di akhir, sehingga
+        kubus tidak di-concat + groupby ulang untuk setiap chunk.
+        """
+        accepted = 0
+        pending = {table: [] for table in FILE_PATTERNS}
+        try:
+            for table, df in batches:
+                accepted += self._apply(pending=pending, **{table: df})
+        finally:
+            # Tutup generator sekarang (bukan saat garbage collection) agar
+            # drop file yang sedang dibaca langsung ditandai .failed
+            close = getattr(batches, 'close', None)
+            if close is not None:
+                close()
+            # Chunk yang sudah mengubah stok tetap masuk kubus walau ada error
+            self._flush(pending)
+        return accepted
+
+    def _apply(self, sales=None, purchases=None, pending=None):
+        # Normalisasi satu batch, ubah stok dan total berjalan, lalu tampung
+        # agregat hariannya di `pending` (per tabel) untuk digabung oleh _flush
+        start = time.perf_counter()
+        batches = {}
+        rejected = 0
+        for table, df in (('sales', sales), ('purchases', purchases)):
+            if df is None or len(df) == 0:
+                continue
+            rows, invalid = normalize(table, df)
+            codes = dimension_codes(rows['product_id'], self.product_ids)
+            known = codes >= 0
+            rejected += invalid + int((~known).sum())
+            if not known.all():
+                rows, codes = rows[known], codes[known]
+            if len(rows):
+                batches[table] = (rows, codes)
+        new_sales, new_purchases = self.cube.aggregate(
+            new_sales=batches.get('sales', (None,))[0],
+            new_purchases=batches.get('purchases', (None,))[0]
+        )
+
+        with self._lock:
+            self.totals['rejected_rows'] += rejected
+            if not batches:
+                return 0
+            accepted = 0
+            for table, (rows, codes) in batches.items():
+                quantity = rows['quantity'].to_numpy()
+                delta = np.bincount(codes, weights=quantity, minlength=len(self.stock)).astype(np.int64)
+                if table == 'sales':
+                    self.stock -= delta
+                    self.totals['sales_rows'] += len(rows)
+                    self.totals['units_sold'] += int(quantity.sum())
+                    self.totals['revenue'] += float(rows['total_price'].sum())
+                else:
+                    self.stock += delta
+                    self.totals['purchase_rows'] += len(rows)
+                    self.totals['units_purchased'] += int(quantity.sum())
+                    self.totals['cost'] += float(rows['total_cost'].sum())
+                last_date = rows['date'].max()
+                if self.totals['last_date'] is None or last_date > self.totals['last_date']:
+                    self.totals['last_date'] = last_date
+                accepted += len(rows)
+            self.totals['batches'] += 1
+            self.totals['seconds'] += time.perf_counter() - start
+
+        for table, new in (('sales', new_sales), ('purchases', new_purchases)):
+            if new is not None:
+                pending[table].append(new)
+                if len(pending[table]) >= PENDING_COMBINE:
+                    # Ringkas tampungan agar memorinya tetap sebesar kubus harian
+                    pending[table] = [combine_aggregates(pending[table], CUBE_KEYS[table])]
+        return accepted
+
+    def _flush(self, pending):
+        # Gabungkan agregat tampungan ke kubus: satu merge per tabel
+        if not any(pending.values()):
+            return
+        start = time.perf_counter()
+        sales = combine_aggregates(pending['sales'], SALES_KEYS)
+        purchases = combine_aggregates(pending['purchases'], PURCHASE_KEYS)
+        with self._lock:
+            self.cube.load_aggregates(sales, purchases)
+            self.version += 1
+            self.totals['seconds'] += time.perf_counter() - start
+        for frames in pending.values():
+            frames.clear()
+
+    def live_products(self, products):
+        """Salinan tabel produk (boleh subset) dengan stok terkini."""
+        codes = dimension_codes(products['product_id'].astype(str), self.product_ids)
+        live = products.copy()
+        known = codes >= 0
+        stock = products['stock'].to_numpy(dtype=np.int64).copy()
+        stock[known] = self.stock[codes[known]]
+        live['stock'] = stock
+        return live
+
+    def summary(self):
+        """Total berjalan plus throughput (baris per detik waktu ingestion)."""
+        with self._lock:
+            summary = dict(self.totals)
+        rows = summary['sales_rows'] + summary['purchase_rows']
+        summary['rows_per_second'] = rows / summary['seconds'] if summary['seconds'] else 0.0
+        return summary
+
+
+def _read_chunks(path, chunksize, fmt):
+    if fmt == 'jsonl':
+        return pd.read_json(path, lines=True, chunksize=chunksize, dtype=False)
+    return pd.read_csv(path, chunksize=chunksize)
+
+
+def pending_files(directory):
+    """Drop file yang belum diklaim, (tabel, path) terurut per nama file."""
+    files = []
+    for table, patterns in FILE_PATTERNS.items():
+        for pattern in patterns:
+            files.extend((table, path) for path in glob.glob(os.path.join(directory, pattern)))
+    return sorted(files, key=lambda item: os.path.basename(item[1]))
+
+
+def drop_file_batches(directory, chunksize=DEFAULT_CHUNKSIZE, failed=None):
+    """Iterator (tabel, chunk) dari semua drop file yang berhasil diklaim.
+
+    Skema setiap chunk diperiksa sebelum diserahkan ke konsumen. File yang
+    gagal dibaca atau tidak lengkap kolomnya, atau yang tidak selesai
+    dikonsumsi (iterator ditutup di tengah jalan), diberi akhiran .failed dan
+    tidak diulang otomatis, karena chunk sebelumnya mungkin sudah diterapkan.
+    Kesalahan tidak dilempar ulang agar file berikutnya tetap diproses;
+    (path, pesan) file yang gagal ditambahkan ke list `failed` bila diberikan.
+    """
+    processed = os.path.join(directory, PROCESSED_DIR)
+    for table, path in pending_files(directory):
+        claimed = path + CLAIMED_SUFFIX
+        try:
+            # Rename atomik: hanya satu pembaca yang mendapatkan file ini
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            continue
+        completed = False
+        try:
+            with _read_chunks(claimed, chunksize, path.rsplit('.', 1)[-1]) as reader:
+                for chunk in reader:
+                    check_columns(table, chunk.columns)
+                    yield table, chunk
+            completed = True
+        except Exception as error:
+            if failed is not None:
+                failed.append((path, str(error)))
+        finally:
+            # Juga saat GeneratorExit: file yang tidak selesai tidak boleh tertinggal .claimed
+            if completed:
+                os.makedirs(processed, exist_ok=True)
+                os.replace(claimed, os.path.join(processed, os.path.basename(path)))
+            else:
+                os.replace(claimed, path + FAILED_SUFFIX)
+
+
+def queue_batches(source, batch_size=DEFAULT_CHUNKSIZE, timeout=0.0):
+    """Kuras queue berisi (tabel, record) menjadi batch DataFrame per tabel.
+
+    Berhenti saat queue kosong (setelah menunggu `timeout` detik); setiap batch
+    paling banyak batch_size record sehingga memori tetap terbatas.
+    """
+    pending = {table: [] for table in FILE_PATTERNS}
+    while True:
+        try:
+            table, record = source.get(timeout=timeout) if timeout else source.get_nowait()
+        except queue.Empty:
+            break
+        pending[table].append(record)
+        if len(pending[table]) >= batch_size:
+            yield table, pd.DataFrame.from_records(pending[table])
+            pending[table] = []
+    for table, records in pending.items():
+        if records:
+            yield table, pd.DataFrame.from_records(records)
+
+
+def write_sample(directory, n_sales, n_purchases=None, n_files=4, seed=7, fmt='csv'):
+    """Tulis transaksi sintetis sebagai drop file untuk uji beban."""
+    from data_generator import generate_data
+
+    n_purchases = max(1, n_sales // 5) if n_purchases is None else n_purchases
+    data = generate_data(n_sales=n_sales, n_purchases=n_purchases, seed=seed)
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime('%Y%m%d%H%M%S')
+    paths = []
+    for table in ('purchases', 'sales'):
+        for part, chunk in enumerate(np.array_split(np.arange(len(data[table])), n_files)):
+            path = os.path.join(directory, f'{table}_{stamp}_{part:03d}.{fmt}')
+            tmp = path + '.tmp'
+            rows = data[table].iloc[chunk]
+            if fmt == 'jsonl':
+                rows.to_json(tmp, orient='records', lines=True, date_format='iso')
+            else:
+                rows.to_csv(tmp, index=False)
+            # Tulis ke file sementara lalu rename agar pembaca tidak melihat file setengah jadi
+            os.replace(tmp, path)
+            paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    from aggregates import CUBE_REQUIREMENTS, AggregateCube
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='Ingestion transaksi dari drop files (headless)')
+    parser.add_argument('--drop-dir', required=True)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--write-sample', type=int, metavar='N',
+                        help='tulis N penjualan (dan N/5 pembelian) sintetis ke drop dir lalu keluar')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    args = parser.parse_args(argv)
+
+    if args.write_sample:
+        paths = write_sample(args.drop_dir, args.write_sample, fmt=args.format)
+        print(f'{len(paths)} file ditulis ke {args.drop_dir}')
+        return
+
+    backend = backend_from_env()
+    products = backend.read_table('products')
+    raw = backend.load(CUBE_REQUIREMENTS)
+    cube = AggregateCube.build(products, raw['sales'], raw['purchases'])
+    del raw
+
+    ingestor = Ingestor(cube, products)
+    failed = []
+    start = time.perf_counter()
+    accepted = ingestor.ingest_batches(drop_file_batches(args.drop_dir, args.chunksize, failed))
+    elapsed = time.perf_counter() - start
+    for path, message in failed:
+        print(f'Gagal: {path}{FAILED_SUFFIX}: {message}')
+    summary = ingestor.summary()
+    print(f"{accepted:,} baris diterima, {summary['rejected_rows']:,} ditolak dalam "
+          f"{elapsed:.2f} detik ({accepted / elapsed if elapsed else 0:,.0f} baris/detik termasuk baca file)")
+    print(f"Pendapatan +Rp {summary['revenue']:,.0f}, pembelian +Rp {summary['cost']:,.0f}, "
+          f"terjual {summary['units_sold']:,} unit, dibeli {summary['units_purchased']:,} unit")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,26 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import date
+import os
 import warnings
+
+import analytics
+from aggregates import CUBE_REQUIREMENTS
+from classification import ABC_CLASSES, PERIOD_FREQS, SLOW_MOVER_DAYS, XYZ_CLASSES
+from costing import METHOD_LABELS as COSTING_METHODS
+from data_backend import DIMENSION_TABLES, PAGE_REQUIREMENTS, backend_from_env
+import disk_cache
+from forecasting import METHOD_LABELS
+from ingestion import Ingestor, drop_file_batches, pending_files
+from memo import cache_stats
+import parallel
+import profiling
+import rendering
+from warmup import Warmer
 warnings.filterwarnings('ignore')
+# plotly.express / plotly.graph_objects diimpor di halaman saat grafik pertama
+# dibuat, sehingga judul, sidebar dan metrik sudah tampil sebelum plotly dimuat
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -16,110 +31,130 @@ st.set_page_config(
 )
 
 # Data rekayasa untuk contoh
+# Ukuran data bisa diperbesar lewat environment variable untuk load test,
+# mis. INVENTORY_N_SALES=10000000 streamlit run inventory_management.py
+# Tabel disimpan di cache disk (INVENTORY_CACHE_DIR): restart berikutnya
+# memetakan file kolom tanpa membangkitkan ulang data
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+def load_synthetic_data():
+    return disk_cache.load_synthetic()
+
+# Backend data: synthetic (default), Parquet, atau SQLite lewat INVENTORY_BACKEND
+@st.cache_resource
+def get_backend():
+    return backend_from_env(load_synthetic_data)
+
+# Data per halaman: hanya kolom yang dibutuhkan, filter didorong ke storage.
+# Hasil dipakai bersama (tanpa salinan), jadi halaman tidak boleh mengubahnya.
+@st.cache_resource(max_entries=32)
+def load_page_data(menu, backend_key, start_date=None, end_date=None, categories=None):
+    return backend.load(PAGE_REQUIREMENTS[menu], start_date, end_date, categories)
+
 @st.cache_data
-def load_data():
-    # Data produk
-    products = {
-        'product_id': [f'P{str(i).zfill(3)}' for i in range(1, 21)],
-        'product_name': [
-            'Laptop ASUS X441', 'Smartphone Samsung A32', 'Monitor LG 24"', 
-            'Keyboard Mechanical', 'Mouse Wireless', 'Headphone Bluetooth',
-            'Printer Epson L3210', 'Tablet iPad 9th', 'SSD 500GB', 
-            'RAM 8GB DDR4', 'Power Supply 650W', 'Casing PC ATX',
-            'Webcam 1080p', 'Microphone USB', 'Router Wi-Fi 6',
-            'Hard Disk 1TB', 'Cooler CPU', 'VGA Card GTX 1660',
-            'Motherboard B450', 'Speaker 2.1'
-        ],
-        'category': [
-            'Elektronik', 'Elektronik', 'Elektronik', 'Aksesori', 'Aksesori',
-            'Aksesori', 'Elektronik', 'Elektronik', 'Komponen', 'Komponen',
-            'Komponen', 'Komponen', 'Aksesori', 'Aksesori', 'Jaringan',
-            'Komponen', 'Komponen', 'Komponen', 'Komponen', 'Aksesori'
-        ],
-        'unit_price': [
-            7500000, 3200000, 1800000, 450000, 250000, 600000, 
-            2800000, 4500000, 800000, 650000, 850000, 500000,
-            400000, 350000, 1200000, 900000, 350000, 3200000, 
-            1800000, 550000
-        ],
-        'stock': [
-            45, 78, 32, 120, 150, 85, 25, 40, 95, 110, 65, 42,
-            88, 76, 53, 60, 92, 28, 35, 67
-        ]
-    }
-    
-    # Data penjualan
-    np.random.seed(42)
-    sales_data = []
-    start_date = datetime(2023, 1, 1)
-    
-    for i in range(1000):
-        product_idx = np.random.randint(0, 20)
-        product_id = products['product_id'][product_idx]
-        quantity = np.random.randint(1, 10)
-        price = products['unit_price'][product_idx]
-        total_price = quantity * price
-        date = start_date + timedelta(days=np.random.randint(0, 365))
-        
-        sales_data.append({
-            'sale_id': f'S{str(i).zfill(4)}',
-            'product_id': product_id,
-            'quantity': quantity,
-            'unit_price': price,
-            'total_price': total_price,
-            'date': date
-        })
-    
-    # Data supplier
-    suppliers = {
-        'supplier_id': [f'SUP{str(i).zfill(2)}' for i in range(1, 6)],
-        'supplier_name': [
-            'PT Elektronik Nusantara', 'CV Tech Solution', 
-            'PT Komponen Indonesia', 'UD Aksesori Komputer',
-            'PT Global Technology'
-        ],
-        'contact': [
-            '021-5567890', '021-5567891', '021-5567892',
-            '021-5567893', '021-5567894'
-        ]
-    }
-    
-    # Data pembelian
-    purchases = []
-    for i in range(200):
-        supplier_idx = np.random.randint(0, 5)
-        product_idx = np.random.randint(0, 20)
-        quantity = np.random.randint(10, 100)
-        price = products['unit_price'][product_idx] * 0.7  # Harga beli 70% dari harga jual
-        total_price = quantity * price
-        date = start_date + timedelta(days=np.random.randint(0, 365))
-        
-        purchases.append({
-            'purchase_id': f'PUR{str(i).zfill(4)}',
-            'product_id': products['product_id'][product_idx],
-            'supplier_id': suppliers['supplier_id'][supplier_idx],
-            'quantity': quantity,
-            'unit_cost': price,
-            'total_cost': total_price,
-            'date': date
-        })
-    
-    return {
-        'products': pd.DataFrame(products),
-        'sales': pd.DataFrame(sales_data),
-        'suppliers': pd.DataFrame(suppliers),
-        'purchases': pd.DataFrame(purchases)
-    }
+def load_dimensions(backend_key):
+    return backend.load({table: None for table in DIMENSION_TABLES})
+
+# Profiling per rerun (INVENTORY_PROFILE=1 atau checkbox di sidebar; checkbox hanya
+# mencatat durasi, puncak memori hanya dengan INVENTORY_PROFILE=1 untuk seluruh proses)
+profile = profiling.start(enabled=st.session_state.get('profiling_panel', profiling.ENABLED))
 
 # Memuat data
-data = load_data()
-products_df = data['products']
-sales_df = data['sales']
-suppliers_df = data['suppliers']
-purchases_df = data['purchases']
+with profiling.stage('load_dimensions'):
+    backend = get_backend()
+    backend_key = backend.cache_key()
+    dimensions = load_dimensions(backend_key)
+products_df = dimensions['products']
+suppliers_df = dimensions['suppliers']
+
+# Kubus agregat dibangun sekali per data; grafik dan metrik membaca dari sini.
+# INVENTORY_WORKERS > 1 membagi agregasi baris mentah ke process pool.
+@st.cache_resource
+def get_cube(backend_key):
+    raw = backend.load(CUBE_REQUIREMENTS)
+    return parallel.build_cube(products_df, raw['sales'], raw['purchases'])
+
+with profiling.stage('build_cube') as record:
+    cube = get_cube(backend_key)
+    record.rows = len(cube.sales) + len(cube.purchases)
+
+# Transaksi baru dari drop files (INVENTORY_INGEST_DIR) diterapkan ke kubus dan
+# stok yang sama, tanpa memuat ulang riwayat
+INGEST_DIR = os.environ.get('INVENTORY_INGEST_DIR')
+
+@st.cache_resource
+def get_ingestor(backend_key):
+    return Ingestor(get_cube(backend_key), products_df)
+
+ingestor = None
+if INGEST_DIR:
+    ingestor = get_ingestor(backend_key)
+    failed_files = []
+    with profiling.stage('ingest') as record:
+        try:
+            record.rows = ingestor.ingest_batches(drop_file_batches(INGEST_DIR, failed=failed_files))
+        except Exception as error:
+            # Halaman tetap tampil dengan data yang sudah diterapkan
+            st.error(f"Ingestion gagal: {error}")
+    for path, message in failed_files:
+        st.error(f"Drop file {os.path.basename(path)} gagal diproses (ditandai .failed): {message}")
+    products_df = ingestor.live_products(products_df)
+
+    # Cek drop dir secara berkala; rerun halaman hanya jika ada file baru
+    @st.fragment(run_every=_env_int('INVENTORY_INGEST_INTERVAL', 5))
+    def watch_drop_dir():
+        if pending_files(INGEST_DIR):
+            st.rerun()
+
+    watch_drop_dir()
+
+data_version = f'{backend_key}:{cube.version}'
+
+# Nilai default widget halaman; juga dipakai untuk prekomputasi latar
+DEFAULT_START_DATE = date(2023, 1, 1)
+DEFAULT_END_DATE = date(2023, 12, 31)
+DEFAULT_SERVICE_LEVEL = 0.95
+DEFAULT_COSTING_METHOD = 'fifo'
+MAX_HISTORY_PRODUCTS = 10  # produk per grafik stok harian
+all_categories = tuple(products_df['category'].unique())
+
+# Satu warmer per server: setiap versi data baru, hasil keenam halaman dengan
+# widget default dihitung di thread latar dan dibagi ke semua sesi
+@st.cache_resource
+def get_warmer():
+    return Warmer()
+
+warmer = get_warmer()
+warmer.refresh(data_version, [
+    (analytics.dashboard_summary, (cube, products_df, data_version), {}),
+    (analytics.sales_analysis, (cube, products_df, data_version, DEFAULT_START_DATE,
+                                DEFAULT_END_DATE, all_categories), {}),
+    (analytics.inventory_status, (products_df, data_version), {}),
+    (analytics.inventory_classification, (cube, products_df, data_version, 'M'), {}),
+    (analytics.classification_matrix, (cube, products_df, data_version, 'M', 'count'), {}),
+    (analytics.replenishment_plan, (cube, products_df, suppliers_df, data_version,
+                                    DEFAULT_SERVICE_LEVEL), {}),
+    (analytics.stock_ledger, (cube, products_df, data_version), {}),
+    (analytics.stockout_summary, (cube, products_df, data_version), {}),
+    (analytics.catalog_forecast, (cube, products_df, data_version), {}),
+    (analytics.supplier_performance, (cube, suppliers_df, data_version), {}),
+    (analytics.supplier_detail, (cube, products_df, data_version, suppliers_df['supplier_id'].iloc[0]), {}),
+    (analytics.financial_report, (cube, products_df, data_version, DEFAULT_COSTING_METHOD), {})
+])
+
+# Hasil halaman dari warmer; hasil versi lama ditampilkan selama versi baru dihitung
+refreshing = False
+
+def page_result(func, *args):
+    global refreshing
+    value, stale = warmer.fetch(func, *args)
+    refreshing = refreshing or stale
+    return value
 
 # Judul aplikasi
 st.title("📊 Sistem Manajemen Inventory & PPIC")
+refresh_badge = st.empty()
 st.markdown("---")
 
 # Sidebar untuk navigasi
@@ -133,45 +168,36 @@ menu_options = [
     "Laporan Keuangan"
 ]
 selected_menu = st.sidebar.selectbox("Pilih Menu", menu_options)
+profile.page = selected_menu
 
 # Dashboard Utama
 if selected_menu == "Dashboard Utama":
     st.header("📈 Dashboard Utama")
+    with profiling.stage('dashboard_summary'):
+        summary = page_result(analytics.dashboard_summary, cube, products_df, data_version)
     
     # Metrics
     col1, col2, col3, col4 = st.columns(4)
     
-    total_sales = sales_df['total_price'].sum()
-    total_products = products_df['product_id'].nunique()
-    total_inventory_value = (products_df['stock'] * products_df['unit_price']).sum()
-    avg_sale = sales_df['total_price'].mean()
-    
-    col1.metric("Total Penjualan", f"Rp {total_sales:,.0f}")
-    col2.metric("Jumlah Produk", total_products)
-    col3.metric("Nilai Inventory", f"Rp {total_inventory_value:,.0f}")
-    col4.metric("Rata-rata Penjualan", f"Rp {avg_sale:,.0f}")
+    col1.metric("Total Penjualan", f"Rp {summary['total_sales']:,.0f}")
+    col2.metric("Jumlah Produk", summary['total_products'])
+    col3.metric("Nilai Inventory", f"Rp {summary['total_inventory_value']:,.0f}")
+    col4.metric("Rata-rata Penjualan", f"Rp {summary['avg_sale']:,.0f}")
     
     # Grafik penjualan bulanan
     st.subheader("Trend Penjualan Bulanan")
-    sales_df['month'] = sales_df['date'].dt.to_period('M').astype(str)
-    monthly_sales = sales_df.groupby('month')['total_price'].sum().reset_index()
-    
-    fig = px.line(monthly_sales, x='month', y='total_price', 
-                  title='Trend Penjualan Bulanan')
-    st.plotly_chart(fig, use_container_width=True)
+    with profiling.stage('figure'):
+        fig = rendering.line_chart(summary['monthly_sales'], x='month', y='total_price',
+                                   title='Trend Penjualan Bulanan')
+    rendering.plotly_chart(fig)
     
     # Produk terlaris
     st.subheader("10 Produk Terlaris")
-    product_sales = sales_df.groupby('product_id').agg({
-        'quantity': 'sum',
-        'total_price': 'sum'
-    }).reset_index()
-    product_sales = product_sales.merge(products_df[['product_id', 'product_name']], on='product_id')
-    top_products = product_sales.nlargest(10, 'quantity')
-    
-    fig = px.bar(top_products, x='product_name', y='quantity', 
-                 title='Jumlah Penjualan per Produk')
-    st.plotly_chart(fig, use_container_width=True)
+    with profiling.stage('figure'):
+        import plotly.express as px
+        fig = px.bar(summary['top_products'], x='product_name', y='quantity', 
+                     title='Jumlah Penjualan per Produk')
+    rendering.plotly_chart(fig)
 
 # Analisis Penjualan
 elif selected_menu == "Analisis Penjualan":
@@ -181,32 +207,26 @@ elif selected_menu == "Analisis Penjualan":
     
     with col1:
         st.subheader("Filter Data")
-        start_date = st.date_input("Tanggal Mulai", value=datetime(2023, 1, 1))
-        end_date = st.date_input("Tanggal Akhir", value=datetime(2023, 12, 31))
+        start_date = st.date_input("Tanggal Mulai", value=DEFAULT_START_DATE)
+        end_date = st.date_input("Tanggal Akhir", value=DEFAULT_END_DATE)
         
         categories = st.multiselect(
             "Pilih Kategori",
-            options=products_df['category'].unique(),
-            default=products_df['category'].unique()
+            options=all_categories,
+            default=all_categories
         )
     
-    # Filter data
-    filtered_sales = sales_df[
-        (sales_df['date'].dt.date >= start_date) & 
-        (sales_df['date'].dt.date <= end_date)
-    ]
-    filtered_sales = filtered_sales.merge(products_df[['product_id', 'category']], on='product_id')
-    filtered_sales = filtered_sales[filtered_sales['category'].isin(categories)]
+    with profiling.stage('sales_analysis'):
+        analysis = page_result(
+            analytics.sales_analysis,
+            cube, products_df, data_version, start_date, end_date, tuple(categories)
+        )
     
     with col2:
         st.subheader("Statistik Penjualan")
-        total_filtered_sales = filtered_sales['total_price'].sum()
-        avg_filtered_sales = filtered_sales['total_price'].mean()
-        total_quantity = filtered_sales['quantity'].sum()
-        
-        st.metric("Total Penjualan (Filter)", f"Rp {total_filtered_sales:,.0f}")
-        st.metric("Rata-rata Penjualan (Filter)", f"Rp {avg_filtered_sales:,.0f}")
-        st.metric("Jumlah Item Terjual", total_quantity)
+        st.metric("Total Penjualan (Filter)", f"Rp {analysis['total_sales']:,.0f}")
+        st.metric("Rata-rata Penjualan (Filter)", f"Rp {analysis['avg_sale']:,.0f}")
+        st.metric("Jumlah Item Terjual", analysis['total_quantity'])
     
     # Visualisasi
     st.subheader("Visualisasi Penjualan")
@@ -215,29 +235,27 @@ elif selected_menu == "Analisis Penjualan":
     
     with col1:
         # Penjualan per kategori
-        sales_by_category = filtered_sales.groupby('category')['total_price'].sum().reset_index()
-        fig = px.pie(sales_by_category, values='total_price', names='category', 
-                     title='Distribusi Penjualan per Kategori')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            import plotly.express as px
+            fig = px.pie(analysis['sales_by_category'], values='total_price', names='category', 
+                         title='Distribusi Penjualan per Kategori')
+        rendering.plotly_chart(fig)
     
     with col2:
         # Top 5 produk berdasarkan pendapatan
-        top_products_revenue = filtered_sales.groupby('product_id').agg({
-            'total_price': 'sum',
-            'quantity': 'sum'
-        }).reset_index()
-        top_products_revenue = top_products_revenue.merge(
-            products_df[['product_id', 'product_name']], on='product_id'
-        )
-        top_products_revenue = top_products_revenue.nlargest(5, 'total_price')
-        
-        fig = px.bar(top_products_revenue, x='product_name', y='total_price',
-                     title='Top 5 Produk berdasarkan Pendapatan')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            fig = px.bar(analysis['top_products_revenue'], x='product_name', y='total_price',
+                         title='Top 5 Produk berdasarkan Pendapatan')
+        rendering.plotly_chart(fig)
     
-    # Tabel data penjualan
+    # Tabel data penjualan (tanggal dan kategori difilter di storage)
     st.subheader("Data Penjualan")
-    st.dataframe(filtered_sales)
+    with profiling.stage('load_page_data') as record:
+        filtered_sales = load_page_data(
+            selected_menu, backend_key, start_date, end_date, tuple(categories)
+        )['sales']
+        record.rows = len(filtered_sales)
+    rendering.paginated_dataframe(filtered_sales, key='sales_table')
 
 # Manajemen Inventory
 elif selected_menu == "Manajemen Inventory":
@@ -249,13 +267,12 @@ elif selected_menu == "Manajemen Inventory":
         st.subheader("Status Inventory")
         
         # Hitung metrics inventory
-        total_items = products_df['stock'].sum()
-        out_of_stock = (products_df['stock'] == 0).sum()
-        low_stock = ((products_df['stock'] > 0) & (products_df['stock'] <= 10)).sum()
+        with profiling.stage('inventory_status'):
+            status = page_result(analytics.inventory_status, products_df, data_version)
         
-        st.metric("Total Item dalam Inventory", total_items)
-        st.metric("Produk Habis", out_of_stock)
-        st.metric("Produk Stok Rendah (≤10)", low_stock)
+        st.metric("Total Item dalam Inventory", status['total_items'])
+        st.metric("Produk Habis", status['out_of_stock'])
+        st.metric("Produk Stok Rendah (≤10)", status['low_stock'])
     
     with col2:
         st.subheader("Filter Inventory")
@@ -263,16 +280,62 @@ elif selected_menu == "Manajemen Inventory":
         max_stock = st.slider("Stok Maksimum", 0, 200, 200)
         selected_categories = st.multiselect(
             "Kategori Produk",
-            options=products_df['category'].unique(),
-            default=products_df['category'].unique()
+            options=all_categories,
+            default=all_categories
+        )
+        col_abc, col_xyz = st.columns(2)
+        selected_abc = col_abc.multiselect("Kelas ABC", options=list(ABC_CLASSES),
+                                           default=list(ABC_CLASSES))
+        selected_xyz = col_xyz.multiselect("Kelas XYZ", options=list(XYZ_CLASSES),
+                                           default=list(XYZ_CLASSES))
+        xyz_freq = st.radio("Periode Variabilitas (XYZ)", options=list(PERIOD_FREQS),
+                            format_func=PERIOD_FREQS.get, horizontal=True)
+        slow_only = st.checkbox(f"Hanya slow mover (> {SLOW_MOVER_DAYS} hari)")
+    
+    # Klasifikasi ABC/XYZ seluruh riwayat penjualan, sekali per versi data
+    with profiling.stage('inventory_classification'):
+        classified = page_result(analytics.inventory_classification, cube, products_df,
+                                 data_version, xyz_freq)
+    
+    # Filter inventory (kategori difilter di storage)
+    with profiling.stage('load_page_data') as record:
+        category_inventory = load_page_data(
+            selected_menu, backend_key, categories=tuple(selected_categories)
+        )['products']
+        record.rows = len(category_inventory)
+    if ingestor is not None:
+        category_inventory = ingestor.live_products(category_inventory)
+    with profiling.stage('inventory_view'):
+        inventory = analytics.inventory_view(
+            category_inventory, classified, data_version, xyz_freq, tuple(selected_categories),
+            min_stock, max_stock, tuple(selected_abc), tuple(selected_xyz), slow_only
         )
+    filtered_inventory = inventory['filtered_inventory']
+    
+    # Matriks klasifikasi: baris ABC (kontribusi pendapatan), kolom XYZ (variabilitas)
+    st.subheader("Klasifikasi ABC/XYZ")
+    col1, col2 = st.columns([2, 1])
     
-    # Filter inventory
-    filtered_inventory = products_df[
-        (products_df['stock'] >= min_stock) & 
-        (products_df['stock'] <= max_stock) &
-        (products_df['category'].isin(selected_categories))
-    ]
+    with col2:
+        matrix_value = st.radio(
+            "Isi Matriks", options=['count', 'revenue', 'stock'],
+            format_func={'count': 'Jumlah SKU', 'revenue': 'Pendapatan', 'stock': 'Stok'}.get
+        )
+        st.metric("Slow Mover", f"{int(classified['slow_mover'].sum()):,} SKU")
+        st.metric("Median Perputaran", f"{classified['turnover'].replace(np.inf, np.nan).median():,.1f}x / tahun")
+        st.metric("Median Days of Supply",
+                  f"{classified['days_of_supply'].replace(np.inf, np.nan).median():,.0f} hari")
+    
+    with col1:
+        with profiling.stage('classification_matrix'):
+            matrix = page_result(analytics.classification_matrix, cube, products_df, data_version,
+                                 xyz_freq, matrix_value)
+        with profiling.stage('figure'):
+            import plotly.express as px
+            fig = px.imshow(matrix, text_auto=True, color_continuous_scale='Blues', aspect='auto',
+                            labels={'x': 'Kelas XYZ', 'y': 'Kelas ABC', 'color': matrix_value},
+                            title='Matriks Klasifikasi ABC x XYZ')
+        rendering.plotly_chart(fig)
     
     # Visualisasi inventory
     st.subheader("Visualisasi Inventory")
@@ -281,23 +344,90 @@ elif selected_menu == "Manajemen Inventory":
     
     with col1:
         # Inventory value by category
-        inventory_value = filtered_inventory.copy()
-        inventory_value['value'] = inventory_value['stock'] * inventory_value['unit_price']
-        value_by_category = inventory_value.groupby('category')['value'].sum().reset_index()
-        
-        fig = px.bar(value_by_category, x='category', y='value', 
-                     title='Nilai Inventory per Kategori')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            fig = px.bar(inventory['value_by_category'], x='category', y='value', 
+                         title='Nilai Inventory per Kategori')
+        rendering.plotly_chart(fig)
     
     with col2:
         # Stock distribution
-        fig = px.box(filtered_inventory, x='category', y='stock', 
-                     title='Distribusi Stok per Kategori')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            fig = rendering.quantile_box(filtered_inventory, x='category', y='stock',
+                                         title='Distribusi Stok per Kategori')
+        rendering.plotly_chart(fig)
     
     # Tabel inventory
     st.subheader("Data Inventory")
-    st.dataframe(filtered_inventory)
+    rendering.paginated_dataframe(filtered_inventory, key='inventory_table')
+    
+    # Produk yang perlu dipesan ulang
+    st.subheader("Produk di Bawah Reorder Point")
+    service_level = st.select_slider(
+        "Service Level", options=[0.90, 0.95, 0.98, 0.99], value=DEFAULT_SERVICE_LEVEL,
+        format_func=lambda level: f"{level:.0%}"
+    )
+    with profiling.stage('replenishment_plan'):
+        plan = page_result(analytics.replenishment_plan, cube, products_df, suppliers_df, data_version,
+                           service_level)
+    below_plan = plan[plan['below_reorder_point']].sort_values('days_of_cover')
+    
+    col1, col2 = st.columns(2)
+    col1.metric("Produk di Bawah Reorder Point", len(below_plan))
+    col2.metric("Total Rekomendasi Pembelian", f"{below_plan['recommended_order'].sum():,} unit")
+    rendering.paginated_dataframe(below_plan, key='reorder_table')
+    st.download_button(
+        "Unduh Tabel Reorder (CSV)",
+        page_result(analytics.replenishment_csv, cube, products_df, suppliers_df, data_version,
+                    service_level),
+        file_name="reorder_plan.csv",
+        mime="text/csv"
+    )
+    
+    # Stok historis dari ledger pergerakan (snapshot + cumsum, tanpa replay)
+    st.subheader("Stok dari Waktu ke Waktu")
+    with profiling.stage('stock_ledger'):
+        ledger = page_result(analytics.stock_ledger, cube, products_df, data_version)
+    first_date, last_date = ledger.date_range()
+    
+    if first_date is not None:
+        col1, col2 = st.columns(2)
+        history_products = col1.multiselect(
+            f"Produk (maks. {MAX_HISTORY_PRODUCTS})",
+            options=products_df['product_name'].tolist(),
+            default=products_df['product_name'].tolist()[:3],
+            max_selections=MAX_HISTORY_PRODUCTS
+        )
+        stock_date = col2.date_input(
+            "Stok pada Tanggal", value=last_date.date(),
+            min_value=first_date.date(), max_value=last_date.date()
+        )
+        history_ids = products_df.loc[
+            products_df['product_name'].isin(history_products), 'product_id'
+        ]
+        
+        if len(history_ids):
+            with profiling.stage('stock_history'):
+                history = page_result(analytics.stock_history, cube, products_df, data_version,
+                                      tuple(history_ids), first_date, last_date)
+            with profiling.stage('figure'):
+                # LTTB per produk: titik per trace dibatasi MAX_CHART_POINTS
+                fig = rendering.line_chart(history, x='date', y='stock', color='product_name',
+                                           title='Stok Harian per Produk')
+                fig.add_vline(x=pd.Timestamp(stock_date), line_dash='dot')
+            rendering.plotly_chart(fig)
+            
+            stock_on_date = history[history['date'] == pd.Timestamp(stock_date)]
+            st.dataframe(stock_on_date[['product_id', 'product_name', 'stock']], hide_index=True)
+        
+        # Jumlah hari stok habis per produk selama periode ledger
+        with profiling.stage('stockout_summary'):
+            stockouts = page_result(analytics.stockout_summary, cube, products_df, data_version)
+        st.metric("Produk Pernah Stockout", int((stockouts['stockout_days'] > 0).sum()))
+        adjusted = int((stockouts['stock_adjustment'] > 0).sum())
+        if adjusted:
+            st.caption(f"Saldo awal {adjusted} produk dikoreksi (stock_adjustment) karena riwayat "
+                       "penjualan melebihi stok tercatat; stok historis tidak pernah negatif.")
+        rendering.paginated_dataframe(stockouts, key='stockout_table')
 
 # Forecasting Demand
 elif selected_menu == "Forecasting Demand":
@@ -314,85 +444,102 @@ elif selected_menu == "Forecasting Demand":
     # Dapatkan ID produk yang dipilih
     product_id = products_df[products_df['product_name'] == selected_product]['product_id'].iloc[0]
     
-    # Filter data penjualan untuk produk yang dipilih
-    product_sales = sales_df[sales_df['product_id'] == product_id].copy()
-    product_sales['month'] = product_sales['date'].dt.to_period('M').astype(str)
-    monthly_sales = product_sales.groupby('month')['quantity'].sum().reset_index()
+    # Peramalan seluruh katalog dihitung sekali per versi data; di sini hanya lookup
+    with profiling.stage('catalog_forecast'):
+        catalog = page_result(analytics.catalog_forecast, cube, products_df, data_version)
     
-    if len(monthly_sales) > 1:
-        # Metode forecasting sederhana (moving average)
-        st.subheader("Peramalan dengan Moving Average")
-        window = st.slider("Window Size untuk Moving Average", 2, 6, 3)
+    if (catalog.matrix[catalog.product_position(product_id)] > 0).sum() > 1:
+        st.subheader("Metode Peramalan")
+        method = st.selectbox(
+            "Metode",
+            options=list(METHOD_LABELS),
+            format_func=METHOD_LABELS.get
+        )
+        param = None
+        if method == 'moving_average':
+            window = st.slider("Window Size untuk Moving Average", 2, 6, 3)
+            param = window
         
-        # Hitung moving average
-        monthly_sales['forecast'] = monthly_sales['quantity'].rolling(window=window).mean().shift(1)
+        with profiling.stage('demand_forecast'):
+            forecast = analytics.demand_forecast(cube, products_df, data_version, product_id, method, param)
+        monthly_sales = forecast['monthly_sales']
         
         # Visualisasi
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=monthly_sales['month'], y=monthly_sales['quantity'],
-                                mode='lines+markers', name='Aktual'))
-        fig.add_trace(go.Scatter(x=monthly_sales['month'], y=monthly_sales['forecast'],
-                                mode='lines+markers', name='Forecast'))
-        fig.update_layout(title=f'Peramalan Permintaan untuk {selected_product}',
-                         xaxis_title='Bulan',
-                         yaxis_title='Jumlah Terjual')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            import plotly.graph_objects as go
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=monthly_sales['month'], y=monthly_sales['quantity'],
+                                    mode='lines+markers', name='Aktual'))
+            fig.add_trace(go.Scatter(x=monthly_sales['month'], y=monthly_sales['forecast'],
+                                    mode='lines+markers', name='Forecast'))
+            fig.update_layout(title=f'Peramalan Permintaan untuk {selected_product}',
+                             xaxis_title='Bulan',
+                             yaxis_title='Jumlah Terjual')
+        rendering.plotly_chart(fig)
+        
+        # Akurasi peramalan historis (kosong jika riwayat lebih pendek dari metode)
+        col1, col2 = st.columns(2)
+        col1.metric("MAE", "-" if np.isnan(forecast['mae']) else f"{forecast['mae']:,.1f} unit")
+        col2.metric("MAPE", "-" if np.isnan(forecast['mape']) else f"{forecast['mape']:,.1f}%")
         
         # Tampilkan data forecasting
         st.subheader("Data Peramalan")
         st.dataframe(monthly_sales)
         
-        # Rekomendasi pembelian
-        current_stock = products_df[products_df['product_id'] == product_id]['stock'].iloc[0]
-        avg_sales = monthly_sales['quantity'].mean()
-        recommended_order = max(0, round(avg_sales * 1.5 - current_stock))
+        # Rekomendasi pembelian dari perencanaan replenishment seluruh katalog
+        with profiling.stage('replenishment_plan'):
+            plan = page_result(analytics.replenishment_plan, cube, products_df, suppliers_df,
+                               data_version, DEFAULT_SERVICE_LEVEL)
+        product_plan = plan[plan['product_id'] == product_id].iloc[0]
         
         st.subheader("Rekomendasi Pembelian")
         st.info(f"""
         Untuk produk **{selected_product}**:
-        - Stok saat ini: {current_stock} unit
-        - Rata-rata penjualan bulanan: {round(avg_sales)} unit
-        - Rekomendasi pembelian: {recommended_order} unit
+        - Stok saat ini: {product_plan['stock']} unit
+        - Rata-rata penjualan bulanan: {round(forecast['avg_sales'])} unit
+        - Safety stock: {product_plan['safety_stock']:,.0f} unit
+        - Reorder point: {product_plan['reorder_point']:,.0f} unit (lead time {product_plan['lead_time_days']:.0f} hari)
+        - EOQ: {product_plan['eoq']:,.0f} unit
+        - Rekomendasi pembelian: {product_plan['recommended_order']} unit
         """)
     else:
         st.warning("Data penjualan tidak cukup untuk melakukan peramalan. Pilih produk lain.")
+    
+    # Peramalan bulan berikutnya untuk semua produk
+    with st.expander("Peramalan Seluruh Katalog"):
+        next_period = catalog.next_period()
+        rendering.paginated_dataframe(next_period, key='catalog_forecast_table')
+        st.download_button(
+            "Unduh CSV",
+            page_result(analytics.catalog_forecast_csv, cube, products_df, data_version),
+            file_name="peramalan_katalog.csv",
+            mime="text/csv"
+        )
 
 # Analisis Supplier
 elif selected_menu == "Analisis Supplier":
     st.header("🏭 Analisis Supplier")
     
-    # Gabungkan data pembelian dengan supplier dan produk
-    purchases_analysis = purchases_df.merge(
-        suppliers_df, on='supplier_id'
-    ).merge(
-        products_df[['product_id', 'product_name', 'category']], on='product_id'
-    )
-    
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Performance Supplier")
         
         # Hitung metrics supplier
-        supplier_performance = purchases_analysis.groupby('supplier_name').agg({
-            'total_cost': 'sum',
-            'quantity': 'sum',
-            'product_id': 'nunique'
-        }).reset_index()
-        supplier_performance = supplier_performance.rename(columns={
-            'total_cost': 'total_pembelian',
-            'quantity': 'total_item',
-            'product_id': 'jumlah_produk'
-        })
+        with profiling.stage('supplier_performance'):
+            supplier_performance = page_result(analytics.supplier_performance,
+                                               cube, suppliers_df, data_version)
         
         st.dataframe(supplier_performance)
     
     with col2:
         st.subheader("Visualisasi Performance Supplier")
         
-        fig = px.bar(supplier_performance, x='supplier_name', y='total_pembelian',
-                     title='Total Pembelian per Supplier')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            import plotly.express as px
+            fig = px.bar(supplier_performance, x='supplier_name', y='total_pembelian',
+                         title='Total Pembelian per Supplier')
+        rendering.plotly_chart(fig)
     
     # Analisis lebih detail untuk supplier tertentu
     st.subheader("Analisis Detail per Supplier")
@@ -402,109 +549,111 @@ elif selected_menu == "Analisis Supplier":
     )
     
     supplier_id = suppliers_df[suppliers_df['supplier_name'] == selected_supplier]['supplier_id'].iloc[0]
-    supplier_purchases = purchases_analysis[purchases_analysis['supplier_id'] == supplier_id]
+    with profiling.stage('supplier_detail'):
+        detail = page_result(analytics.supplier_detail, cube, products_df, data_version, supplier_id)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Produk yang dibeli dari supplier ini
-        products_from_supplier = supplier_purchases.groupby('product_name').agg({
-            'quantity': 'sum',
-            'total_cost': 'sum'
-        }).reset_index()
-        
-        fig = px.pie(products_from_supplier, values='quantity', names='product_name',
-                     title=f'Distribusi Pembelian dari {selected_supplier}')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            fig = px.pie(detail['products_from_supplier'], values='quantity', names='product_name',
+                         title=f'Distribusi Pembelian dari {selected_supplier}')
+        rendering.plotly_chart(fig)
     
     with col2:
         # Trend pembelian dari supplier ini
-        supplier_purchases['month'] = supplier_purchases['date'].dt.to_period('M').astype(str)
-        monthly_purchases = supplier_purchases.groupby('month')['total_cost'].sum().reset_index()
-        
-        fig = px.line(monthly_purchases, x='month', y='total_cost',
-                      title=f'Trend Pembelian dari {selected_supplier}')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            fig = rendering.line_chart(detail['monthly_purchases'], x='month', y='total_cost',
+                                       title=f'Trend Pembelian dari {selected_supplier}')
+        rendering.plotly_chart(fig)
 
 # Laporan Keuangan
 elif selected_menu == "Laporan Keuangan":
     st.header("💰 Laporan Keuangan")
+    costing_method = st.radio(
+        "Metode Costing", options=list(COSTING_METHODS),
+        index=list(COSTING_METHODS).index(DEFAULT_COSTING_METHOD),
+        format_func=COSTING_METHODS.get, horizontal=True
+    )
+    with profiling.stage('financial_report'):
+        report = page_result(analytics.financial_report, cube, products_df, data_version, costing_method)
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.subheader("Pendapatan vs Pengeluaran")
+        st.subheader("Pendapatan vs HPP")
         
-        # Hitung total pendapatan dari penjualan
-        total_revenue = sales_df['total_price'].sum()
-        
-        # Hitung total pengeluaran dari pembelian
-        total_expense = purchases_df['total_cost'].sum()
-        
-        # Hitung profit
-        profit = total_revenue - total_expense
-        
-        st.metric("Total Pendapatan", f"Rp {total_revenue:,.0f}")
-        st.metric("Total Pengeluaran", f"Rp {total_expense:,.0f}")
-        st.metric("Laba/Rugi", f"Rp {profit:,.0f}", 
-                 delta=f"{((profit/total_revenue)*100 if total_revenue > 0 else 0):.2f}%")
+        # Laba kotor = pendapatan - HPP barang yang terjual; stok belum terjual bukan biaya
+        st.metric("Total Pendapatan", f"Rp {report['total_revenue']:,.0f}")
+        st.metric("Harga Pokok Penjualan (HPP)", f"Rp {report['total_cogs']:,.0f}")
+        st.metric("Laba Kotor", f"Rp {report['profit']:,.0f}", 
+                 delta=f"{report['profit_pct']:.2f}%")
+        st.caption(f"Total pembelian Rp {report['total_purchases']:,.0f}, "
+                   f"nilai persediaan Rp {report['inventory_value']:,.0f}")
     
     with col2:
         st.subheader("Margin per Kategori")
         
-        # Hitung margin per kategori
-        category_revenue = sales_df.merge(
-            products_df[['product_id', 'category']], on='product_id'
-        ).groupby('category')['total_price'].sum().reset_index()
-        
-        category_cost = purchases_df.merge(
-            products_df[['product_id', 'category']], on='product_id'
-        ).groupby('category')['total_cost'].sum().reset_index()
-        
-        category_margin = category_revenue.merge(category_cost, on='category')
-        category_margin['margin'] = category_margin['total_price'] - category_margin['total_cost']
-        category_margin['margin_pct'] = (category_margin['margin'] / category_margin['total_price']) * 100
-        
-        fig = px.bar(category_margin, x='category', y='margin_pct',
-                     title='Margin per Kategori (%)')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            import plotly.express as px
+            fig = px.bar(report['category_margin'], x='category', y='margin_pct',
+                         title='Margin per Kategori (%)')
+        rendering.plotly_chart(fig)
     
     with col3:
         st.subheader("Analisis Profitabilitas Produk")
         
-        # Hitung profit per produk
-        product_revenue = sales_df.groupby('product_id')['total_price'].sum().reset_index()
-        product_cost = purchases_df.groupby('product_id')['total_cost'].sum().reset_index()
-        
-        product_profit = product_revenue.merge(product_cost, on='product_id', how='outer').fillna(0)
-        product_profit['profit'] = product_profit['total_price'] - product_profit['total_cost']
-        
-        # Gabungkan dengan nama produk
-        product_profit = product_profit.merge(
-            products_df[['product_id', 'product_name']], on='product_id'
-        )
-        
         # Ambil 5 produk paling menguntungkan
-        top_profitable = product_profit.nlargest(5, 'profit')
-        
-        fig = px.bar(top_profitable, x='product_name', y='profit',
-                     title='5 Produk Paling Menguntungkan')
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.stage('figure'):
+            fig = px.bar(report['top_profitable'], x='product_name', y='profit',
+                         title='5 Produk dengan Laba Kotor Tertinggi')
+        rendering.plotly_chart(fig)
     
     # ROI Analysis
     st.subheader("Analisis ROI (Return on Investment)")
     
-    # Hitung ROI per produk
-    product_roi = product_profit.copy()
-    product_roi['roi'] = (product_roi['profit'] / product_roi['total_cost']) * 100
-    product_roi = product_roi[product_roi['total_cost'] > 0]  # Hindari division by zero
-    
     # Ambil 5 produk dengan ROI tertinggi
-    top_roi = product_roi.nlargest(5, 'roi')
-    
-    fig = px.bar(top_roi, x='product_name', y='roi',
-                 title='5 Produk dengan ROI Tertinggi')
-    st.plotly_chart(fig, use_container_width=True)
+    with profiling.stage('figure'):
+        fig = px.bar(report['top_roi'], x='product_name', y='roi',
+                     title='5 Produk dengan ROI Tertinggi (Laba Kotor / HPP)')
+    rendering.plotly_chart(fig)
+
+# Hasil sementara dari versi data sebelumnya: tampilkan badge dan rerun saat
+# prekomputasi versi ini selesai
+if refreshing:
+    refresh_badge.info("🔄 Memperbarui... menampilkan hasil versi data sebelumnya")
+
+    @st.fragment(run_every=1)
+    def watch_warmup():
+        if not warmer.pending(data_version):
+            st.rerun()
+
+    watch_warmup()
+
+# Panel profiling: durasi, jumlah baris, dan puncak memori per tahap rerun ini
+profile.finish()
+startup_seconds = profiling.first_render(profile.page)
+st.sidebar.checkbox("Panel Profiling", value=profiling.ENABLED, key='profiling_panel')
+if profile.enabled:
+    with st.sidebar.expander("Profiling Halaman", expanded=True):
+        st.caption(f"{profile.page}: {profile.total_seconds:.3f} detik")
+        st.caption(f"Start proses sampai render pertama: {startup_seconds:.2f} detik")
+        st.dataframe(profile.to_frame(), hide_index=True)
+
+# Ringkasan ingestion transaksi baru
+if ingestor is not None:
+    with st.sidebar.expander("Ingestion Transaksi"):
+        ingest_summary = ingestor.summary()
+        st.metric("Penjualan Masuk", f"{ingest_summary['sales_rows']:,}")
+        st.metric("Pembelian Masuk", f"{ingest_summary['purchase_rows']:,}")
+        st.metric("Baris Ditolak", f"{ingest_summary['rejected_rows']:,}")
+        st.caption(f"{ingest_summary['batches']:,} batch, "
+                   f"{ingest_summary['rows_per_second']:,.0f} baris/detik")
+
+# Statistik cache komputasi halaman (setelah halaman selesai dihitung)
+with st.sidebar.expander("Statistik Cache"):
+    st.dataframe(cache_stats(), hide_index=True)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,307 @@
+"""Ledger pergerakan stok dengan snapshot berkala.
+
+Pembelian adalah arus masuk dan penjualan arus keluar. Pergerakan bersih
+disimpan append-only per (hari, produk), terurut menurut hari. Kolom stock di
+tabel produk dianggap saldo penutup setelah pergerakan terakhir, sehingga saldo
+awal = stok sekarang - total pergerakan bersih.
+
+Jika riwayat transaksi tidak konsisten dengan stok sekarang (penjualan melebihi
+saldo yang tercatat), rekonstruksi mundur itu memberi saldo historis negatif
+yang bukan stok fisik. Saldo awal lalu dinaikkan ke nilai terkecil yang
+membuat seluruh kurva >= 0; selisihnya (`adjustment`, unit per SKU) adalah
+koreksi stok yang tidak tercatat, dan saldo penutup ledger = stok sekarang +
+adjustment.
+
+Setiap `snapshot_every` hari disimpan vektor saldo penutup semua SKU. Stok pada
+tanggal D = snapshot terakhir <= D ditambah pergerakan sesudahnya (binary
+search + bincount), tanpa replay seluruh riwayat. Kurva stok harian dan jumlah
+hari stockout dihitung per segmen snapshot dengan cumsum, sehingga memori
+dibatasi oleh jumlah SKU x panjang segmen.
+
+Menjalankan tanpa Streamlit:
+    python ledger.py --product P001 --date 2023-06-30
+    python ledger.py --stockouts stockout.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import dimension_codes
+
+DEFAULT_SNAPSHOT_EVERY = 30  # hari
+_NO_DAY = np.iinfo(np.int64).min  # penanda ledger kosong
+
+
+def _day_number(date):
+    return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64))
+
+
+def _day_numbers(dates):
+    return dates.to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def net_movements(product_ids, sales=None, purchases=None, date_column='date'):
+    """(hari, kode produk, jumlah) pergerakan bersih, unik dan terurut per (hari, produk)."""
+    n_products = len(product_ids)
+    parts = []
+    for rows, sign in ((purchases, 1), (sales, -1)):
+        if rows is None or len(rows) == 0:
+            continue
+        codes = dimension_codes(rows['product_id'], product_ids)
+        known = codes >= 0
+        days = _day_numbers(rows[date_column])[known]
+        quantity = rows['quantity'].to_numpy()[known].astype(np.int64) * sign
+        parts.append((days * n_products + codes[known], quantity))
+    if not parts:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    keys = np.concatenate([key for key, _ in parts])
+    quantity = np.concatenate([value for _, value in parts])
+    net = pd.Series(quantity).groupby(keys).sum()
+    net = net[net != 0]
+    keys = net.index.to_numpy()
+    return keys // n_products, keys % n_products, net.to_numpy()
+
+
+def fit_opening(closing_stock, codes, quantity):
+    """(saldo awal, koreksi) per SKU dari stok sekarang dan pergerakan bersih terurut per hari.
+
+    Saldo awal tercatat (stok - total pergerakan) dinaikkan ke nilai terkecil
+    yang membuat posisi berjalan tidak pernah negatif. Dipakai StockLedger dan
+    costing.CostLedger agar keduanya mulai dari stok yang sama.
+    """
+    closing_stock = np.asarray(closing_stock, dtype=np.int64)
+    codes = np.asarray(codes, dtype=np.int64)
+    quantity = np.asarray(quantity, dtype=np.int64)
+    n_products = len(closing_stock)
+    # Posisi berjalan per SKU relatif saldo awal 0 (sort stabil menjaga urutan hari)
+    order = np.argsort(codes, kind='stable')
+    codes, quantity = codes[order], quantity[order]
+    running = np.cumsum(quantity)
+    starts = np.flatnonzero(np.diff(codes, prepend=-1))
+    offsets = running[starts] - quantity[starts]
+    running -= np.repeat(offsets, np.diff(np.r_[starts, len(codes)]))
+    lowest = np.zeros(n_products, dtype=np.int64)
+    np.minimum.at(lowest, codes, running)
+    recorded = closing_stock - np.bincount(codes, weights=quantity, minlength=n_products).astype(np.int64)
+    opening = np.maximum(recorded, -lowest)
+    return opening, opening - recorded
+
+
+class StockLedger:
+    """Ledger stok seluruh katalog: snapshot berkala + pergerakan harian bersih."""
+
+    def __init__(self, product_ids, closing_stock, days, codes, quantity,
+                 snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+        self.product_ids = pd.Index(product_ids)
+        self.closing_stock = np.asarray(closing_stock, dtype=np.int64)
+        self.snapshot_every = snapshot_every
+        self.days = np.asarray(days, dtype=np.int64)
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.quantity = np.asarray(quantity, dtype=np.int64)
+        self._fit_opening()
+        self._build_snapshots()
+
+    @classmethod
+    def from_transactions(cls, products, sales=None, purchases=None, date_column='date',
+                          snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+        """Dari baris transaksi mentah atau kubus agregat (date_column='day')."""
+        product_ids = products['product_id']
+        days, codes, quantity = net_movements(product_ids, sales, purchases, date_column)
+        return cls(product_ids, products['stock'].to_numpy(), days, codes, quantity, snapshot_every)
+
+    @classmethod
+    def from_cube(cls, cube, products, snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+        return cls.from_transactions(products, cube.sales, cube.purchases, 'day', snapshot_every)
+
+    @property
+    def n_products(self):
+        return len(self.product_ids)
+
+    @property
+    def first_day(self):
+        return int(self.days[0]) if len(self.days) else None
+
+    @property
+    def last_day(self):
+        return int(self.days[-1]) if len(self.days) else None
+
+    def date_range(self):
+        """(tanggal pertama, tanggal terakhir) pergerakan, atau (None, None) jika kosong."""
+        if self.first_day is None:
+            return None, None
+        epoch = np.datetime64('1970-01-01', 'D')
+        return pd.Timestamp(epoch + self.first_day), pd.Timestamp(epoch + self.last_day)
+
+    def _segment_delta(self, start, end):
+        # Total pergerakan per SKU untuk posisi movement [start, end)
+        return np.bincount(self.codes[start:end], weights=self.quantity[start:end],
+                           minlength=self.n_products).astype(np.int64)
+
+    def _fit_opening(self):
+        # Saldo awal minimum agar stok tidak pernah negatif
+        _, self.adjustment = fit_opening(self.closing_stock, self.codes, self.quantity)
+        self.closing_stock = self.closing_stock + self.adjustment
+
+    def _build_snapshots(self):
+        # Snapshot 0 = saldo awal (akhir hari sebelum pergerakan pertama)
+        opening = self.closing_stock - self._segment_delta(0, len(self.days))
+        if not len(self.days):
+            self.snapshot_days = np.array([_NO_DAY])
+            self.snapshots = opening[None, :]
+            return
+        boundaries = np.arange(self.first_day - 1, self.last_day + 1, self.snapshot_every)
+        positions = np.searchsorted(self.days, boundaries, side='right')
+        snapshots = np.empty((len(boundaries), self.n_products), dtype=np.int64)
+        snapshots[0] = opening
+        for k in range(1, len(boundaries)):
+            snapshots[k] = snapshots[k - 1] + self._segment_delta(positions[k - 1], positions[k])
+        self.snapshot_days = boundaries
+        self.snapshots = snapshots
+
+    def append(self, days, codes, quantity):
+        """Tambah pergerakan baru (hari >= hari terakhir ledger); snapshot lama tidak diubah."""
+        days = np.asarray(days, dtype=np.int64)
+        if not len(days):
+            return self
+        if self.last_day is not None and days.min() < self.last_day:
+            raise ValueError('ledger append-only: pergerakan baru tidak boleh sebelum hari terakhir')
+        order = np.lexsort((codes, days))
+        codes = np.asarray(codes, dtype=np.int64)[order]
+        quantity = np.asarray(quantity, dtype=np.int64)[order]
+        start = len(self.days)
+        self.days = np.concatenate([self.days, days[order]])
+        self.codes = np.concatenate([self.codes, codes])
+        self.quantity = np.concatenate([self.quantity, quantity])
+        self.closing_stock = self.closing_stock + self._segment_delta(start, len(self.days))
+        if self.snapshot_days[0] == _NO_DAY:
+            self.snapshot_days = np.array([self.first_day - 1])
+
+        # Lanjutkan snapshot dari snapshot terakhir
+        new_days, new_snapshots = [], []
+        boundary = int(self.snapshot_days[-1])
+        stock = self.snapshots[-1]
+        position = np.searchsorted(self.days, boundary, side='right')
+        while boundary + self.snapshot_every <= self.last_day:
+            boundary += self.snapshot_every
+            end = np.searchsorted(self.days, boundary, side='right')
+            stock = stock + self._segment_delta(position, end)
+            new_days.append(boundary)
+            new_snapshots.append(stock)
+            position = end
+        if new_days:
+            self.snapshot_days = np.append(self.snapshot_days, new_days)
+            self.snapshots = np.vstack([self.snapshots, new_snapshots])
+        return self
+
+    def _locate(self, day):
+        # Snapshot terakhir <= day dan rentang posisi movement sesudahnya sampai day
+        k = max(int(np.searchsorted(self.snapshot_days, day, side='right')) - 1, 0)
+        start = np.searchsorted(self.days, self.snapshot_days[k], side='right')
+        end = np.searchsorted(self.days, day, side='right')
+        return k, start, max(start, end)
+
+    def _stock_at_day(self, day):
+        k, start, end = self._locate(day)
+        return self.snapshots[k] + self._segment_delta(start, end)
+
+    def stock_at(self, date):
+        """Saldo penutup semua SKU pada akhir tanggal `date`."""
+        return self._stock_at_day(_day_number(date))
+
+    def stock_on(self, product_id, date):
+        """Saldo penutup satu produk pada akhir tanggal `date`."""
+        code = self.product_ids.get_loc(product_id)
+        k, start, end = self._locate(_day_number(date))
+        own = self.codes[start:end] == code
+        return int(self.snapshots[k, code] + self.quantity[start:end][own].sum())
+
+    def _daily_block(self, start_day, end_day, codes=None):
+        n_days = max(end_day - start_day + 1, 0)
+        base = self._stock_at_day(start_day - 1)
+        if codes is None:
+            codes = np.arange(self.n_products)
+            rows = None
+        else:
+            codes = np.asarray(codes, dtype=np.int64)
+            # Petakan SKU terpilih ke baris matriks; SKU lain diabaikan
+            rows = np.full(self.n_products, -1, dtype=np.int64)
+            rows[codes] = np.arange(len(codes))
+        lo = np.searchsorted(self.days, start_day, side='left')
+        hi = np.searchsorted(self.days, end_day, side='right')
+        row = self.codes[lo:hi] if rows is None else rows[self.codes[lo:hi]]
+        keep = row >= 0
+        flat = row[keep] * n_days + (self.days[lo:hi][keep] - start_day)
+        movement = np.bincount(flat, weights=self.quantity[lo:hi][keep],
+                               minlength=len(codes) * n_days).reshape(len(codes), n_days)
+        return base[codes][:, None] + np.cumsum(movement, axis=1).astype(np.int64)
+
+    def daily_matrix(self, start_date, end_date, codes=None):
+        """Saldo penutup harian (SKU x hari) untuk [start_date, end_date]; codes = subset SKU."""
+        return self._daily_block(_day_number(start_date), _day_number(end_date), codes)
+
+    def daily_stock(self, start_date, end_date, product_ids=None):
+        """Kurva stok harian format panjang: date, product_id, stock."""
+        codes = None if product_ids is None else self.product_ids.get_indexer(product_ids)
+        matrix = self.daily_matrix(start_date, end_date, codes)
+        ids = self.product_ids if codes is None else self.product_ids[codes]
+        dates = pd.date_range(start_date, end_date, freq='D')
+        return pd.DataFrame({
+            'date': np.tile(dates.to_numpy(), len(ids)),
+            'product_id': np.repeat(np.asarray(ids), len(dates)),
+            'stock': matrix.ravel()
+        })
+
+    def stockout_days(self, start_date=None, end_date=None):
+        """Jumlah hari dengan saldo penutup <= 0 per SKU, dihitung per segmen snapshot."""
+        counts = np.zeros(self.n_products, dtype=np.int64)
+        start_day = self.first_day if start_date is None else _day_number(start_date)
+        end_day = self.last_day if end_date is None else _day_number(end_date)
+        if start_day is None or end_day is None:
+            return counts
+        while start_day <= end_day:
+            segment_end = min(start_day + self.snapshot_every - 1, end_day)
+            counts += (self._daily_block(start_day, segment_end) <= 0).sum(axis=1)
+            start_day = segment_end + 1
+        return counts
+
+
+def main(argv=None):
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='Stok historis dari ledger pergerakan (headless)')
+    parser.add_argument('--product', help='product_id untuk --date')
+    parser.add_argument('--date', help='tanggal (YYYY-MM-DD)')
+    parser.add_argument('--stockouts', help='tulis jumlah hari stockout per produk (.csv/.parquet)')
+    parser.add_argument('--snapshot-every', type=int, default=DEFAULT_SNAPSHOT_EVERY)
+    args = parser.parse_args(argv)
+
+    backend = backend_from_env()
+    data = backend.load({
+        'products': None,
+        'sales': ['date', 'product_id', 'quantity'],
+        'purchases': ['date', 'product_id', 'quantity']
+    })
+    ledger = StockLedger.from_transactions(data['products'], data['sales'], data['purchases'],
+                                           snapshot_every=args.snapshot_every)
+    print(f'{len(ledger.days):,} pergerakan harian, {len(ledger.snapshot_days):,} snapshot')
+
+    if args.product and args.date:
+        print(f'Stok {args.product} pada {args.date}: {ledger.stock_on(args.product, args.date):,}')
+        adjustment = ledger.adjustment[ledger.product_ids.get_loc(args.product)]
+        if adjustment:
+            print(f'  (saldo awal dikoreksi +{adjustment:,} unit: riwayat melebihi stok tercatat)')
+    if args.stockouts:
+        table = data['products'][['product_id', 'product_name']].copy()
+        table['stockout_days'] = ledger.stockout_days()
+        table['stock_adjustment'] = ledger.adjustment
+        if args.stockouts.endswith('.parquet'):
+            table.to_parquet(args.stockouts, index=False)
+        else:
+            table.to_csv(args.stockouts, index=False)
+        print(f'{len(table):,} produk ditulis ke {args.stockouts}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Memoization fungsi komputasi halaman dengan batas LRU dan TTL.
+
+Seperti st.cache_data, argumen yang namanya diawali garis bawah (mis. _cube)
+tidak ikut menjadi kunci cache; versi data dikirim sebagai argumen biasa.
+Berbeda dengan st.cache_data, hasil tidak di-pickle (tanpa salinan per rerun),
+bisa dipakai di luar Streamlit, dan punya penghitung hit/miss.
+
+Batas default diatur lewat INVENTORY_MEMO_SIZE dan INVENTORY_MEMO_TTL (detik).
+"""
+import datetime
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+DEFAULT_MAXSIZE = int(os.environ.get('INVENTORY_MEMO_SIZE', 64))
+DEFAULT_TTL = float(os.environ.get('INVENTORY_MEMO_TTL', 0)) or None
+
+# Semua cache yang dibuat memoize(), untuk laporan statistik
+_registry = {}
+
+
+class LRUCache:
+    """Cache LRU thread-safe dengan TTL opsional dan penghitung statistik."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """(True, nilai) jika ada dan belum kedaluwarsa, selain itu (False, None)."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                stored_at, value = item
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._items[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def contains(self, key):
+        """True jika kunci ada dan belum kedaluwarsa (tanpa mengubah statistik/urutan)."""
+        with self._lock:
+            item = self._items.get(key)
+            return item is not None and (self.ttl is None or time.monotonic() - item[0] < self.ttl)
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._items),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+def _freeze(value):
+    # Ubah argumen menjadi nilai hashable yang stabil
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, datetime.datetime):
+        return pd.Timestamp(value)
+    if hasattr(value, 'tolist') and not isinstance(value, (str, bytes)):
+        return _freeze(value.tolist())
+    return value
+
+
+def memoize(maxsize=None, ttl=None, name=None):
+    """Dekorator memoization; argumen berawalan '_' tidak ikut kunci cache."""
+    def decorator(func):
+        cache = LRUCache(DEFAULT_MAXSIZE if maxsize is None else maxsize,
+                         DEFAULT_TTL if ttl is None else ttl)
+        signature = inspect.signature(func)
+        cache_name = name or func.__name__
+        _registry[cache_name] = cache
+
+        def cache_key(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(
+                (arg, _freeze(value)) for arg, value in bound.arguments.items()
+                if not arg.startswith('_')
+            )
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(*args, **kwargs)
+            found, value = cache.get(key)
+            if found:
+                return value
+            value = func(*args, **kwargs)
+            cache.put(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_key = cache_key
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Statistik semua cache memoize() sebagai DataFrame (satu baris per fungsi)."""
+    rows = [dict(function=name, **cache.stats()) for name, cache in _registry.items()]
+    return pd.DataFrame(rows)
+
+
+def clear_all():
+    for cache in _registry.values():
+        cache.clear()
@@ -0,0 +1,497 @@
+"""Pembangunan kubus agregat secara paralel di process pool.
+
+Satu-satunya langkah yang membaca seluruh baris transaksi adalah agregasi ke
+kubus harian; profitabilitas per produk, drill-down supplier dan rollup
+bulanan dihitung dari kubus itu. Langkah ini dibagi ke beberapa proses:
+
+1. Proses induk hanya mengekspor kolom mentah (tanggal, ID, measure) ke file
+   memory-mapped di /dev/shm (atau direktori temp) dengan salinan kontigu.
+   Kolom yang sudah memory-mapped (backend shared) dan kode Categorical
+   dipakai langsung tanpa salinan; ID teks berbasis Arrow diekspor sebagai
+   buffer offset + data.
+2. Baris dibagi menjadi blok tetap (BLOCK_ROWS). Setiap worker membaca blok
+   miliknya, mengubah tanggal jadi nomor hari, meng-encode ID teks ke kode
+   kamus bersama, lalu menghitung agregat parsial per (hari, produk[, supplier])
+   dengan sort + reduceat. Parsial blok dibagi per partisi (kode produk atau
+   supplier modulo jumlah worker) dan ditulis ke file.
+3. Setiap worker menggabungkan satu partisi dari semua blok. Kunci antar
+   partisi tidak tumpang tindih, jadi proses induk cukup menyambung dan
+   mengurutkan hasil seukuran kubus lalu mengubah kunci jadi kolom.
+
+Batas blok tidak bergantung pada jumlah worker dan parsial digabung sesuai
+urutan blok, jadi jumlahnya (termasuk float) identik untuk berapa pun jumlah
+worker. Jalur serial (workers <= 1 atau data kecil) menjalankan fungsi blok
+dan partisi yang sama di proses ini tanpa file.
+
+Jumlah worker diatur lewat INVENTORY_WORKERS (default 1 = serial), batas
+baris minimum untuk process pool lewat INVENTORY_PARALLEL_MIN_ROWS dan ukuran
+blok lewat INVENTORY_PARALLEL_BLOCK_ROWS.
+
+Membangun kubus tanpa Streamlit:
+    INVENTORY_N_SALES=10000000 python parallel.py --workers 8
+"""
+import argparse
+import atexit
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from aggregates import PURCHASE_KEYS, PURCHASE_MEASURES, SALES_KEYS, SALES_MEASURES, AggregateCube
+
+DEFAULT_WORKERS = int(os.environ.get('INVENTORY_WORKERS', 1))
+MIN_PARALLEL_ROWS = int(os.environ.get('INVENTORY_PARALLEL_MIN_ROWS', 500_000))
+BLOCK_ROWS = int(os.environ.get('INVENTORY_PARALLEL_BLOCK_ROWS', 500_000))
+SHM_DIR = '/dev/shm'
+ID_COLUMNS = ['product_id', 'supplier_id']
+
+# Satu process pool per jumlah worker, dipakai ulang antar build (start worker mahal)
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _buffer_dir():
+    # /dev/shm = memori bersama di Linux; selain itu direktori temp biasa
+    return SHM_DIR if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK) else None
+
+
+def start_method():
+    # fork tidak aman di server Streamlit yang multi-thread
+    methods = multiprocessing.get_all_start_methods()
+    return 'forkserver' if 'forkserver' in methods else 'spawn'
+
+
+def get_executor(workers):
+    """Process pool bersama untuk `workers` proses; dibuat sekali per proses server."""
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            context = multiprocessing.get_context(start_method())
+            executor = _executors[workers] = ProcessPoolExecutor(workers, mp_context=context)
+        return executor
+
+
+def discard_executor(workers, executor):
+    """Buang pool yang rusak (worker mati) agar build berikutnya membuat pool baru."""
+    with _executors_lock:
+        if _executors.get(workers) is executor:
+            del _executors[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_executors():
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(cancel_futures=True)
+        _executors.clear()
+
+
+def resolve_workers(workers=None, n_rows=None):
+    """Jumlah proses yang dipakai; 1 berarti jalur serial."""
+    workers = DEFAULT_WORKERS if workers is None else workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if n_rows is not None and n_rows < MIN_PARALLEL_ROWS:
+        return 1
+    return workers
+
+
+def write_column(directory, name, values):
+    """Tulis array ke <directory>/<name>.bin dan kembalikan spec untuk attach()."""
+    path = os.path.join(directory, f'{name}.bin')
+    values = np.ascontiguousarray(values)
+    if len(values):
+        buffer = np.memmap(path, dtype=values.dtype, mode='w+', shape=values.shape)
+        buffer[:] = values
+        buffer.flush()
+        del buffer
+    else:
+        open(path, 'wb').close()
+    return path, values.dtype.str, len(values), 0
+
+
+def _mapped_spec(values):
+    # Array yang sudah memory-mapped dari file (mis. shared_store): cukup kirim
+    # path + offset, worker memetakan halaman yang sama tanpa salinan
+    base = values
+    while base is not None and not isinstance(base, np.memmap):
+        base = getattr(base, 'base', None)
+    if base is None or getattr(base, 'filename', None) is None or values.ndim != 1 \
+            or not values.flags.c_contiguous:
+        return None
+    offset = base.offset + values.__array_interface__['data'][0] - base.__array_interface__['data'][0]
+    return base.filename, values.dtype.str, len(values), offset
+
+
+class ColumnBuffers:
+    """Kolom NumPy dalam file memory-mapped yang bisa dipetakan worker tanpa salinan."""
+
+    def __init__(self, directory=None):
+        self.directory = tempfile.mkdtemp(prefix='inventory-columns-', dir=directory or _buffer_dir())
+
+    def write(self, name, values):
+        """Tulis array ke file dan kembalikan spec (path, dtype, panjang, offset) untuk attach()."""
+        return write_column(self.directory, name, values)
+
+    def export(self, name, values):
+        """Spec kolom untuk worker: file aslinya jika sudah memory-mapped, selain itu salinan."""
+        return _mapped_spec(values) or self.write(name, values)
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def attach(source, start, end):
+    """Slice [start, end) dari array, spec ColumnBuffers atau spec teks Arrow."""
+    if isinstance(source, dict):
+        return _attach_strings(source, start, end)
+    if not isinstance(source, tuple):
+        # Array NumPy atau Arrow di proses yang sama (jalur serial)
+        return source[start:end]
+    path, dtype, length, offset = source
+    if end <= start or not length:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(length,))[start:end]
+
+
+def _arrow_strings(values):
+    # ID teks berbasis Arrow tanpa null sebagai satu array Arrow (tanpa salinan
+    # jika hanya satu chunk); None jika kolom perlu di-factorize di proses induk
+    dtype = values.dtype
+    if not (isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow'):
+        return None
+    import pyarrow as pa
+
+    array = pa.array(values)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if array.null_count or array.offset or not (
+            pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        return None
+    return array
+
+
+def _export_strings(buffers, name, array):
+    import pyarrow as pa
+
+    _, offsets, data = array.buffers()
+    large = pa.types.is_large_string(array.type)
+    offset_dtype = np.int64 if large else np.int32
+    return {
+        'large': large,
+        'offsets': buffers.write(f'{name}.offsets', np.frombuffer(offsets, dtype=offset_dtype)[:len(array) + 1]),
+        'data': buffers.write(f'{name}.data', np.frombuffer(data, dtype=np.uint8)),
+    }
+
+
+def _attach_strings(spec, start, end):
+    import pyarrow as pa
+
+    offsets = attach(spec['offsets'], start, end + 1)
+    data = attach(spec['data'], 0, spec['data'][2])
+    kind = pa.LargeStringArray if spec['large'] else pa.StringArray
+    return kind.from_buffers(end - start, pa.py_buffer(offsets), pa.py_buffer(data))
+
+
+def _measure(values):
+    # Integer (termasuk kolom ringkas int16/int32) dijumlah sebagai int64
+    values = np.asarray(values)
+    return values.astype(np.int64) if values.dtype.kind in 'iub' else values.astype(np.float64)
+
+
+class _Columns:
+    """Kolom satu tabel transaksi yang siap dibaca per blok oleh worker.
+
+    Proses induk tidak meng-encode baris: tanggal diekspor sebagai tick int64,
+    ID sebagai kode (Categorical), buffer teks Arrow atau (cadangan) hasil
+    factorize, dan measure dengan dtype aslinya.
+    """
+
+    def __init__(self, rows, id_columns, measures, buffers=None):
+        self.n_rows = len(rows)
+        export = buffers.export if buffers is not None else (lambda name, values: values)
+        dates = rows['date'].to_numpy()
+        unit, count = np.datetime_data(dates.dtype)
+        self.ticks_per_day = int(np.timedelta64(1, 'D') // np.timedelta64(count, unit))
+        self.specs = {'date': export('date', dates.view(np.int64))}
+        self.ids = {}
+        for name in id_columns:
+            values = rows[name]
+            strings = _arrow_strings(values)
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Kode -1 (NaN) dipetakan worker ke label terakhir
+                self.ids[name] = {'kind': 'codes', 'labels': list(values.cat.categories) + [np.nan]}
+                self.specs[name] = export(name, values.array.codes)
+            elif strings is not None:
+                self.ids[name] = {'kind': 'strings', 'labels': None}
+                self.specs[name] = strings if buffers is None else _export_strings(buffers, name, strings)
+            else:
+                codes, labels = pd.factorize(values, use_na_sentinel=False)
+                self.ids[name] = {'kind': 'codes', 'labels': list(labels)}
+                self.specs[name] = export(name, codes)
+        for name in measures:
+            self.specs[name] = export(name, rows[name].to_numpy())
+        self.measures = list(measures)
+
+    def blocks(self, block_rows=None):
+        block_rows = max(block_rows or BLOCK_ROWS, 1)
+        return [(start, min(start + block_rows, self.n_rows))
+                for start in range(0, self.n_rows, block_rows)]
+
+    def string_columns(self):
+        return [name for name, entry in self.ids.items() if entry['kind'] == 'strings']
+
+    def set_dictionary(self, name, labels):
+        self.ids[name]['labels'] = list(labels)
+
+    def layout(self, n_parts, partition_by):
+        """Parameter kecil yang dikirim ke setiap tugas blok."""
+        return {
+            'ticks_per_day': self.ticks_per_day,
+            'ids': [(name, entry['kind'], entry['labels']) for name, entry in self.ids.items()],
+            'measures': self.measures,
+            'n_parts': n_parts,
+            'partition_by': partition_by if partition_by in self.ids else next(iter(self.ids)),
+        }
+
+
+def block_dictionary(spec, start, end):
+    """Nilai unik kolom ID teks pada satu blok."""
+    import pyarrow.compute as pc
+
+    return pc.unique(attach(spec, start, end)).to_pylist()
+
+
+def _block_codes(spec, kind, labels, start, end):
+    if kind == 'strings':
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        codes = pc.index_in(attach(spec, start, end), value_set=pa.array(labels))
+        return codes.to_numpy(zero_copy_only=False).astype(np.int64)
+    codes = np.asarray(attach(spec, start, end)).astype(np.int64)
+    codes[codes < 0] = len(labels) - 1
+    return codes
+
+
+def _split_key(keys, layout):
+    # Kunci gabungan -> (hari, kode per kolom ID)
+    parts = {}
+    for name, _, labels in reversed(layout['ids']):
+        parts[name] = keys % len(labels)
+        keys = keys // len(labels)
+    return keys, parts
+
+
+def _reduce(keys, sums, counts):
+    # Sort stabil: urutan baris di dalam grup tetap, jadi jumlah float deterministik
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sums = {name: np.add.reduceat(values[order], starts) for name, values in sums.items()}
+    if counts is None:
+        counts = np.diff(np.r_[starts, len(keys)])
+    else:
+        counts = np.add.reduceat(counts[order], starts)
+    return sorted_keys[starts], sums, counts
+
+
+def aggregate_block(specs, layout, start, end, directory=None, block=0):
+    """Agregat parsial baris [start, end), dibagi per partisi.
+
+    Mengembalikan (offset partisi, kolom parsial); kolom parsial berupa array
+    atau spec file di `directory` jika dijalankan di worker.
+    """
+    keys = np.floor_divide(np.asarray(attach(specs['date'], start, end)), layout['ticks_per_day'])
+    for name, kind, labels in layout['ids']:
+        keys = keys * len(labels) + _block_codes(specs[name], kind, labels, start, end)
+    sums = {name: _measure(attach(specs[name], start, end)) for name in layout['measures']}
+    keys, sums, counts = _reduce(keys, sums, None)
+
+    _, codes = _split_key(keys, layout)
+    part = codes[layout['partition_by']] % layout['n_parts']
+    order = np.argsort(part, kind='stable')
+    offsets = np.r_[0, np.cumsum(np.bincount(part, minlength=layout['n_parts']))]
+    columns = {'key': keys[order], 'n': counts[order], **{name: values[order] for name, values in sums.items()}}
+    if directory is not None:
+        columns = {name: write_column(directory, f'block{block}.{name}', values)
+                   for name, values in columns.items()}
+    return offsets, columns
+
+
+def merge_partition(partials, part):
+    """Gabungkan satu partisi dari parsial semua blok (sesuai urutan blok)."""
+    pieces = [{name: np.asarray(attach(spec, int(offsets[part]), int(offsets[part + 1])))
+               for name, spec in columns.items()}
+              for offsets, columns in partials]
+    pieces = [piece for piece in pieces if len(piece['key'])]
+    if not pieces:
+        return None
+    keys = np.concatenate([piece['key'] for piece in pieces])
+    counts = np.concatenate([piece['n'] for piece in pieces])
+    sums = {name: np.concatenate([piece[name] for piece in pieces])
+            for name in pieces[0] if name not in ('key', 'n')}
+    return _reduce(keys, sums, counts)
+
+
+def _decode(keys, sums, counts, layout, columns, category_map):
+    # Kunci gabungan -> kolom kubus (day, product_id, category[, supplier_id])
+    day, codes = _split_key(keys, layout)
+    frame = {'day': day.astype('datetime64[D]').astype('datetime64[ns]')}
+    for name, _, labels in layout['ids']:
+        # take() dari label kecil: tanpa array object seukuran kubus
+        labels = pd.Index(labels, dtype=object)
+        frame[name] = labels.astype(str).array.take(codes[name])
+        if name == 'product_id':
+            frame['category'] = labels.map(category_map).astype(str).array.take(codes[name])
+    frame.update(sums)
+    frame['n'] = counts
+    return pd.DataFrame(frame)[columns]
+
+
+@contextmanager
+def _timed(timings, phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def _no_buffers():
+    yield None
+
+
+def _run(executor, func, tasks):
+    # Tugas dijalankan di pool jika ada, selain itu berurutan di proses ini
+    if executor is None:
+        return [func(*task) for task in tasks]
+    futures = [executor.submit(func, *task) for task in tasks]
+    return [future.result() for future in futures]
+
+
+def aggregate_table(rows, keys, measures, category_map, workers=1, partition_by='product_id',
+                    executor=None, timings=None):
+    """Agregat harian satu tabel transaksi, setara aggregates._aggregate().
+
+    `timings` (dict, opsional) diisi detik per fase: 'export' dan 'decode' di
+    proses induk, 'dictionary', 'blocks' dan 'partitions' di worker.
+    """
+    columns = keys + measures
+    if rows is None or len(rows) == 0:
+        return pd.DataFrame(columns=columns)
+    id_columns = [name for name in ID_COLUMNS if name in keys]
+    value_columns = [m for m in measures if m != 'n']
+    n_parts = max(workers, 1) if executor is not None else 1
+
+    with (ColumnBuffers() if executor is not None else _no_buffers()) as buffers:
+        with _timed(timings, 'export'):
+            table = _Columns(rows, id_columns, value_columns, buffers)
+        blocks = table.blocks()
+        directory = buffers.directory if buffers is not None else None
+
+        with _timed(timings, 'dictionary'):
+            # Kamus ID teks: nilai unik per blok di worker, disatukan (kecil) di sini
+            for name in table.string_columns():
+                found = _run(executor, block_dictionary, [(table.specs[name], s, e) for s, e in blocks])
+                table.set_dictionary(name, sorted(set().union(*found)))
+        layout = table.layout(n_parts, partition_by)
+
+        with _timed(timings, 'blocks'):
+            partials = _run(executor, aggregate_block,
+                            [(table.specs, layout, start, end, directory, block)
+                             for block, (start, end) in enumerate(blocks)])
+        with _timed(timings, 'partitions'):
+            merged = _run(executor, merge_partition, [(partials, part) for part in range(n_parts)])
+
+    with _timed(timings, 'decode'):
+        merged = [part for part in merged if part is not None]
+        if not merged:
+            return pd.DataFrame(columns=columns)
+        # Partisi tidak tumpang tindih; urutkan agar hasil sama untuk semua worker
+        merged_keys = np.concatenate([part[0] for part in merged])
+        order = np.argsort(merged_keys, kind='stable')
+        sums = {name: np.concatenate([part[1][name] for part in merged])[order] for name in value_columns}
+        counts = np.concatenate([part[2] for part in merged])[order]
+        return _decode(merged_keys[order], sums, counts, layout, columns, category_map)
+
+
+def build_cube(products, sales=None, purchases=None, workers=None, partition_by='product_id',
+               timings=None):
+    """AggregateCube dari baris mentah; setara AggregateCube.build() tetapi paralel.
+
+    partition_by='supplier_id' membagi pembelian per supplier (penjualan selalu
+    per produk), berguna jika jumlah supplier jauh lebih banyak dari worker.
+
+    Jika worker mati (pool rusak, mis. kena OOM killer), pool dibuang lalu
+    dicoba sekali lagi dengan pool baru; gagal lagi berarti jalur serial.
+    """
+    n_rows = (0 if sales is None else len(sales)) + (0 if purchases is None else len(purchases))
+    workers = resolve_workers(workers, n_rows)
+    cube = AggregateCube(products)
+
+    def aggregate(executor):
+        sales_cube = aggregate_table(sales, SALES_KEYS, SALES_MEASURES, cube.category_map,
+                                     workers, 'product_id', executor, timings)
+        purchase_cube = aggregate_table(purchases, PURCHASE_KEYS, PURCHASE_MEASURES,
+                                        cube.category_map, workers, partition_by, executor, timings)
+        return sales_cube, purchase_cube
+
+    aggregates = None
+    for _ in range(2 if workers > 1 else 0):
+        executor = get_executor(workers)
+        try:
+            aggregates = aggregate(executor)
+            break
+        except BrokenProcessPool:
+            discard_executor(workers, executor)
+    if aggregates is None:
+        aggregates = aggregate(None)
+    return cube.load_aggregates(*aggregates)
+
+
+def main(argv=None):
+    from aggregates import CUBE_REQUIREMENTS
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='Bangun kubus agregat di process pool (headless)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='jumlah proses (0 = semua core, 1 = serial)')
+    parser.add_argument('--partition-by', choices=['product_id', 'supplier_id'], default='product_id')
+    args = parser.parse_args(argv)
+
+    backend = backend_from_env()
+    products = backend.read_table('products')
+    raw = backend.load(CUBE_REQUIREMENTS)
+    n_rows = len(raw['sales']) + len(raw['purchases'])
+    workers = resolve_workers(args.workers, n_rows)
+
+    timings = {}
+    start = time.perf_counter()
+    cube = build_cube(products, raw['sales'], raw['purchases'], workers, args.partition_by, timings)
+    elapsed = time.perf_counter() - start
+    print(f'{n_rows:,} baris -> {len(cube.sales):,} + {len(cube.purchases):,} baris kubus '
+          f'dengan {workers} worker dalam {elapsed:.2f} detik')
+    print('  ' + ', '.join(f'{phase} {seconds:.2f}s' for phase, seconds in timings.items()))
+
+
+if __name__ == '__main__':
+    main()
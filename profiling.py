@@ -0,0 +1,235 @@
+"""Instrumentasi ringan untuk jalur panas setiap rerun halaman.
+
+Setiap tahap bernama (muat data, komputasi, pembuatan figure, serialisasi ke
+browser) dicatat durasinya, jumlah baris, dan puncak memori yang dialokasikan
+selama tahap itu (tracemalloc). Tahap dengan nama sama dalam satu rerun
+dijumlahkan. Di akhir rerun setiap tahap ditulis sebagai log JSON ke logger
+'inventory.profile'.
+
+Diaktifkan lewat INVENTORY_PROFILE=1 (atau panel di sidebar). Saat nonaktif,
+stage() mengembalikan context manager kosong yang sama untuk setiap panggilan.
+INVENTORY_PROFILE_LOG=<file> menambahkan log JSON Lines ke file.
+
+tracemalloc berlaku untuk seluruh proses, jadi hanya dinyalakan sekali lewat
+INVENTORY_PROFILE=1 (INVENTORY_PROFILE_MEMORY=0 mematikannya) dan tidak pernah
+dihentikan. Panel di sidebar hanya mencatat durasi per sesi, sehingga satu
+pengguna tidak menambah overhead sesi lain atau mengacaukan puncak memorinya.
+Puncak memori tetap bersifat per proses: sesi yang berjalan bersamaan ikut
+terhitung.
+
+first_render() mencatat time-to-first-render: waktu dari proses dimulai
+sampai rerun pertama selesai (termasuk impor modul dan pemuatan data).
+"""
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+ENABLED = bool(int(os.environ.get('INVENTORY_PROFILE', 0)))
+TRACE_MEMORY = ENABLED and bool(int(os.environ.get('INVENTORY_PROFILE_MEMORY', 1)))
+LOG_PATH = os.environ.get('INVENTORY_PROFILE_LOG')
+
+logger = logging.getLogger('inventory.profile')
+if LOG_PATH:
+    _handler = logging.FileHandler(LOG_PATH)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# Profil rerun yang sedang berjalan; Streamlit menjalankan setiap sesi di thread sendiri
+_local = threading.local()
+
+
+class StageRecord:
+    """Statistik satu tahap dalam satu rerun."""
+
+    __slots__ = ('name', 'calls', 'seconds', 'rows', 'peak_bytes', '_base', '_peak')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = None
+        self.peak_bytes = None   # None: memori tidak dicatat
+        self._base = 0
+        self._peak = 0
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'calls': self.calls,
+            'seconds': self.seconds,
+            'rows': self.rows,
+            'peak_mb': None if self.peak_bytes is None else self.peak_bytes / 1e6
+        }
+
+
+class _Stage:
+    def __init__(self, profile, record):
+        self.profile = profile
+        self.record = record
+
+    def __enter__(self):
+        record = self.record
+        stack = self.profile._stack
+        if self.profile.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Puncak tahap luar disimpan sebelum reset_peak() oleh tahap dalam
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            record._base, record._peak = current, current
+        stack.append(record)
+        record.calls += 1
+        self._start = time.perf_counter()
+        return record
+
+    def __exit__(self, *exc):
+        record = self.record
+        record.seconds += time.perf_counter() - self._start
+        stack = self.profile._stack
+        stack.pop()
+        if self.profile.trace_memory:
+            record._peak = max(record._peak, tracemalloc.get_traced_memory()[1])
+            record.peak_bytes = max(record.peak_bytes or 0, record._peak - record._base)
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, record._peak)
+        return False
+
+
+class PageProfile:
+    """Pencatat tahap untuk satu rerun satu halaman."""
+
+    enabled = True
+
+    def __init__(self, page=None, trace_memory=TRACE_MEMORY):
+        self.page = page
+        self.trace_memory = trace_memory
+        self.records = {}
+        self._stack = []
+        self._started = time.perf_counter()
+        self.total_seconds = None
+        if trace_memory and not tracemalloc.is_tracing():
+            # Dinyalakan sekali untuk seluruh proses dan tidak dihentikan per sesi
+            tracemalloc.start()
+
+    def stage(self, name, rows=None):
+        record = self.records.get(name)
+        if record is None:
+            record = self.records[name] = StageRecord(name)
+        if rows is not None:
+            record.rows = (record.rows or 0) + rows
+        return _Stage(self, record)
+
+    def finish(self):
+        """Tutup rerun dan tulis satu log JSON per tahap."""
+        self.total_seconds = time.perf_counter() - self._started
+        for record in self.records.values():
+            logger.info(json.dumps({'event': 'stage', 'page': self.page, **record.as_dict()}))
+        logger.info(json.dumps({'event': 'rerun', 'page': self.page,
+                                'seconds': self.total_seconds}))
+        if _current() is self:
+            _local.profile = NULL_PROFILE
+        return self
+
+    def to_frame(self):
+        columns = ['stage', 'calls', 'seconds', 'rows'] + (['peak_mb'] if self.trace_memory else [])
+        frame = pd.DataFrame([record.as_dict() for record in self.records.values()], columns=columns)
+        return frame.sort_values('seconds', ascending=False, ignore_index=True)
+
+
+class _NullRecord:
+    # Atribut yang diisi pemanggil (mis. record.rows = n) diabaikan
+    def __setattr__(self, name, value):
+        pass
+
+
+class _NullStage:
+    def __enter__(self):
+        return _NULL_RECORD
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullProfile:
+    """Profil nonaktif: semua operasi no-op."""
+
+    enabled = False
+    page = None
+    records = {}
+
+    def __setattr__(self, name, value):
+        pass
+
+    def stage(self, name, rows=None):
+        return _NULL_STAGE
+
+    def finish(self):
+        return self
+
+    def to_frame(self):
+        return pd.DataFrame(columns=['stage', 'calls', 'seconds', 'rows', 'peak_mb'])
+
+
+_NULL_RECORD = _NullRecord()
+_NULL_STAGE = _NullStage()
+NULL_PROFILE = NullProfile()
+
+
+def _current():
+    return getattr(_local, 'profile', NULL_PROFILE)
+
+
+def start(page=None, enabled=None):
+    """Mulai profil rerun baru untuk thread ini dan kembalikan objeknya.
+
+    `enabled` (panel per sesi) hanya menyalakan pencatatan durasi; memori
+    dicatat hanya jika INVENTORY_PROFILE=1 untuk seluruh proses.
+    """
+    enabled = ENABLED if enabled is None else enabled
+    profile = PageProfile(page) if enabled else NULL_PROFILE
+    _local.profile = profile
+    return profile
+
+
+def stage(name, rows=None):
+    """Context manager untuk satu tahap pada profil rerun yang aktif."""
+    return _current().stage(name, rows)
+
+
+# Startup: waktu dari proses dimulai sampai render pertama selesai
+_imported = time.perf_counter()
+_first_render = None
+_first_render_lock = threading.Lock()
+
+
+def process_uptime():
+    """Detik sejak proses dimulai (Linux: /proc; lainnya: sejak modul ini diimpor)."""
+    try:
+        with open('/proc/self/stat') as stat:
+            # Field ke-22 (starttime, dalam clock tick sejak boot); comm bisa berisi spasi
+            ticks = int(stat.read().rsplit(')', 1)[1].split()[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, AttributeError, ValueError, IndexError):
+        return time.perf_counter() - _imported
+
+
+def first_render(page=None):
+    """Catat time-to-first-render sekali per proses; kembalikan detiknya.
+
+    Dipanggil di akhir setiap rerun. Hanya rerun pertama dalam proses yang
+    dicatat (log event 'first_render'); panggilan berikutnya mengembalikan
+    nilai yang sama.
+    """
+    global _first_render
+    with _first_render_lock:
+        if _first_render is None:
+            _first_render = process_uptime()
+            logger.info(json.dumps({'event': 'first_render', 'page': page,
+                                    'seconds': _first_render}))
+    return _first_render
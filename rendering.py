@@ -0,0 +1,172 @@
+"""Lapisan render untuk data besar: tabel berhalaman, box plot dari kuantil,
+dan downsampling deret waktu sebelum dikirim ke Plotly.
+
+Ukuran payload ke browser dibatasi oleh MAX_TABLE_ROWS (baris per halaman
+tabel) dan MAX_CHART_POINTS (titik per trace), berapa pun ukuran datanya.
+Keduanya bisa diatur lewat INVENTORY_MAX_TABLE_ROWS / INVENTORY_MAX_CHART_POINTS.
+Plotly baru diimpor saat figure pertama dibuat agar start aplikasi lebih cepat.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from profiling import stage
+
+MAX_TABLE_ROWS = int(os.environ.get('INVENTORY_MAX_TABLE_ROWS', 1000))
+MAX_CHART_POINTS = int(os.environ.get('INVENTORY_MAX_CHART_POINTS', 2000))
+PAGE_SIZES = [25, 50, 100, 250, 500, 1000]
+
+
+# Tabel
+def page_bounds(n_rows, page, page_size):
+    """Posisi [start, end) untuk halaman ke-`page` (mulai dari 1)."""
+    page_size = max(1, min(page_size, MAX_TABLE_ROWS))
+    n_pages = max(1, -(-n_rows // page_size))
+    page = min(max(1, page), n_pages)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_rows), n_pages
+
+
+def paginated_dataframe(df, key, page_size=100):
+    """Tampilkan satu halaman tabel saja; baris lain tidak pernah dikirim ke browser."""
+    n_rows = len(df)
+    # Batas MAX_TABLE_ROWS juga berlaku untuk tabel kecil yang ditampilkan utuh
+    page_size = max(1, min(page_size, MAX_TABLE_ROWS))
+    if n_rows <= page_size:
+        with stage('render_table', rows=n_rows):
+            st.dataframe(df)
+        return
+
+    sizes = [size for size in PAGE_SIZES if size <= MAX_TABLE_ROWS] or [MAX_TABLE_ROWS]
+    col1, col2, col3 = st.columns([1, 1, 2])
+    size = col1.selectbox("Baris per halaman", sizes,
+                          index=sizes.index(page_size) if page_size in sizes else 0,
+                          key=f'{key}_page_size')
+    n_pages = page_bounds(n_rows, 1, size)[2]
+    page = col2.number_input("Halaman", min_value=1, max_value=n_pages, value=1, step=1,
+                             key=f'{key}_page')
+    start, end, n_pages = page_bounds(n_rows, int(page), size)
+    col3.caption(f"Menampilkan baris {start + 1:,}–{end:,} dari {n_rows:,} ({n_pages:,} halaman)")
+    with stage('render_table', rows=end - start):
+        st.dataframe(df.iloc[start:end])
+
+
+def plotly_chart(fig):
+    """st.plotly_chart selebar kolom; serialisasi figure dicatat sebagai tahap render_chart."""
+    with stage('render_chart'):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# Box plot
+def quantile_stats(df, x, y):
+    """Statistik box plot per grup (kuartil, pagar Tukey, min/max) tanpa titik mentah."""
+    columns = ['q1', 'median', 'q3', 'min', 'max', 'mean', 'count', 'lowerfence', 'upperfence']
+    if df.empty:
+        return pd.DataFrame(columns=[x] + columns)
+    grouped = df.groupby(x, observed=True)[y]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    stats['min'] = grouped.min()
+    stats['max'] = grouped.max()
+    stats['mean'] = grouped.mean()
+    stats['count'] = grouped.size()
+    iqr = stats['q3'] - stats['q1']
+    # Pagar Tukey dipotong ke nilai data terjauh yang masih di dalam pagar
+    group = df[x]
+    values = df[y].to_numpy(dtype=np.float64)
+    low = group.map(stats['q1'] - 1.5 * iqr).to_numpy(dtype=np.float64)
+    high = group.map(stats['q3'] + 1.5 * iqr).to_numpy(dtype=np.float64)
+    inside_low, inside_high = values >= low, values <= high
+    stats['lowerfence'] = df[y][inside_low].groupby(group[inside_low], observed=True).min()
+    stats['upperfence'] = df[y][inside_high].groupby(group[inside_high], observed=True).max()
+    return stats.reset_index()
+
+
+def quantile_box(df, x, y, title):
+    """Box plot dari kuantil yang sudah dihitung di server (ukuran payload per grup tetap)."""
+    import plotly.graph_objects as go
+
+    stats = quantile_stats(df, x, y)
+    fig = go.Figure(go.Box(
+        x=stats[x].astype(str),
+        q1=stats['q1'], median=stats['median'], q3=stats['q3'],
+        lowerfence=stats['lowerfence'], upperfence=stats['upperfence'],
+        mean=stats['mean'], name=y, boxpoints=False
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+# Deret waktu
+def lttb_indices(y, n_out, x=None):
+    """Indeks titik terpilih dengan Largest-Triangle-Three-Buckets."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_buckets):
+    """Indeks titik minimum dan maksimum setiap bucket (maks. 2 titik per bucket)."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    valid = ~np.all(np.isnan(buckets), axis=1)
+    low = np.nanargmin(np.where(np.isnan(buckets[valid]), np.inf, buckets[valid]), axis=1)
+    high = np.nanargmax(np.where(np.isnan(buckets[valid]), -np.inf, buckets[valid]), axis=1)
+    return np.unique(np.concatenate([offsets[valid] + low, offsets[valid] + high]))
+
+
+def downsample(df, y, max_points=None, method='lttb'):
+    """Baris df yang cukup untuk menggambar deret y dengan maksimal max_points titik."""
+    max_points = MAX_CHART_POINTS if max_points is None else max_points
+    if len(df) <= max_points:
+        return df
+    values = df[y].to_numpy(dtype=np.float64)
+    if method == 'minmax':
+        positions = minmax_indices(values, max_points // 2)
+    else:
+        positions = lttb_indices(np.nan_to_num(values), max_points)
+    return df.iloc[positions]
+
+
+def line_chart(df, x, y, title, max_points=None, method='lttb', color=None):
+    """px.line dengan downsampling otomatis di atas batas titik.
+
+    Dengan `color`, setiap grup (satu trace) di-downsample sendiri sehingga
+    batas max_points berlaku per trace.
+    """
+    import plotly.express as px
+
+    if color is not None and len(df):
+        df = pd.concat([downsample(group, y, max_points, method)
+                        for _, group in df.groupby(color, sort=False, observed=True)])
+    else:
+        df = downsample(df, y, max_points, method)
+    return px.line(df, x=x, y=y, color=color, title=title)
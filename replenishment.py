@@ -0,0 +1,228 @@
+"""Perencanaan replenishment (safety stock, reorder point, EOQ) untuk seluruh katalog.
+
+Semua produk dihitung sekaligus dengan operasi array:
+- permintaan harian rata-rata dan deviasi standarnya dari agregat harian
+  penjualan (hari tanpa penjualan dihitung 0),
+- lead time supplier: kolom lead_time_days per pembelian jika ada, selain itu
+  lead_time_days tabel supplier (bisa ditimpa file CSV supplier_id,lead_time_days
+  lewat INVENTORY_LEAD_TIMES), dirata-rata per produk menurut pembelian ke
+  masing-masing supplier. Jarak antar pembelian adalah siklus pesan, bukan
+  lead time, jadi tidak dipakai; produk tanpa data memakai DEFAULT_LEAD_TIME,
+- safety stock = z * sqrt(L * sd^2 + d^2 * sL^2), reorder point = d * L + SS,
+- EOQ = sqrt(2 * D * S / H) dengan D permintaan tahunan, S biaya pesan dan
+  H biaya simpan per unit per tahun.
+
+Menjalankan tanpa Streamlit:
+    python replenishment.py --output reorder.csv --service-level 0.95
+"""
+import argparse
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import dimension_codes
+
+DEFAULT_SERVICE_LEVEL = 0.95
+DEFAULT_ORDER_COST = 500000      # Rp per pesanan
+DEFAULT_HOLDING_RATE = 0.25      # biaya simpan per tahun, fraksi dari harga beli
+DEFAULT_LEAD_TIME = 14           # hari, untuk produk tanpa lead time supplier
+MAX_LEAD_TIME = 90
+# CSV supplier_id,lead_time_days yang menimpa kolom lead_time_days tabel supplier
+LEAD_TIME_FILE = os.environ.get('INVENTORY_LEAD_TIMES')
+DAYS_PER_YEAR = 365
+
+
+def _day_numbers(dates):
+    return dates.to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def daily_demand_stats(sales, product_ids, date_column='date', daily=False):
+    """Rata-rata dan deviasi standar permintaan harian per produk.
+
+    `sales` boleh baris mentah atau, dengan daily=True, kubus agregat yang sudah
+    unik per (produk, hari) seperti AggregateCube.sales (date_column='day').
+    """
+    n_products = len(product_ids)
+    if len(sales) == 0:
+        return np.zeros(n_products), np.zeros(n_products), 0
+
+    codes = dimension_codes(sales['product_id'], product_ids)
+    days = _day_numbers(sales[date_column])
+    first_day = days.min()
+    n_days = int(days.max() - first_day) + 1
+    known = codes >= 0
+    code = codes[known]
+    quantity = sales['quantity'].to_numpy()[known].astype(np.float64)
+
+    if not daily:
+        # Jumlahkan dulu per (produk, hari) agar kuadratnya benar untuk data mentah
+        key = code.astype(np.int64) * n_days + (days[known] - first_day)
+        per_day = pd.Series(quantity).groupby(key, sort=False).sum()
+        code = (per_day.index.to_numpy() // n_days).astype(np.int64)
+        quantity = per_day.to_numpy()
+
+    total = np.bincount(code, weights=quantity, minlength=n_products)
+    total_sq = np.bincount(code, weights=quantity ** 2, minlength=n_products)
+    mean = total / n_days
+    variance = np.maximum(total_sq / n_days - mean ** 2, 0.0)
+    return mean, np.sqrt(variance), n_days
+
+
+def supplier_lead_times(suppliers=None, path=LEAD_TIME_FILE):
+    """Lead time (hari) per supplier_id dari tabel supplier dan/atau file konfigurasi."""
+    lead_times = pd.Series(dtype=np.float64)
+    if suppliers is not None and 'lead_time_days' in suppliers.columns:
+        lead_times = pd.Series(suppliers['lead_time_days'].to_numpy(dtype=np.float64),
+                               index=suppliers['supplier_id'].astype(str).to_numpy())
+    if path:
+        config = pd.read_csv(path, dtype={'supplier_id': str})
+        override = pd.Series(config['lead_time_days'].to_numpy(dtype=np.float64),
+                             index=config['supplier_id'].to_numpy())
+        lead_times = override.combine_first(lead_times)
+    return lead_times.dropna()
+
+
+def lead_time_stats(purchases, product_ids, lead_times=None, default=DEFAULT_LEAD_TIME,
+                    max_days=MAX_LEAD_TIME, weight_column=None):
+    """Rata-rata dan deviasi standar lead time (hari) per produk.
+
+    Sampel per pembelian: kolom lead_time_days pembelian itu, atau lead time
+    supplier-nya dari `lead_times` (Series per supplier_id). weight_column
+    (mis. 'n' pada kubus agregat) = jumlah pembelian yang diwakili setiap baris.
+    """
+    n_products = len(product_ids)
+    mean = np.full(n_products, float(default))
+    std = np.zeros(n_products)
+    if len(purchases) == 0:
+        return mean, std
+
+    codes = dimension_codes(purchases['product_id'], product_ids)
+    known = codes >= 0
+    if 'lead_time_days' in purchases.columns:
+        # Lead time tercatat langsung per pembelian
+        samples = purchases['lead_time_days'].to_numpy(dtype=np.float64)
+    elif lead_times is not None and len(lead_times) and 'supplier_id' in purchases.columns:
+        supplier_codes = dimension_codes(purchases['supplier_id'].astype(str), lead_times.index)
+        known &= supplier_codes >= 0
+        samples = lead_times.to_numpy(dtype=np.float64)[supplier_codes]
+    else:
+        return mean, std
+    known &= ~np.isnan(samples)
+    samples_code, samples = codes[known], samples[known]
+    weights = (purchases[weight_column].to_numpy(dtype=np.float64)[known]
+               if weight_column else np.ones(len(samples)))
+
+    count = np.bincount(samples_code, weights=weights, minlength=n_products)
+    total = np.bincount(samples_code, weights=weights * samples, minlength=n_products)
+    total_sq = np.bincount(samples_code, weights=weights * samples ** 2, minlength=n_products)
+    has_samples = count > 0
+    mean[has_samples] = total[has_samples] / count[has_samples]
+    std[has_samples] = np.sqrt(np.maximum(
+        total_sq[has_samples] / count[has_samples] - mean[has_samples] ** 2, 0.0))
+    return np.clip(mean, 1, max_days), std
+
+
+def unit_costs(purchases, products):
+    """Harga beli rata-rata per produk; tanpa riwayat pembelian pakai 70% harga jual."""
+    n_products = len(products)
+    cost = products['unit_price'].to_numpy(dtype=np.float64) * 0.7
+    if len(purchases):
+        codes = dimension_codes(purchases['product_id'], products['product_id'])
+        known = codes >= 0
+        quantity = np.bincount(codes[known], weights=purchases['quantity'].to_numpy()[known],
+                               minlength=n_products)
+        spend = np.bincount(codes[known], weights=purchases['total_cost'].to_numpy()[known],
+                            minlength=n_products)
+        has_cost = quantity > 0
+        cost[has_cost] = spend[has_cost] / quantity[has_cost]
+    return cost
+
+
+def reorder_plan(products, sales, purchases, service_level=DEFAULT_SERVICE_LEVEL,
+                 order_cost=DEFAULT_ORDER_COST, holding_rate=DEFAULT_HOLDING_RATE,
+                 date_column='date', daily=False, suppliers=None):
+    """Tabel reorder seluruh katalog, satu baris per produk.
+
+    Untuk kubus agregat: reorder_plan(products, cube.sales, cube.purchases,
+    date_column='day', daily=True, suppliers=suppliers). Lead time dari tabel
+    supplier (lihat supplier_lead_times).
+    """
+    product_ids = products['product_id']
+    stock = products['stock'].to_numpy(dtype=np.float64)
+
+    demand, demand_std, _ = daily_demand_stats(sales, product_ids, date_column, daily)
+    lead_time, lead_time_std = lead_time_stats(
+        purchases, product_ids, supplier_lead_times(suppliers),
+        weight_column='n' if daily and 'n' in purchases.columns else None
+    )
+    cost = unit_costs(purchases, products)
+
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * np.sqrt(lead_time * demand_std ** 2 + demand ** 2 * lead_time_std ** 2)
+    reorder_point = demand * lead_time + safety_stock
+
+    annual_demand = demand * DAYS_PER_YEAR
+    holding_cost = np.maximum(cost * holding_rate, 1e-9)
+    eoq = np.sqrt(2 * annual_demand * order_cost / holding_cost)
+
+    below = stock <= reorder_point
+    recommended = np.where(below, np.ceil(np.maximum(eoq, reorder_point - stock)), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(demand > 0, stock / demand, np.inf)
+
+    plan = pd.DataFrame({
+        'product_id': product_ids.to_numpy(),
+        'stock': products['stock'].to_numpy(),
+        'avg_daily_demand': demand,
+        'demand_std': demand_std,
+        'lead_time_days': lead_time,
+        'lead_time_std': lead_time_std,
+        'safety_stock': np.ceil(safety_stock),
+        'reorder_point': np.ceil(reorder_point),
+        'eoq': np.ceil(eoq),
+        'recommended_order': recommended.astype(np.int64),
+        'days_of_cover': days_of_cover,
+        'below_reorder_point': below
+    })
+    for column in ('category', 'product_name'):
+        if column in products.columns:
+            plan.insert(1, column, products[column].to_numpy())
+    return plan
+
+
+def main(argv=None):
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='Tabel reorder point seluruh katalog (headless)')
+    parser.add_argument('--output', default='reorder_plan.csv', help='file .csv atau .parquet')
+    parser.add_argument('--service-level', type=float, default=DEFAULT_SERVICE_LEVEL)
+    parser.add_argument('--order-cost', type=float, default=DEFAULT_ORDER_COST)
+    parser.add_argument('--holding-rate', type=float, default=DEFAULT_HOLDING_RATE)
+    parser.add_argument('--below-only', action='store_true', help='hanya produk di bawah reorder point')
+    args = parser.parse_args(argv)
+
+    backend = backend_from_env()
+    data = backend.load({
+        'products': None,
+        'suppliers': None,
+        'sales': ['date', 'product_id', 'quantity'],
+        'purchases': ['date', 'product_id', 'supplier_id', 'quantity', 'total_cost']
+    })
+    plan = reorder_plan(data['products'], data['sales'], data['purchases'],
+                        args.service_level, args.order_cost, args.holding_rate,
+                        suppliers=data['suppliers'])
+    if args.below_only:
+        plan = plan[plan['below_reorder_point']]
+
+    if args.output.endswith('.parquet'):
+        plan.to_parquet(args.output, index=False)
+    else:
+        plan.to_csv(args.output, index=False)
+    print(f"{len(plan):,} produk ditulis ke {args.output} "
+          f"({int(plan['below_reorder_point'].sum()):,} di bawah reorder point)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,550 @@
+"""Generator paket laporan bulanan (headless) untuk Keuangan dan PPIC.
+
+Satu paket per bulan di <output>/<bulan>/:
+- tables/: tabel ringkasan supplier, kategori dan produk (margin bulan itu,
+  klasifikasi ABC/XYZ, reorder), plus opsional detail transaksi bulan itu
+  yang dibaca per chunk dari backend.
+  Ditulis bertahap per chunk ke CSV, Parquet (satu row group per chunk) atau
+  XLSX (openpyxl write-only), jadi tabel tidak pernah dikonversi utuh di memori.
+- supplier/<id>.html dan category/<kategori>.html: satu bagian per supplier
+  dan kategori berisi metrik, tabel dan grafik Plotly.
+- index.html: daftar semua bagian beserta angka utamanya.
+
+Angka diambil dari komputasi halaman yang sama dengan aplikasi (kubus agregat,
+analytics.financial_report, inventory_classification, replenishment_plan dan
+ledger COGS). Data per bagian dikelompokkan sekali di proses utama lalu
+dikirim ke setiap worker lewat initializer; tugas hanya berisi kunci bagian,
+sehingga ribuan bagian dirender paralel tanpa menyalin data per tugas.
+
+Contoh:
+    python reports.py --month 2023-06 --output reports --format parquet --workers 8
+    python reports.py --kind supplier --format xlsx --detail
+"""
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import parallel
+from aggregates import CUBE_REQUIREMENTS
+from classification import class_matrix
+
+KINDS = ('supplier', 'category')
+KIND_LABELS = {'supplier': 'Supplier', 'category': 'Kategori'}
+FORMATS = ('csv', 'parquet', 'xlsx')
+DEFAULT_CHUNK_ROWS = int(os.environ.get('INVENTORY_REPORT_CHUNK_ROWS', 100_000))
+XLSX_MAX_ROWS = 1_048_575  # baris data per sheet (baris pertama header)
+TOP_N = 10
+TREND_MONTHS = 12
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 1.5em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; }}
+td {{ text-align: right; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+
+# Penulis tabel bertahap
+class CsvWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._header = True
+
+    def write(self, chunk):
+        chunk.to_csv(self._file, header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Satu row group per chunk; skema diambil dari chunk pertama."""
+
+    def __init__(self, path):
+        self.path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class XlsxWriter:
+    """Workbook write-only (baris dialirkan ke file sementara); sheet baru setiap XLSX_MAX_ROWS."""
+
+    def __init__(self, path, sheet='data'):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.sheet = sheet
+        self._book = Workbook(write_only=True)
+        self._sheet = None
+        self._columns = None
+        self._rows = 0
+        self._parts = 0
+
+    def _new_sheet(self):
+        self._parts += 1
+        title = self.sheet if self._parts == 1 else f'{self.sheet}_{self._parts}'
+        self._sheet = self._book.create_sheet(title[:31])
+        self._sheet.append(self._columns)
+        self._rows = 0
+
+    def write(self, chunk):
+        if self._sheet is None:
+            self._columns = [str(column) for column in chunk.columns]
+            self._new_sheet()
+        # Excel tidak punya NaN/inf: sel kosong
+        values = chunk.replace([np.inf, -np.inf], np.nan).astype(object)
+        values = values.where(values.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if self._rows == XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._rows += 1
+
+    def close(self):
+        self._book.save(self.path)
+
+
+WRITERS = {'csv': CsvWriter, 'parquet': ParquetWriter, 'xlsx': XlsxWriter}
+
+
+def iter_chunks(frame, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Potongan baris berurutan (view iloc); tabel kosong tetap menghasilkan satu chunk."""
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def write_table(data, path, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Tulis DataFrame atau iterator chunk DataFrame ke `path`; kembalikan jumlah baris."""
+    chunks = iter_chunks(data, chunk_rows) if isinstance(data, pd.DataFrame) else data
+    writer = WRITERS[fmt](path)
+    rows = 0
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return rows
+
+
+def detail_chunks(backend, table, start_date, end_date, chunk_rows=DEFAULT_CHUNK_ROWS, ledger=None):
+    """Baris transaksi satu bulan per chunk; penjualan ditambah HPP dan laba kotor per baris.
+
+    Dibaca per chunk dari backend (row group Parquet, cursor SQLite), jadi
+    bulan yang besar tidak pernah dimuat sekaligus.
+    """
+    for chunk in backend.iter_table(table, chunk_rows, start_date=start_date, end_date=end_date):
+        if ledger is not None and table == 'sales':
+            chunk = chunk.assign(cogs=ledger.sale_cogs(chunk))
+            chunk['gross_margin'] = chunk['total_price'] - chunk['cogs']
+        yield chunk
+
+
+# Data bagian laporan
+def _month_bounds(month):
+    period = pd.Period(month, freq='M')
+    return period.start_time, period.end_time.normalize()
+
+
+def _month(day):
+    return day.dt.to_period('M').astype(str).rename('month')
+
+
+def _split(frame, column):
+    # Satu DataFrame per nilai kunci (sekali groupby, bukan filter per bagian)
+    return {key: group.drop(columns=column).reset_index(drop=True)
+            for key, group in frame.groupby(column, observed=True, sort=False)}
+
+
+def build_context(cube, products, suppliers, data_version, month, method='fifo'):
+    """Semua data bagian laporan untuk satu bulan, dikelompokkan per supplier/kategori."""
+    start, end = _month_bounds(month)
+    first_trend = (pd.Period(month, freq='M') - (TREND_MONTHS - 1)).start_time
+    names = products[['product_id', 'product_name', 'category']]
+
+    # Pembelian per supplier: bulan laporan dan tren sampai akhir bulan
+    purchases = cube.purchases
+    in_month = purchases[(purchases['day'] >= start) & (purchases['day'] <= end)]
+    supplier_products = in_month.groupby(['supplier_id', 'product_id'], observed=True)[
+        ['quantity', 'total_cost']
+    ].sum().reset_index().merge(names[['product_id', 'product_name']], on='product_id')
+    supplier_products = supplier_products.sort_values('total_cost', ascending=False)
+    trend = purchases[(purchases['day'] >= first_trend) & (purchases['day'] <= end)]
+    supplier_trend = trend.groupby(['supplier_id', _month(trend['day'])], observed=True)[
+        'total_cost'
+    ].sum().reset_index()
+
+    month_totals = in_month.groupby('supplier_id', observed=True).agg(
+        total_pembelian_bulan=('total_cost', 'sum'),
+        total_item_bulan=('quantity', 'sum'),
+        jumlah_produk_bulan=('product_id', 'nunique')
+    )
+    supplier_history = cube.supplier_purchases().set_index('supplier_id').rename(columns={
+        'total_cost': 'total_pembelian', 'quantity': 'total_item', 'product_id': 'jumlah_produk'
+    })
+    supplier_summary = suppliers[['supplier_id', 'supplier_name']].join(
+        month_totals, on='supplier_id').join(supplier_history, on='supplier_id').fillna(0)
+
+    # Penjualan per produk: margin bulan laporan (ledger COGS) + klasifikasi + reorder
+    ledger = analytics.cost_ledger(cube, products, data_version, method)
+    daily = ledger.daily_margin()
+    month_daily = daily[(daily['day'] >= start) & (daily['day'] <= end)]
+    product_month = month_daily.groupby('product_id', observed=True)[
+        ['quantity', 'revenue', 'cogs']
+    ].sum().reindex(products['product_id'], fill_value=0).reset_index()
+    product_month['gross_margin'] = product_month['revenue'] - product_month['cogs']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        product_month['margin_pct'] = np.where(
+            product_month['revenue'] > 0,
+            product_month['gross_margin'] / product_month['revenue'] * 100, np.nan)
+
+    classified = analytics.inventory_classification(cube, products, data_version)
+    plan = analytics.replenishment_plan(cube, products, suppliers, data_version)
+    product_table = names.merge(product_month, on='product_id').merge(
+        classified[['product_id', 'abc', 'xyz', 'class', 'turnover', 'days_of_supply', 'slow_mover']],
+        on='product_id'
+    ).merge(
+        plan[['product_id', 'stock', 'reorder_point', 'recommended_order', 'below_reorder_point']],
+        on='product_id'
+    )
+
+    trend_daily = daily[(daily['day'] >= first_trend) & (daily['day'] <= end)]
+    category = trend_daily['product_id'].map(products.set_index('product_id')['category'])
+    category_trend = trend_daily.groupby([category.rename('category'), _month(trend_daily['day'])],
+                                         observed=True)[['revenue', 'cogs']].sum().reset_index()
+    category_trend['gross_margin'] = category_trend['revenue'] - category_trend['cogs']
+
+    category_summary = product_table.groupby('category', observed=True).agg(
+        pendapatan_bulan=('revenue', 'sum'),
+        hpp_bulan=('cogs', 'sum'),
+        laba_kotor_bulan=('gross_margin', 'sum'),
+        jumlah_sku=('product_id', 'size'),
+        slow_mover=('slow_mover', 'sum'),
+        di_bawah_rop=('below_reorder_point', 'sum')
+    )
+    category_summary['margin_pct_bulan'] = (
+        category_summary['laba_kotor_bulan'] / category_summary['pendapatan_bulan'] * 100)
+    report = analytics.financial_report(cube, products, data_version, method)
+    category_history = report['category_margin'].set_index('category')[['total_price', 'cogs', 'margin']]
+    category_summary = category_summary.join(category_history.rename(columns={
+        'total_price': 'pendapatan_kumulatif', 'cogs': 'hpp_kumulatif', 'margin': 'laba_kotor_kumulatif'
+    })).reset_index()
+
+    return {
+        'month': str(pd.Period(month, freq='M')),
+        'start': start,
+        'end': end,
+        'ledger': ledger,
+        'supplier_summary': supplier_summary,
+        'category_summary': category_summary,
+        'product_table': product_table,
+        'supplier_products': _split(supplier_products, 'supplier_id'),
+        'supplier_trend': _split(supplier_trend, 'supplier_id'),
+        'category_products': _split(product_table, 'category'),
+        'category_trend': _split(category_trend, 'category')
+    }
+
+
+# Render bagian (di worker)
+_context = None
+
+
+def _init_worker(context):
+    global _context
+    _context = context
+
+
+def _slug(text):
+    return re.sub(r'[^0-9A-Za-z._-]+', '_', str(text)).strip('_') or 'bagian'
+
+
+def _money(value):
+    return f'Rp {value:,.0f}'
+
+
+def _metrics_html(metrics):
+    rows = ''.join(f'<tr><th>{html.escape(name)}</th><td>{html.escape(value)}</td></tr>'
+                   for name, value in metrics)
+    return f'<table class="metrics">{rows}</table>'
+
+
+def _table_html(title, frame):
+    table = frame.to_html(index=False, float_format=lambda value: f'{value:,.2f}', na_rep='-',
+                          border=0)
+    return f'<h2>{html.escape(title)}</h2>{table}'
+
+
+def _figures_html(figures):
+    # plotly.js dimuat sekali per halaman (CDN) lewat figure pertama
+    return ''.join(
+        figure.to_html(full_html=False, include_plotlyjs='cdn' if position == 0 else False)
+        for position, figure in enumerate(figures)
+    )
+
+
+def _write_page(path, title, body):
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write(PAGE_TEMPLATE.format(title=html.escape(title), body=body))
+
+
+def _supplier_section(supplier_id, name, context, figures):
+    products = context['supplier_products'].get(supplier_id, pd.DataFrame(
+        columns=['product_id', 'quantity', 'total_cost', 'product_name']))
+    trend = context['supplier_trend'].get(supplier_id, pd.DataFrame(columns=['month', 'total_cost']))
+    summary = {
+        'total_pembelian': float(products['total_cost'].sum()),
+        'total_item': int(products['quantity'].sum()),
+        'jumlah_produk': len(products)
+    }
+    body = [_metrics_html([
+        ('Total Pembelian', _money(summary['total_pembelian'])),
+        ('Total Item', f"{summary['total_item']:,}"),
+        ('Jumlah Produk', f"{summary['jumlah_produk']:,}")
+    ])]
+    if figures and len(products):
+        import plotly.graph_objects as go
+
+        top = products.head(TOP_N * 2)
+        body.append(_figures_html([
+            go.Figure(go.Bar(x=top['product_name'], y=top['total_cost'])).update_layout(
+                title=f'Pembelian per Produk ({context["month"]})'),
+            go.Figure(go.Scatter(x=trend['month'], y=trend['total_cost'], mode='lines+markers'))
+            .update_layout(title=f'Tren Pembelian {TREND_MONTHS} Bulan')
+        ]))
+    body.append(_table_html('Produk yang Dibeli',
+                            products[['product_id', 'product_name', 'quantity', 'total_cost']]))
+    body.append(_table_html('Tren Pembelian Bulanan', trend))
+    return summary, '\n'.join(body)
+
+
+def _category_section(category, context, figures):
+    products = context['category_products'].get(category, context['product_table'].iloc[:0])
+    trend = context['category_trend'].get(category, pd.DataFrame(
+        columns=['month', 'revenue', 'cogs', 'gross_margin']))
+    revenue = float(products['revenue'].sum())
+    margin = float(products['gross_margin'].sum())
+    summary = {
+        'pendapatan': revenue,
+        'laba_kotor': margin,
+        'margin_pct': margin / revenue * 100 if revenue > 0 else float('nan'),
+        'slow_mover': int(products['slow_mover'].sum()),
+        'di_bawah_rop': int(products['below_reorder_point'].sum())
+    }
+    matrix = class_matrix(products)
+    body = [_metrics_html([
+        ('Pendapatan', _money(revenue)),
+        ('HPP', _money(products['cogs'].sum())),
+        ('Laba Kotor', _money(margin)),
+        ('Margin', f"{summary['margin_pct']:.2f}%"),
+        ('Jumlah SKU', f'{len(products):,}'),
+        ('Slow Mover', f"{summary['slow_mover']:,}"),
+        ('Di Bawah Reorder Point', f"{summary['di_bawah_rop']:,}")
+    ])]
+    if figures:
+        import plotly.graph_objects as go
+
+        trend_figure = go.Figure([
+            go.Scatter(x=trend['month'], y=trend['revenue'], name='Pendapatan'),
+            go.Scatter(x=trend['month'], y=trend['cogs'], name='HPP')
+        ]).update_layout(title=f'Pendapatan vs HPP {TREND_MONTHS} Bulan')
+        matrix_figure = go.Figure(go.Heatmap(
+            z=matrix.to_numpy(), x=list(matrix.columns), y=list(matrix.index),
+            colorscale='Blues', texttemplate='%{z}'
+        )).update_layout(title='Matriks ABC x XYZ (jumlah SKU)', yaxis_autorange='reversed')
+        body.append(_figures_html([trend_figure, matrix_figure]))
+    columns = ['product_id', 'product_name', 'quantity', 'revenue', 'cogs', 'gross_margin',
+               'margin_pct', 'class']
+    body.append(_table_html(f'{TOP_N} Produk dengan Pendapatan Tertinggi',
+                            products.nlargest(TOP_N, 'revenue')[columns]))
+    body.append(_table_html('Matriks ABC x XYZ', matrix.reset_index()))
+    body.append(_table_html('Produk di Bawah Reorder Point', products[products['below_reorder_point']][
+        ['product_id', 'product_name', 'stock', 'reorder_point', 'recommended_order', 'days_of_supply']
+    ]))
+    body.append(_table_html('Slow Mover', products[products['slow_mover']][
+        ['product_id', 'product_name', 'stock', 'turnover', 'days_of_supply', 'class']
+    ]))
+    body.append(_table_html('Tren Bulanan', trend))
+    return summary, '\n'.join(body)
+
+
+def render_section(task):
+    """Tulis satu halaman bagian; kembalikan baris indeks (kunci, file, angka utama)."""
+    kind, key, name, path, figures = task
+    context = _context
+    if kind == 'supplier':
+        summary, body = _supplier_section(key, name, context, figures)
+    else:
+        summary, body = _category_section(key, context, figures)
+    _write_page(path, f'{name} - {context["month"]}', body)
+    return {'kind': kind, 'key': key, 'name': name, 'file': path, **summary}
+
+
+def render_sections(tasks, context, workers=1):
+    """Render semua bagian; workers > 1 membagi tugas ke process pool."""
+    if workers <= 1 or len(tasks) < 2:
+        _init_worker(context)
+        return [render_section(task) for task in tasks]
+    mp_context = multiprocessing.get_context(parallel.start_method())
+    with ProcessPoolExecutor(workers, mp_context=mp_context, initializer=_init_worker,
+                             initargs=(context,)) as executor:
+        # Tugas dikirim berkelompok agar overhead IPC per bagian kecil
+        chunksize = max(1, len(tasks) // (workers * 8))
+        return list(executor.map(render_section, tasks, chunksize=chunksize))
+
+
+def _index_html(context, sections, tables):
+    body = [_metrics_html([('Bulan', context['month']), ('Jumlah Bagian', f'{len(sections):,}')])]
+    links = ''.join(f'<li><a href="{html.escape(path)}">{html.escape(name)}</a> ({rows:,} baris)</li>'
+                    for name, (path, rows) in tables.items())
+    body.append(f'<h2>Tabel</h2><ul>{links}</ul>')
+    for kind in KINDS:
+        rows = sections[sections['kind'] == kind]
+        if len(rows):
+            frame = rows.drop(columns=['kind', 'key', 'file']).copy()
+            frame['name'] = [f'<a href="{html.escape(path)}">{html.escape(str(name))}</a>'
+                             for path, name in zip(rows['relative'], rows['name'])]
+            table = frame.drop(columns='relative').dropna(axis=1, how='all').to_html(
+                index=False, escape=False, float_format=lambda value: f'{value:,.2f}', na_rep='-',
+                border=0)
+            body.append(f'<h2>{KIND_LABELS[kind]}</h2>{table}')
+    return '\n'.join(body)
+
+
+def generate_pack(backend, output, month=None, kinds=KINDS, fmt='csv', workers=1,
+                  chunk_rows=DEFAULT_CHUNK_ROWS, detail=False, figures=True, method='fifo'):
+    """Buat satu paket laporan bulanan; kembalikan ringkasan (path, jumlah, durasi)."""
+    timings = {}
+    start = time.perf_counter()
+    products = backend.read_table('products')
+    suppliers = backend.read_table('suppliers')
+    raw = backend.load(CUBE_REQUIREMENTS)
+    cube = parallel.build_cube(products, raw['sales'], raw['purchases'])
+    del raw
+    data_version = f'{backend.cache_key()}:{cube.version}'
+    if month is None:
+        month = str(cube.sales['day'].max().to_period('M'))
+    context = build_context(cube, products, suppliers, data_version, month, method)
+    timings['compute'] = time.perf_counter() - start
+
+    root = os.path.join(output, context['month'])
+    for directory in ('tables',) + tuple(kinds):
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    # Tabel ringkasan dan detail transaksi, ditulis per chunk
+    start = time.perf_counter()
+    tables = {
+        'supplier_summary': context['supplier_summary'],
+        'category_summary': context['category_summary'],
+        'products': context['product_table']
+    }
+    if detail:
+        tables['sales_detail'] = detail_chunks(backend, 'sales', context['start'], context['end'],
+                                               chunk_rows, context['ledger'])
+        tables['purchases_detail'] = detail_chunks(backend, 'purchases', context['start'],
+                                                   context['end'], chunk_rows)
+    written = {}
+    for name, data in tables.items():
+        relative = os.path.join('tables', f'{name}.{fmt}')
+        written[name] = (relative, write_table(data, os.path.join(root, relative), fmt, chunk_rows))
+    timings['tables'] = time.perf_counter() - start
+
+    # Bagian per supplier / kategori
+    start = time.perf_counter()
+    tasks = []
+    if 'supplier' in kinds:
+        for supplier_id, name in zip(suppliers['supplier_id'], suppliers['supplier_name']):
+            tasks.append(('supplier', supplier_id, name,
+                          os.path.join(root, 'supplier', f'{_slug(supplier_id)}.html'), figures))
+    if 'category' in kinds:
+        for category in context['category_summary']['category']:
+            tasks.append(('category', category, category,
+                          os.path.join(root, 'category', f'{_slug(category)}.html'), figures))
+    section_context = {key: value for key, value in context.items() if key != 'ledger'}
+    sections = pd.DataFrame(render_sections(tasks, section_context, workers))
+    timings['sections'] = time.perf_counter() - start
+
+    if len(sections):
+        sections['relative'] = [os.path.relpath(path, root) for path in sections['file']]
+    else:
+        sections = pd.DataFrame(columns=['kind', 'key', 'name', 'file', 'relative'])
+    index_path = os.path.join(root, 'index.html')
+    _write_page(index_path, f'Laporan Bulanan {context["month"]}', _index_html(context, sections, written))
+    return {
+        'month': context['month'],
+        'index': index_path,
+        'sections': len(sections),
+        'tables': {name: rows for name, (_, rows) in written.items()},
+        'timings': timings
+    }
+
+
+def main(argv=None):
+    import disk_cache
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='Paket laporan bulanan Keuangan & PPIC (headless)')
+    parser.add_argument('--month', help='YYYY-MM (default: bulan terakhir di data)')
+    parser.add_argument('--output', default='reports', help='direktori output')
+    parser.add_argument('--kind', choices=KINDS, nargs='+', default=list(KINDS),
+                        help='jenis bagian yang dibuat')
+    parser.add_argument('--format', choices=FORMATS, default='csv', help='format tabel')
+    parser.add_argument('--workers', type=int, default=parallel.DEFAULT_WORKERS,
+                        help='proses render bagian (0 = semua core, 1 = serial)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--detail', action='store_true', help='sertakan detail transaksi bulan itu')
+    parser.add_argument('--no-figures', action='store_true', help='hanya tabel (tanpa Plotly)')
+    parser.add_argument('--method', choices=['fifo', 'weighted_average'], default='fifo',
+                        help='metode HPP')
+    args = parser.parse_args(argv)
+
+    # Sumber data dari INVENTORY_BACKEND; data rekayasa lewat cache disk
+    backend = backend_from_env(disk_cache.load_synthetic)
+    start = time.perf_counter()
+    result = generate_pack(backend, args.output, args.month, args.kind, args.format,
+                           parallel.resolve_workers(args.workers), args.chunk_rows, args.detail,
+                           not args.no_figures, args.method)
+    for name, rows in result['tables'].items():
+        print(f'{name:>18}: {rows:12,} baris')
+    timings = ', '.join(f'{stage} {seconds:.2f}s' for stage, seconds in result['timings'].items())
+    print(f"{result['sections']:,} bagian untuk {result['month']} dalam "
+          f"{time.perf_counter() - start:.2f} detik ({timings})")
+    print(f"Indeks: {result['index']}")
+
+
+if __name__ == '__main__':
+    main()
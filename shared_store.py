@@ -0,0 +1,268 @@
+"""Dataset bersama antar proses server di shared memory (file memory-mapped).
+
+Beberapa proses Streamlit di belakang load balancer masing-masing memegang
+salinan empat tabel load_data(). Di sini kolom tabel ditulis sekali sebagai
+file .npy di /dev/shm (atau INVENTORY_SHARED_DIR), lalu setiap proses
+memetakannya dengan np.load(mmap_mode='r'). Halaman fisiknya dibagi oleh semua
+proses, jadi memori data tidak bertambah dengan jumlah worker.
+
+- Kolom numerik, tanggal dan boolean disimpan apa adanya dan dipakai pandas
+  tanpa salinan.
+- Kolom teks disimpan sebagai kode Categorical (+ daftar kategori kecil).
+  product_id/supplier_id di tabel transaksi memakai urutan tabel dimensi,
+  sehingga kodenya langsung posisi baris produk/supplier. ID transaksi yang
+  unik per baris paling hemat dengan skema ringkas (--compact, ID jadi integer).
+- Tabel transaksi diurutkan per tanggal saat publish, sehingga DateIndex tidak
+  perlu mengurutkan (dan menyalin) ulang di setiap proses.
+
+Setiap publish menulis direktori versi baru, lalu menukar file CURRENT dengan
+rename atomik. Proses yang sudah memetakan versi lama tetap aman: file yang
+dihapus cleanup() tetap valid sampai mapping terakhir ditutup.
+
+Contoh:
+    python shared_store.py publish --compact
+    python shared_store.py info
+    INVENTORY_BACKEND=shared streamlit run inventory_management.py
+"""
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from data_backend import FACT_TABLES, TABLES, InMemoryBackend
+
+SHM_DIR = '/dev/shm'
+DEFAULT_DIR = os.environ.get(
+    'INVENTORY_SHARED_DIR',
+    os.path.join(SHM_DIR if os.path.isdir(SHM_DIR) else 'data', 'inventory-shared')
+)
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = '.lock'
+DIMENSION_KEYS = {'product_id': 'products', 'supplier_id': 'suppliers'}
+
+
+def _encode(table, column, values, dimensions):
+    """(jenis, array, kategori) untuk satu kolom."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return 'categorical', values.cat.codes.to_numpy(), values.cat.categories
+    if values.dtype.kind in 'biufcmM':
+        return 'array', values.to_numpy(), None
+    dimension = DIMENSION_KEYS.get(column)
+    if table in FACT_TABLES and dimension in dimensions:
+        # Kategori = urutan tabel dimensi, kode = posisi baris dimensi
+        categories = pd.Index(dimensions[dimension][column].astype(str))
+        encoded = pd.Categorical(values.astype(str), categories=categories)
+    else:
+        encoded = pd.Categorical(values.astype(str))
+    return 'categorical', encoded.codes, encoded.categories
+
+
+def _write_table(directory, table, df, dimensions):
+    os.makedirs(directory)
+    columns = []
+    for column in df.columns:
+        kind, array, categories = _encode(table, column, df[column], dimensions)
+        np.save(os.path.join(directory, f'{column}.npy'), np.ascontiguousarray(array))
+        entry = {'name': column, 'kind': kind, 'dtype': str(array.dtype)}
+        if categories is not None:
+            # Kategori teks sebagai array unicode tetap (bisa di-load tanpa pickle)
+            values = categories.to_numpy() if categories.dtype.kind in 'biufmM' else \
+                categories.astype(str).to_numpy(dtype=str)
+            np.save(os.path.join(directory, f'{column}.categories.npy'), values)
+        columns.append(entry)
+    return {'rows': len(df), 'columns': columns, 'attrs': dict(df.attrs)}
+
+
+def _read_table(directory, entry):
+    data = {}
+    for column in entry['columns']:
+        name = column['name']
+        array = np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+        if column['kind'] == 'categorical':
+            categories = pd.Index(np.load(os.path.join(directory, f'{name}.categories.npy')))
+            data[name] = pd.Categorical.from_codes(
+                array, dtype=pd.CategoricalDtype(categories), validate=False)
+        else:
+            data[name] = array
+    # copy=False: kolom tetap menunjuk ke halaman memory-mapped
+    df = pd.DataFrame(data, copy=False)
+    df.attrs = entry['attrs']
+    return df
+
+
+def current_version(directory=DEFAULT_DIR):
+    """Versi yang sedang aktif, atau None jika belum ada yang dipublish."""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as current:
+            return current.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(data, directory=DEFAULT_DIR, version=None, keep=2):
+    """Tulis keempat tabel sebagai versi baru dan jadikan versi aktif (atomik)."""
+    os.makedirs(directory, exist_ok=True)
+    version = version or f'{time.strftime("%Y%m%d%H%M%S")}-{time.time_ns() % 10**9:09d}'
+    staging = os.path.join(directory, f'.{version}.tmp')
+    os.makedirs(staging)
+    try:
+        manifest = {'version': version, 'created': time.time(), 'tables': {}}
+        for table in TABLES:
+            df = data[table]
+            if table in FACT_TABLES:
+                df = df.sort_values('date', kind='stable', ignore_index=True)
+            manifest['tables'][table] = _write_table(os.path.join(staging, table), table, df, data)
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as output:
+            json.dump(manifest, output, default=str)
+        os.rename(staging, os.path.join(directory, version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Tukar versi aktif: tulis file sementara lalu rename (atomik di POSIX)
+    pointer = os.path.join(directory, f'.{CURRENT_FILE}.{os.getpid()}')
+    with open(pointer, 'w') as output:
+        output.write(version)
+    os.replace(pointer, os.path.join(directory, CURRENT_FILE))
+    cleanup(directory, keep)
+    return version
+
+
+def attach(directory=DEFAULT_DIR, version=None):
+    """(versi, dict tabel) yang memetakan versi aktif tanpa salinan."""
+    version = version or current_version(directory)
+    if version is None:
+        raise FileNotFoundError(f'Belum ada dataset yang dipublish di {directory}')
+    root = os.path.join(directory, version)
+    with open(os.path.join(root, MANIFEST_FILE)) as manifest_file:
+        manifest = json.load(manifest_file)
+    return version, {
+        table: _read_table(os.path.join(root, table), entry)
+        for table, entry in manifest['tables'].items()
+    }
+
+
+def versions(directory=DEFAULT_DIR):
+    """Versi yang tersimpan, terlama lebih dulu."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory)
+                  if not name.startswith('.') and name != CURRENT_FILE
+                  and os.path.isdir(os.path.join(directory, name)))
+
+
+def cleanup(directory=DEFAULT_DIR, keep=2):
+    """Hapus versi lama, sisakan `keep` versi terbaru (selalu termasuk versi aktif)."""
+    current = current_version(directory)
+    stored = versions(directory)
+    for version in stored[:max(len(stored) - keep, 0)]:
+        if version != current:
+            shutil.rmtree(os.path.join(directory, version), ignore_errors=True)
+
+
+@contextmanager
+def _publish_lock(directory):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def ensure_published(loader, directory=DEFAULT_DIR):
+    """Versi aktif; jika belum ada, proses pertama mempublish data dari loader().
+
+    Proses lain menunggu lock lalu langsung attach ke versi yang sama.
+    """
+    version = current_version(directory)
+    if version is not None:
+        return version
+    with _publish_lock(directory):
+        version = current_version(directory)
+        if version is None:
+            version = publish(loader(), directory)
+    return version
+
+
+def table_bytes(directory=DEFAULT_DIR, version=None):
+    """Ukuran file per tabel untuk satu versi (byte)."""
+    version = version or current_version(directory)
+    root = os.path.join(directory, version)
+    sizes = {}
+    for table in TABLES:
+        path = os.path.join(root, table)
+        sizes[table] = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return sizes
+
+
+class SharedBackend(InMemoryBackend):
+    """InMemoryBackend di atas dataset bersama; pindah ke versi baru saat CURRENT berubah."""
+
+    name = 'shared'
+
+    def __init__(self, directory=DEFAULT_DIR, loader=None):
+        self.directory = directory
+        self._swap_lock = threading.Lock()
+        version = ensure_published(loader, directory) if loader is not None else None
+        self._attach(version)
+
+    def _attach(self, version=None):
+        version, data = attach(self.directory, version)
+        super().__init__(data, key=f'shared:{version}')
+        self.version = version
+
+    def cache_key(self):
+        # Cukup baca file CURRENT; attach ulang hanya jika versinya berubah
+        version = current_version(self.directory)
+        if version is not None and version != self.version:
+            with self._swap_lock:
+                if version != self.version:
+                    self._attach(version)
+        return self.key
+
+
+def main(argv=None):
+    from data_backend import backend_from_env
+
+    parser = argparse.ArgumentParser(description='Dataset bersama di shared memory')
+    parser.add_argument('command', choices=['publish', 'info', 'cleanup'])
+    parser.add_argument('--directory', default=DEFAULT_DIR)
+    parser.add_argument('--compact', action='store_true', help='pakai skema ringkas sebelum publish')
+    parser.add_argument('--keep', type=int, default=2, help='jumlah versi yang disimpan')
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        # Sumber data dari INVENTORY_BACKEND (synthetic/parquet/sqlite)
+        data = backend_from_env().load_all()
+        if args.compact:
+            from compact_schema import compact_tables
+            data = compact_tables(data)
+        start = time.perf_counter()
+        version = publish(data, args.directory, keep=args.keep)
+        print(f'Versi {version} dipublish ke {args.directory} dalam {time.perf_counter() - start:.2f} detik')
+    elif args.command == 'cleanup':
+        cleanup(args.directory, args.keep)
+
+    version = current_version(args.directory)
+    if version is None:
+        print(f'Belum ada dataset di {args.directory}')
+        return
+    sizes = table_bytes(args.directory, version)
+    print(f"Versi aktif {version} ({', '.join(versions(args.directory))} tersimpan)")
+    for table, size in sizes.items():
+        print(f'{table:>10}: {size / 1e6:12,.1f} MB')
+    print(f"{'total':>10}: {sum(sizes.values()) / 1e6:12,.1f} MB (dibagi semua proses)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from classification import classify_catalog
+
+PRODUCTS = pd.DataFrame({'product_id': ['FAST', 'OVERSTOCK', 'STALE', 'EMPTY'],
+                         'stock': [5, 500, 10, 0]})
+# OVERSTOCK terjual sedikit tapi baru saja; STALE terakhir terjual > 180 hari lalu
+SALES = pd.DataFrame({
+    'date': pd.to_datetime(['2023-01-01', '2023-12-30', '2023-12-31', '2023-01-02', '2023-01-03']),
+    'product_id': ['FAST', 'FAST', 'OVERSTOCK', 'STALE', 'EMPTY'],
+    'quantity': [50, 50, 1, 3, 2],
+    'total_price': [500, 500, 10, 30, 20]
+})
+
+
+def test_slow_mover_requires_no_recent_sale():
+    classified = classify_catalog(PRODUCTS, SALES).set_index('product_id')
+    assert classified.loc['OVERSTOCK', 'days_of_supply'] > 180
+    assert classified['slow_mover'].to_dict() == {
+        'FAST': False, 'OVERSTOCK': False, 'STALE': True, 'EMPTY': False
+    }
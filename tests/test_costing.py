@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from aggregates import AggregateCube
+from costing import CostLedger
+from data_generator import generate_data
+from ingestion import Ingestor
+
+PRODUCTS = pd.DataFrame({'product_id': ['A', 'B'], 'stock': [5, 0], 'unit_price': [10, 10]})
+# A: saldo awal 5 (stok 5 - pergerakan bersih 0) dengan biaya rata-rata pembelian
+#    (30 + 30) / 15 = 4; lot 10 @ 3 (2 Jan) dan 5 @ 6 (4 Jan)
+# B: terjual 2 sebelum pembelian 2 @ 5, jadi saldo awal hasil fit = 2 @ 5
+SALES = pd.DataFrame({
+    'date': pd.to_datetime(['2023-01-01', '2023-01-01', '2023-01-03', '2023-01-05']),
+    'product_id': ['A', 'B', 'A', 'A'],
+    'quantity': [3, 2, 8, 4],
+    'total_price': [30, 20, 80, 40]
+})
+PURCHASES = pd.DataFrame({
+    'date': pd.to_datetime(['2023-01-02', '2023-01-02', '2023-01-04']),
+    'product_id': ['A', 'B', 'A'],
+    'quantity': [10, 2, 5],
+    'total_cost': [30, 10, 30]
+})
+
+
+def _ledger(method):
+    return CostLedger.from_transactions(PRODUCTS, SALES, PURCHASES, method)
+
+
+def test_fifo_consumes_lots_in_order():
+    ledger = _ledger('fifo')
+    # A: 3 Jan = 2 unit lot pembuka @ 4 + 6 unit @ 3; 5 Jan = 4 unit sisa lot @ 3
+    np.testing.assert_allclose(ledger.sale_cogs(SALES), [3 * 4, 2 * 5, 2 * 4 + 6 * 3, 4 * 3])
+    margin = ledger.product_margin()
+    np.testing.assert_allclose(margin['cogs'], [50, 10])
+    # Tersisa lot 4 Jan (5 @ 6) untuk A dan lot pembelian B
+    np.testing.assert_allclose(margin['inventory_value'], [30, 10])
+    np.testing.assert_allclose(ledger.on_hand_units(), [5, 2])
+
+
+def test_weighted_average_blends_cost_at_each_purchase():
+    ledger = _ledger('weighted_average')
+    after_first = (2 * 4 + 30) / 12
+    after_second = (4 * after_first + 30) / 9
+    np.testing.assert_allclose(ledger.sale_cogs(SALES),
+                               [3 * 4, 2 * 5, 8 * after_first, 4 * after_second])
+    margin = ledger.product_margin()
+    np.testing.assert_allclose(margin['inventory_value'], [5 * after_second, 10])
+    # Biaya masuk (saldo awal + pembelian) = COGS + nilai stok tersisa
+    np.testing.assert_allclose(margin['cogs'] + margin['inventory_value'], [20 + 60, 10 + 10])
+
+
+def _same_margin(left, right):
+    pd.testing.assert_frame_equal(left.product_margin(), right.product_margin())
+    pd.testing.assert_frame_equal(left.daily_margin(), right.daily_margin())
+
+
+@pytest.mark.parametrize('method', ['fifo', 'weighted_average'])
+def test_ingestion_appends_to_cached_ledger(monkeypatch, method):
+    data = generate_data(n_sales=4000, n_purchases=800, n_products=15, n_suppliers=3)
+    sales, purchases = data['sales'], data['purchases']
+    cut = sales['date'].quantile(0.8).normalize()
+    cube = AggregateCube.build(data['products'], sales[sales['date'] < cut],
+                               purchases[purchases['date'] < cut])
+    ingestor = Ingestor(cube, data['products'])
+    analytics.cost_ledger(cube, data['products'], f'test:{cube.version}', method)
+
+    builds = []
+    from_cube = CostLedger.from_cube
+    monkeypatch.setattr(CostLedger, 'from_cube',
+                        classmethod(lambda cls, *args: builds.append(args) or from_cube(*args)))
+    # Satu hari per ingestion, selalu sesudah hari terakhir di ledger
+    days = sales.loc[sales['date'] >= cut, 'date'].dt.normalize().drop_duplicates().sort_values()
+    for day in days[:3]:
+        ingestor.ingest(sales[sales['date'].dt.normalize() == day],
+                        purchases[purchases['date'].dt.normalize() == day])
+        products = ingestor.live_products(data['products'])
+        ledger = analytics.cost_ledger(cube, products, f'test:{cube.version}', method)
+        assert not builds
+        _same_margin(ledger, from_cube(cube, products, method))
+
+
+def test_back_dated_ingestion_rebuilds_ledger():
+    data = generate_data(n_sales=2000, n_purchases=400, n_products=10, n_suppliers=3)
+    cube = AggregateCube.build(data['products'], data['sales'], data['purchases'])
+    ledger = CostLedger.from_cube(cube, data['products'])
+    first_day = data['sales']['date'].min()
+    late_sale = data['sales'][data['sales']['date'] == first_day].head(1)
+    assert ledger.appended(late_sale) is None
+    # Penjualan melebihi stok memindahkan saldo awal hasil fit, jadi tidak bisa di-append
+    oversold = late_sale.assign(date=data['sales']['date'].max() + pd.Timedelta(days=1),
+                                quantity=np.int64(10**9))
+    assert ledger.appended(oversold) is None
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import (exponential_smoothing, forecast_catalog, moving_average,
+                         seasonal_naive)
+
+MATRIX = np.array([[10.0, 20.0, 30.0, 40.0],
+                   [0.0, 5.0, 0.0, 5.0]])
+
+
+def test_moving_average_uses_previous_window():
+    forecast = moving_average(MATRIX, 2)
+    assert np.isnan(forecast[:, :2]).all()
+    np.testing.assert_allclose(forecast[0, 2:], [15.0, 25.0, 35.0])
+    np.testing.assert_allclose(forecast[1, 2:], [2.5, 2.5, 2.5])
+
+
+def test_exponential_smoothing_by_hand():
+    forecast = exponential_smoothing(MATRIX, 0.5)
+    assert np.isnan(forecast[:, 0]).all()
+    # level awal 10; 0.5*20 + 0.5*10 = 15; 0.5*30 + 0.5*15 = 22.5; 0.5*40 + 0.5*22.5 = 31.25
+    np.testing.assert_allclose(forecast[0, 1:], [10.0, 15.0, 22.5, 31.25])
+    np.testing.assert_allclose(forecast[1, 1:], [0.0, 2.5, 1.25, 3.125])
+
+
+def test_seasonal_naive_repeats_last_season():
+    forecast = seasonal_naive(MATRIX, 2)
+    assert np.isnan(forecast[:, :2]).all()
+    np.testing.assert_allclose(forecast[0, 2:], [10.0, 20.0, 30.0])
+    np.testing.assert_allclose(forecast[1, 2:], [0.0, 5.0, 0.0])
+    assert np.isnan(seasonal_naive(MATRIX, 5)).all()
+
+
+def test_forecast_catalog_pivots_months_with_gaps():
+    sales = pd.DataFrame({
+        'date': pd.to_datetime(['2023-01-05', '2023-01-20', '2023-03-02', '2023-03-09']),
+        'product_id': ['A', 'A', 'A', 'B'],
+        'quantity': [2, 3, 4, 1]
+    })
+    result = forecast_catalog(sales, ['A', 'B', 'C'], windows=(2,), alphas=(0.5,),
+                              season_lengths=(1,))
+    np.testing.assert_allclose(result.matrix, [[5, 0, 4], [0, 0, 1], [0, 0, 0]])
+    assert result.months() == ['2023-01', '2023-02', '2023-03', '2023-04']
+    next_period = result.next_period().set_index('product_id')
+    assert next_period.loc['A', 'moving_average_2'] == 2.0
+    assert next_period.loc['A', 'exponential_smoothing_0.5'] == 3.25
+    assert next_period.loc['B', 'seasonal_naive_1'] == 1.0
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from ledger import StockLedger
+
+PRODUCTS = pd.DataFrame({'product_id': ['A', 'B'], 'stock': [0, 2]})
+# A: -12 (1 Jan), +10 (2 Jan), -3 (4 Jan) -> posisi berjalan -12, -2, -5;
+#    mundur dari stok 0 memberi saldo awal 5, jadi 1 Jan bernilai -7
+# B: -1 (3 Jan)                            -> konsisten dengan stok 2
+SALES = pd.DataFrame({
+    'date': pd.to_datetime(['2023-01-01', '2023-01-03', '2023-01-04']),
+    'product_id': ['A', 'B', 'A'],
+    'quantity': [12, 1, 3]
+})
+PURCHASES = pd.DataFrame({
+    'date': pd.to_datetime(['2023-01-02']),
+    'product_id': ['A'],
+    'quantity': [10]
+})
+
+
+def _ledger(snapshot_every=2):
+    return StockLedger.from_transactions(PRODUCTS, SALES, PURCHASES, snapshot_every=snapshot_every)
+
+
+def test_opening_balance_is_fitted_to_keep_stock_non_negative():
+    ledger = _ledger()
+    # Saldo awal A minimal 12 agar 1 Jan tidak negatif: koreksi 12 - 5 = 7
+    np.testing.assert_array_equal(ledger.adjustment, [7, 0])
+    np.testing.assert_array_equal(ledger.closing_stock, [7, 2])
+    history = ledger.daily_matrix('2022-12-31', '2023-01-04')
+    np.testing.assert_array_equal(history, [[12, 0, 10, 10, 7],
+                                            [3, 3, 3, 2, 2]])
+    assert history.min() == 0
+
+
+def test_point_in_time_lookups_match_daily_curve():
+    for snapshot_every in (1, 2, 30):
+        ledger = _ledger(snapshot_every)
+        assert ledger.stock_on('A', '2023-01-02') == 10
+        assert ledger.stock_on('B', '2023-01-03') == 2
+        np.testing.assert_array_equal(ledger.stock_at('2023-01-01'), [0, 3])
+        np.testing.assert_array_equal(ledger.stockout_days(), [1, 0])
+
+
+def test_consistent_history_keeps_current_stock():
+    ledger = StockLedger.from_transactions(PRODUCTS.assign(stock=[20, 2]), SALES, PURCHASES)
+    np.testing.assert_array_equal(ledger.adjustment, [0, 0])
+    assert ledger.stock_on('A', '2022-12-31') == 25
+    assert ledger.stock_on('A', '2023-01-04') == 20
+
+
+def test_append_continues_snapshots():
+    ledger = _ledger()
+    day = int(np.datetime64('2023-01-06', 'D').astype(np.int64))
+    ledger.append([day], [1], [4])
+    assert ledger.stock_on('B', '2023-01-05') == 2
+    assert ledger.stock_on('B', '2023-01-06') == 6
+    np.testing.assert_array_equal(ledger.closing_stock, [7, 6])
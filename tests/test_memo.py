@@ -0,0 +1,48 @@
+from memo import LRUCache, memoize
+
+
+def test_underscore_arguments_are_not_part_of_the_key():
+    calls = []
+
+    @memoize(maxsize=4, name='test_key')
+    def compute(_data, data_version, freq='M'):
+        calls.append((data_version, freq))
+        return len(_data), freq
+
+    assert compute([1, 2], 'v1') == (2, 'M')
+    # Objek data lain dengan versi sama: hasil cache dipakai
+    assert compute([1, 2, 3], 'v1') == (2, 'M')
+    assert compute([1, 2, 3], 'v1', 'W') == (3, 'W')
+    assert compute([1], 'v2') == (1, 'M')
+    assert calls == [('v1', 'M'), ('v1', 'W'), ('v2', 'M')]
+    assert compute.cache_key([], 'v1') == compute.cache_key([9], 'v1', freq='M')
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=None)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == (True, 1)
+    cache.put('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.contains('a') and cache.contains('c')
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_ttl_expires_entries():
+    cache = LRUCache(maxsize=2, ttl=0.0)
+    cache.put('a', 1)
+    assert cache.get('a') == (False, None)
+    assert cache.stats()['expirations'] == 1
+
+
+def test_unhashable_arguments_are_frozen():
+    @memoize(maxsize=2, name='test_freeze')
+    def total(data_version, categories):
+        return sum(categories.values()) if isinstance(categories, dict) else len(categories)
+
+    assert total('v', ['a', 'b']) == 2
+    assert total.cache_key('v', ['a', 'b']) == total.cache_key('v', ('a', 'b'))
+    assert total('v', {'x': 1, 'y': 2}) == 3
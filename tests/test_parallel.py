@@ -0,0 +1,67 @@
+import os
+import signal
+import time
+
+import pandas as pd
+import pytest
+
+import parallel
+from aggregates import PURCHASE_KEYS, SALES_KEYS, AggregateCube
+from data_generator import generate_data
+
+DATA = generate_data(n_sales=3000, n_purchases=600, n_products=25, n_suppliers=4)
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    # Process pool dipakai berapa pun ukuran data; blok kecil agar ada beberapa blok
+    monkeypatch.setattr(parallel, 'MIN_PARALLEL_ROWS', 0)
+    monkeypatch.setattr(parallel, 'BLOCK_ROWS', 700)
+    yield
+    parallel.shutdown_executors()
+
+
+def _build(workers, data=DATA):
+    return parallel.build_cube(data['products'], data['sales'], data['purchases'], workers=workers)
+
+
+def _sorted(frame, keys):
+    return frame.sort_values(keys, ignore_index=True)
+
+
+@pytest.mark.parametrize('categorical_ids', [False, True])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_cube_matches_serial_build(pooled, workers, categorical_ids):
+    data = generate_data(n_sales=3000, n_purchases=600, n_products=25, n_suppliers=4,
+                         categorical_ids=categorical_ids)
+    expected = AggregateCube.build(data['products'], data['sales'], data['purchases'])
+    cube = _build(workers, data)
+    for table, keys in (('sales', SALES_KEYS), ('purchases', PURCHASE_KEYS)):
+        # Urutan baris berbeda (groupby vs kunci terurut); jumlah float boleh beda pembulatan
+        pd.testing.assert_frame_equal(_sorted(getattr(cube, table), keys),
+                                      _sorted(getattr(expected, table), keys), check_dtype=False)
+
+
+def test_result_is_identical_for_any_worker_count(pooled):
+    serial = _build(1)
+    for workers in (2, 3):
+        cube = _build(workers)
+        pd.testing.assert_frame_equal(cube.sales, serial.sales, check_exact=True)
+        pd.testing.assert_frame_equal(cube.purchases, serial.purchases, check_exact=True)
+
+
+def test_broken_pool_is_replaced(pooled):
+    executor = parallel.get_executor(2)
+    list(executor.map(int, range(4)))
+    for process in list(executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+    deadline = time.monotonic() + 10
+    while not executor._broken and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert executor._broken
+
+    cube = _build(2)
+    assert parallel._executors[2] is not executor
+    serial = _build(1)
+    pd.testing.assert_frame_equal(cube.sales, serial.sales)
+    pd.testing.assert_frame_equal(cube.purchases, serial.purchases)
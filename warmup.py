@@ -0,0 +1,114 @@
+"""Prekomputasi latar hasil semua halaman, dibagi antar sesi.
+
+Satu Warmer per proses server (st.cache_resource) memegang thread pool kecil.
+Setiap kali versi data berubah, refresh() menjadwalkan komputasi halaman
+(fungsi analytics yang di-memoize) dengan nilai widget default. Hasilnya masuk
+ke cache memoize() yang sama dengan yang dibaca halaman, jadi semua sesi
+mendapat hit tanpa menghitung ulang di thread script Streamlit.
+
+fetch() dipakai halaman sebagai pengganti pemanggilan langsung:
+- hasil versi sekarang sudah ada: dikembalikan langsung,
+- sedang dihitung di latar dan hasil versi sebelumnya masih di cache:
+  hasil lama dikembalikan dengan penanda refreshing=True,
+- sedang dihitung tanpa hasil lama: tunggu job latar (tidak dihitung dua kali),
+- tidak dijadwalkan (mis. widget bukan default): dihitung langsung.
+
+Jumlah thread diatur lewat INVENTORY_WARM_WORKERS (0 mematikan prekomputasi).
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = int(os.environ.get('INVENTORY_WARM_WORKERS', 2))
+VERSION_ARG = 'data_version'
+MAX_VERSIONS = 8  # versi lama yang dicari untuk hasil sementara
+
+logger = logging.getLogger('inventory.warmup')
+
+
+def _replace_version(key, data_version):
+    return tuple((arg, data_version if arg == VERSION_ARG else value) for arg, value in key)
+
+
+class Warmer:
+    """Thread pool latar yang menghangatkan cache halaman per versi data."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='inventory-warm') \
+            if max_workers > 0 else None
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._versions = []
+
+    @property
+    def latest_version(self):
+        return self._versions[-1] if self._versions else None
+
+    def refresh(self, data_version, jobs):
+        """Jadwalkan `jobs` [(fungsi memoize, args, kwargs)] sekali per versi data.
+
+        Job versi lama yang belum mulai dibatalkan. Kembalikan True jika versi
+        ini baru dijadwalkan.
+        """
+        if self._executor is None:
+            return False
+        with self._lock:
+            if data_version in self._versions:
+                return False
+            for future in self._jobs.values():
+                future.cancel()
+            self._jobs = {}
+            self._versions = (self._versions + [data_version])[-MAX_VERSIONS:]
+            for func, args, kwargs in jobs:
+                key = (func.__name__, func.cache_key(*args, **kwargs))
+                if key in self._jobs or func.cache.contains(key[1]):
+                    continue
+                future = self._executor.submit(func, *args, **kwargs)
+                future.add_done_callback(self._log_failure)
+                self._jobs[key] = future
+        logger.info('warmup %s: %d job', data_version, len(self._jobs))
+        return True
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error('warmup gagal', exc_info=future.exception())
+
+    def _previous(self, func, key):
+        # Hasil versi lama terbaru yang masih ada di cache untuk argumen yang sama
+        current = dict(key).get(VERSION_ARG)
+        with self._lock:
+            versions = [v for v in self._versions if v != current]
+        for version in reversed(versions):
+            found, value = func.cache.get(_replace_version(key, version))
+            if found:
+                return True, value
+        return False, None
+
+    def fetch(self, func, *args, **kwargs):
+        """(hasil, refreshing) untuk pemanggilan fungsi memoize dari halaman."""
+        key = func.cache_key(*args, **kwargs)
+        if func.cache.contains(key):
+            return func(*args, **kwargs), False
+        with self._lock:
+            future = self._jobs.get((func.__name__, key))
+        if future is None or future.cancelled():
+            return func(*args, **kwargs), False
+        if not future.done():
+            found, value = self._previous(func, key)
+            if found:
+                return value, True
+        return future.result(), False
+
+    def pending(self, data_version=None):
+        """Jumlah job versi `data_version` (default: terbaru) yang belum selesai."""
+        with self._lock:
+            if data_version is not None and data_version != self.latest_version:
+                return 0
+            return sum(not future.done() for future in self._jobs.values())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)